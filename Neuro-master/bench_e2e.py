@@ -0,0 +1,279 @@
+"""
+Latence de bout en bout de Clio : de la fin de la transcription (ou du réveil par le chat) à la fin de la lecture.
+
+Usage :
+    python bench_e2e.py                                   # 20 répliques vocales + 5 rafales Twitch
+    python bench_e2e.py --tokens-per-s 15 --first-token-ms 600 --tts-ms 400
+    python bench_e2e.py --transcripts repliques.txt --bursts 0 --json bench_e2e.json
+
+Les vrais modules (Signals, Prompter, BrainModule, TextLLMWrapper, TTS, AudioPlayer, TwitchIngest)
+tournent dans leurs boucles habituelles, face à des doublures locales :
+- faux Ollama (NDJSON en streaming) : délai du premier token et débit en tokens/s réglables
+- faux edge-tts (synthèse à durée fixe) et sortie audio muette (lecture simulée, même boucle AudioPlayer)
+Chemins rejoués :
+- voix   : comme STT.process_text (tour ouvert à stt_end) -> Brain -> LLM -> TTS -> player
+- twitch : rafale de messages -> résumé TwitchIngest -> réveil -> Prompter -> Brain -> ... -> player
+Chaque tour est tracé par metrics.py ; le rapport donne p50 / p95 / p99 par étape et pour le tour complet.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import shutil
+import tempfile
+import statistics
+from pathlib import Path
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from bench_startup import start_fake_ollama, install_fake_edge_tts, git_commit
+
+TRANSCRIPTS = [
+    "Clio, tu m'entends ?",
+    "Tu peux me rappeler ce qu'on fait ce soir ?",
+    "Clio, qu'est-ce que tu penses de ce boss ?",
+    "On lance une partie de Warframe ?",
+    "Tu as vu le message de Gendero ?",
+    "Clio, raconte une blague au chat.",
+    "Je crois que j'ai oublié de sauvegarder.",
+    "Tu te sens comment aujourd'hui ?",
+]
+CHAT_LINES = ["KEKW", "Salut Clio !", "GG", "Elle va y arriver ?", "LUL", "Clio tu dors ?", "première fois ici",
+              "le boss a 2 phases", "pog", "Clio chante quelque chose"]
+REPORTED = ("stt_end", "prompt_build", "rag", "first_token", "tts_first_audio", "playback_end")
+
+
+def percentiles(values: list) -> dict:
+    if not values:
+        return {"n": 0, "p50": None, "p95": None, "p99": None}
+    if len(values) == 1:
+        v = round(values[0], 1)
+        return {"n": 1, "p50": v, "p95": v, "p99": v}
+    q = statistics.quantiles(values, n=100, method="inclusive")
+    return {"n": len(values), "p50": round(q[49], 1), "p95": round(q[94], 1), "p99": round(q[98], 1)}
+
+
+def summarize(turns: list) -> dict:
+    """Par source : durée de chaque étape, réaction perçue (premier audio) et tour complet."""
+    report = {}
+    for source in sorted({t["source"] for t in turns}):
+        selected = [t for t in turns if t["source"] == source]
+        stages = {name: percentiles([t["stages"][name] for t in selected if name in t["stages"]])
+                  for name in REPORTED}
+        report[source] = {
+            "turns": len(selected),
+            "stages": {name: p for name, p in stages.items() if p["n"]},
+            "first_audio": percentiles([t["marks"]["tts_first_audio"] for t in selected
+                                        if "tts_first_audio" in t["marks"]]),
+            "total": percentiles([t["total_ms"] for t in selected]),
+        }
+    return report
+
+
+# --- PIPELINE RÉEL FACE AUX DOUBLURES ---
+
+class Pipeline:
+    def __init__(self, args):
+        self.args = args
+        self.turns = []
+        self.missed = {"voice": 0, "twitch": 0}
+        self._sent = 0
+        self._finished: asyncio.Queue = asyncio.Queue()
+
+    async def start(self):
+        args = self.args
+        install_fake_edge_tts(args.tts_ms)
+        llm_url = f"http://127.0.0.1:{start_fake_ollama(args.first_token_ms, 1000 / args.tokens_per_s, args.tokens)}"
+
+        # Avant tout import des modules : leurs `from constants import ...` lisent ces valeurs
+        import constants
+        constants.TTS_BACKEND = "edge"
+        constants.LLM_ENDPOINT = llm_url
+        constants.TWITCH_DIGEST_WINDOW = args.digest_window
+        constants.TWITCH_RESPONSE_COOLDOWN = 0
+
+        from signals import Signals
+        from metrics import get_metrics
+        from llmWrappers.llmState import LLMState
+        from llmWrappers.textLLMWrapper import TextLLMWrapper
+        from prompter import Prompter
+        from tts import TTS
+        from modules.brainModule import BrainModule
+        from modules.twitchIngest import TwitchIngest
+        from modules.audio_player import AudioPlayer
+
+        playback_s = args.playback_ms / 1000
+
+        class NullAudioPlayer(AudioPlayer):
+            """Vraie boucle de lecture (AI_speaking, fin de tour), sans carte son : durée simulée."""
+            def _decode_to_pcm(self, path):
+                return None
+
+            def _play_mp3(self, path):
+                time.sleep(playback_s)
+
+            def _play_pcm_stream(self, stream):
+                while stream.chunks.get() is not None:
+                    pass
+                time.sleep(playback_s)
+
+        loop = asyncio.get_running_loop()
+        self.metrics = get_metrics()
+        self.metrics.publish = lambda event, data: (
+            loop.call_soon_threadsafe(self._finished.put_nowait, data) if event == "clio_latency_update" else None)
+
+        signals = self.signals = Signals()
+        signals.loop = loop
+        signals.last_message_time = time.time()
+        modules = self.modules = {}
+        modules['tts'] = TTS(signals=signals, modules=modules)
+        modules['brain'] = BrainModule(signals, modules)
+        modules['twitch_ingest'] = TwitchIngest(signals, modules)
+        modules['llm'] = TextLLMWrapper(signals, modules['tts'], LLMState(), modules)
+        modules['audio'] = NullAudioPlayer(signals, enabled=True, modules=modules)
+        self.prompter = Prompter(signals, modules, Path(HERE))
+
+        self.tasks = [asyncio.create_task(m.run()) for m in
+                      (modules['tts'], modules['brain'], modules['twitch_ingest'], modules['audio'], self.prompter)]
+
+    async def stop(self):
+        self.signals.terminate = True
+        done, pending = await asyncio.wait(self.tasks, timeout=3)
+        for task in pending:
+            task.cancel()
+
+    async def _wait_turn(self, source: str):
+        deadline = time.perf_counter() + self.args.timeout
+        while True:
+            try:
+                summary = await asyncio.wait_for(self._finished.get(), max(0.0, deadline - time.perf_counter()))
+            except asyncio.TimeoutError:
+                self.missed[source] += 1
+                print(f"⚠️ Tour {source} sans fin de lecture après {self.args.timeout:.0f} s")
+                self.metrics.end_turn("timeout")
+                return None
+            if summary["source"] == source:
+                self.turns.append(summary)
+                return summary
+
+    async def _settle(self):
+        """Clio redevient disponible (réponse dite, rien en préparation) avant l'entrée suivante."""
+        while self.signals.AI_thinking or self.signals.AI_speaking:
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(self.args.gap_ms / 1000)
+
+    # --- SCÉNARIOS ---
+    async def voice_turn(self, text: str):
+        # Comme STT.process_text : le tour commence à la fin de la transcription
+        self.metrics.begin_turn("voice")
+        self.metrics.mark("stt_end")
+        self.signals.last_message_time = time.time()
+        asyncio.create_task(self.modules['brain'].process_llm_response(text, source="voice"))
+        summary = await self._wait_turn("voice")
+        await self._settle()
+        return summary
+
+    async def twitch_burst(self, size: int, rng: random.Random):
+        ingest = self.modules['twitch_ingest']
+        for i in range(size):
+            # Quelques spectateurs bavards (limités par leur seau), des messages repris en chœur
+            # et des messages uniques (les reprises d'une rafale à l'autre ne sont que comptées)
+            user = f"viewer{rng.randrange(max(1, size // 2))}"
+            text = rng.choice(CHAT_LINES)
+            ingest.API.submit(user, text if i % 2 else f"{text} ({self._sent + i})")
+        self._sent += size
+        if rng.random() < 0.3:
+            ingest.API.submit("raider", "", "RAID", {"viewers": rng.randrange(5, 200)})
+        summary = await self._wait_turn("twitch")
+        await self._settle()
+        return summary
+
+
+def load_transcripts(path) -> list:
+    if not path:
+        return TRANSCRIPTS
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+async def run_bench(args) -> dict:
+    pipeline = Pipeline(args)
+    await pipeline.start()
+    rng = random.Random(args.seed)
+    transcripts = load_transcripts(args.transcripts)
+    try:
+        for i in range(args.turns):
+            summary = await pipeline.voice_turn(transcripts[i % len(transcripts)])
+            if summary:
+                print(f"🎤 Voix {i + 1}/{args.turns} : 1er audio {summary['marks'].get('tts_first_audio', float('nan')):.0f} ms, "
+                      f"tour {summary['total_ms']:.0f} ms")
+        for i in range(args.bursts):
+            summary = await pipeline.twitch_burst(args.burst_size, rng)
+            if summary:
+                print(f"💬 Rafale {i + 1}/{args.bursts} ({args.burst_size} messages) : "
+                      f"1er audio {summary['marks'].get('tts_first_audio', float('nan')):.0f} ms, tour {summary['total_ms']:.0f} ms")
+    finally:
+        await pipeline.stop()
+    return {"summary": summarize(pipeline.turns), "missed": pipeline.missed, "turns": pipeline.turns,
+            "twitch_stats": pipeline.modules['twitch_ingest'].API.get_stats()}
+
+
+def print_report(summary: dict):
+    def fmt(value):
+        return f"{value:>9.0f}" if value is not None else f"{'-':>9}"
+
+    for source, data in summary.items():
+        print(f"\n[{source}] {data['turns']} tour(s)")
+        print(f"{'Étape':<18}{'p50':>9}{'p95':>9}{'p99':>9}")
+        rows = list(data["stages"].items()) + [("= 1er audio", data["first_audio"]), ("= tour complet", data["total"])]
+        for name, p in rows:
+            print(f"{name:<18}{fmt(p['p50'])}{fmt(p['p95'])}{fmt(p['p99'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latence de bout en bout de Clio (doublures locales)")
+    parser.add_argument("--turns", type=int, default=20, help="Répliques vocales rejouées")
+    parser.add_argument("--transcripts", help="Fichier texte, une réplique par ligne (sinon répliques intégrées)")
+    parser.add_argument("--bursts", type=int, default=5, help="Rafales de chat Twitch")
+    parser.add_argument("--burst-size", type=int, default=40)
+    parser.add_argument("--digest-window", type=float, default=1.0, help="Fenêtre d'agrégation Twitch (s)")
+    parser.add_argument("--first-token-ms", type=float, default=250)
+    parser.add_argument("--tokens-per-s", type=float, default=40)
+    parser.add_argument("--tokens", type=int, default=30, help="Morceaux par réponse du faux Ollama")
+    parser.add_argument("--tts-ms", type=float, default=200, help="Durée de la fausse synthèse edge-tts")
+    parser.add_argument("--playback-ms", type=float, default=300, help="Durée de lecture simulée")
+    parser.add_argument("--gap-ms", type=float, default=100, help="Pause entre deux entrées")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Fichier de sortie JSON")
+    args = parser.parse_args(argv)
+
+    # temp/ (TTS) et songs/ (AudioPlayer) sont créés dans un dossier jetable
+    workdir = tempfile.mkdtemp(prefix="clio_bench_e2e_")
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        result = asyncio.run(run_bench(args))
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(result["summary"])
+    if any(result["missed"].values()):
+        print(f"\n⚠️ Tours perdus : {result['missed']}")
+
+    if args.json:
+        report = {"commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                  "config": {k: v for k, v in vars(args).items() if k != "json"}, **result}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
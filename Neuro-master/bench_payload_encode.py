@@ -0,0 +1,139 @@
+"""
+Micro-benchmark du chemin capture -> réduction/encodage -> payload multimodal.
+
+Usage :
+    python bench_payload_encode.py                    # trame synthétique 2560x1440
+    python bench_payload_encode.py --capture          # vraie capture d'écran (bus partagé ou mss)
+    python bench_payload_encode.py --frames 50 --json resultats.json
+
+Compare le profil historique (natif, JPEG 95) aux profils réduits, avec le temps par étape
+et le poids (octets encodés, Base64 et payload JSON complet) par trame.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+import numpy as np
+
+from modules.payloadEncoder import PayloadEncoder, LEGACY_PROFILE
+
+PROFILES = {
+    "legacy_native_q95": LEGACY_PROFILE,
+    "jpeg_1024_q85": {"long_edge": 1024, "quality": 85, "format": "jpeg"},
+    "jpeg_768_q80": {"long_edge": 768, "quality": 80, "format": "jpeg"},
+    "jpeg_512_q75": {"long_edge": 512, "quality": 75, "format": "jpeg"},
+    "webp_768_q80": {"long_edge": 768, "quality": 80, "format": "webp"},
+}
+
+
+def synthetic_frame(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Écran de jeu plausible : dégradé, panneaux, texte de HUD et un peu de bruit."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = (x * 0.6 + y * 0.2).astype(np.uint8)
+    frame[..., 1] = (y * 0.5 + 40).astype(np.uint8)
+    frame[..., 2] = (255 - x * 0.4).astype(np.uint8)
+    for i in range(12):
+        x0, y0 = int(rng.integers(0, width - 300)), int(rng.integers(0, height - 200))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.rectangle(frame, (x0, y0), (x0 + 280, y0 + 180), color, -1)
+        cv2.putText(frame, f"HP {rng.integers(0, 999)} / ENERGIE {rng.integers(0, 300)}", (x0 + 10, y0 + 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    noise = rng.integers(-6, 7, frame.shape, dtype=np.int16)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def make_capture(use_screen: bool, width: int, height: int):
+    """Retourne une fonction de capture (trame BGR) : écran réel ou trame synthétique fixe."""
+    if not use_screen:
+        frame = synthetic_frame(width, height)
+        return lambda: frame
+
+    from modules.frameBus import attach_reader
+    from constants import CLIO_FRAME_BUS_NAME, PRIMARY_MONITOR
+    reader = attach_reader(CLIO_FRAME_BUS_NAME)
+    if reader is not None:
+        print("📡 Capture via le bus d'images partagé de Clio.")
+        return lambda: reader.wait_fresh(max_age=0.2).image
+
+    import mss
+    sct = mss.mss()
+    monitor = sct.monitors[PRIMARY_MONITOR]
+    print("🖥️ Capture directe mss (Clio ne tourne pas).")
+    return lambda: cv2.cvtColor(np.array(sct.grab(monitor)), cv2.COLOR_BGRA2BGR)
+
+
+def bench_profile(name: str, profile, capture, frames: int):
+    encoder = PayloadEncoder(profile)
+    samples = {"capture_ms": [], "resize_ms": [], "encode_ms": [], "payload_ms": [], "total_ms": []}
+    sizes = {"encoded_bytes": 0, "base64_bytes": 0, "payload_bytes": 0}
+
+    for i in range(frames + 1):
+        start = time.perf_counter()
+        frame = capture()
+        captured = time.perf_counter()
+        encoded = encoder.submit(frame).result()
+        encoded_at = time.perf_counter()
+        payload = json.dumps({
+            "model": "bench",
+            "messages": [{"role": "user", "content": [
+                {"type": "text", "text": "Décris l'écran."},
+                {"type": "image_url", "image_url": {"url": encoded.data_url}}
+            ]}]
+        })
+        done = time.perf_counter()
+
+        if i == 0:
+            continue  # Première itération : chauffe (allocation du tampon, thread d'encodage)
+        samples["capture_ms"].append((captured - start) * 1000)
+        samples["resize_ms"].append(encoded.resize_ms)
+        samples["encode_ms"].append(encoded.encode_ms)
+        samples["payload_ms"].append((done - encoded_at) * 1000)
+        samples["total_ms"].append((done - start) * 1000)
+        sizes = {"encoded_bytes": encoded.encoded_bytes, "base64_bytes": len(encoded.base64),
+                 "payload_bytes": len(payload.encode("utf-8"))}
+
+    encoder.shutdown()
+    result = {key: round(statistics.median(values), 2) for key, values in samples.items()}
+    result.update(sizes)
+    result["output_size"] = f"{encoded.width}x{encoded.height}"
+    result["profile"] = name
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'encodage des payloads multimodaux")
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--capture", action="store_true", help="Utiliser une vraie capture d'écran")
+    parser.add_argument("--width", type=int, default=2560)
+    parser.add_argument("--height", type=int, default=1440)
+    parser.add_argument("--json", help="Fichier de sortie JSON")
+    args = parser.parse_args()
+
+    capture = make_capture(args.capture, args.width, args.height)
+    results = [bench_profile(name, profile, capture, args.frames) for name, profile in PROFILES.items()]
+
+    print(f"\n{'Profil':<20}{'Sortie':>11}{'Capt.':>8}{'Réd.':>8}{'Enc.':>8}{'JSON':>8}{'Total':>9}{'Encodé':>10}{'Payload':>11}")
+    for r in results:
+        print(f"{r['profile']:<20}{r['output_size']:>11}{r['capture_ms']:>8.1f}{r['resize_ms']:>8.1f}"
+              f"{r['encode_ms']:>8.1f}{r['payload_ms']:>8.1f}{r['total_ms']:>9.1f}"
+              f"{r['encoded_bytes'] / 1024:>8.0f}Ko{r['payload_bytes'] / 1024:>9.0f}Ko")
+    print("(médianes en ms par trame)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Micro-benchmark des détecteurs du ReflexEngine.
+
+Usage :
+    python bench_reflex.py                          # trame synthétique 2560x1440, jeu "warframe"
+    python bench_reflex.py --game warframe --frames 500
+    python bench_reflex.py --json resultats.json
+
+Compare l'ancienne boucle (conversions HSV et bornes recréées à chaque trame, np.sum
+sur le masque) au moteur compilé de modules/reflexDetectors.py (tampons préalloués),
+et rapporte le temps par trame et le nombre de détections évaluées par seconde.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+import numpy as np
+
+from modules.reflexDetectors import DetectorEngine, load_specs
+
+
+def synthetic_frame(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Écran de jeu plausible : fond bruité, barre de vie rouge en haut à droite, ennemi au centre."""
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 90, (height, width, 3), dtype=np.uint8)
+    cv2.rectangle(frame, (int(width * 0.82), int(height * 0.04)), (int(width * 0.95), int(height * 0.06)), (0, 0, 220), -1)
+    cv2.circle(frame, (width // 2 + 20, height // 2 - 10), 12, (10, 20, 230), -1)
+    return frame
+
+
+def legacy_step(frame: np.ndarray):
+    """Reproduction de l'ancienne boucle du ReflexEngine (survie + réticule)."""
+    h, w, _ = frame.shape
+    roi_stats = frame[int(0.02 * h):int(0.12 * h), int(0.80 * w):int(0.98 * w)]
+    hsv = cv2.cvtColor(roi_stats, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, np.array([0, 150, 50]), np.array([10, 255, 255]))
+    low_health = np.sum(mask) < 500
+
+    center_x, center_y = w // 2, h // 2
+    crosshair_zone = frame[center_y - 50:center_y + 50, center_x - 50:center_x + 50]
+    hsv = cv2.cvtColor(crosshair_zone, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, np.array([0, 100, 100]), np.array([10, 255, 255]))
+    return low_health, bool(np.any(mask))
+
+
+def bench(step, frame: np.ndarray, frames: int, detections_per_frame: int):
+    step(frame)  # Chauffe (compilation des détecteurs, allocation des tampons)
+    samples = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        step(frame)
+        samples.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(samples)
+    return {
+        "median_ms": round(median, 4),
+        "p95_ms": round(sorted(samples)[int(len(samples) * 0.95) - 1], 4),
+        "frames_per_s": round(1000 / median),
+        "detections_per_s": round(1000 / median * detections_per_frame)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des détecteurs du ReflexEngine")
+    parser.add_argument("--game", default="warframe")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=2560)
+    parser.add_argument("--height", type=int, default=1440)
+    parser.add_argument("--json", help="Fichier de sortie JSON")
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.width, args.height)
+    engine = DetectorEngine(args.game, load_specs()[args.game])
+    engine.compile(frame.shape)
+    compiled_count = len(engine.detectors)
+
+    results = {}
+    if args.game == "warframe":
+        results["legacy_loop"] = bench(legacy_step, frame, args.frames, 2)
+    results["compiled_engine"] = bench(engine.process, frame, args.frames, compiled_count)
+
+    print(f"\n{'Variante':<18}{'Médiane':>10}{'p95':>10}{'Trames/s':>11}{'Détections/s':>15}")
+    for name, r in results.items():
+        print(f"{name:<18}{r['median_ms']:>8.3f}ms{r['p95_ms']:>8.3f}ms{r['frames_per_s']:>11}{r['detections_per_s']:>15}")
+    print(f"({compiled_count} détecteur(s) pour '{args.game}', trame {args.width}x{args.height})")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
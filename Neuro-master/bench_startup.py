@@ -0,0 +1,260 @@
+"""
+Démarrage à froid de Clio : coût de chaque module et délai jusqu'à la première réponse.
+
+Usage :
+    python bench_startup.py                        # 3 démarrages à froid, résultats dans bench_startup.json
+    python bench_startup.py --runs 5 --serial      # chargement en série (coût isolé de chaque import)
+    python bench_startup.py --history bench_startup_history.jsonl   # ajoute une ligne de résumé par commit
+    python main.py --bench-startup [options]       # même chose depuis le point d'entrée de Clio
+
+Chaque démarrage a lieu dans un interpréteur neuf (comme dashboard_soft_restart / phoenix_protocol) :
+- import de main.py puis construction de tous les modules par le registre (import / init par module)
+- première réponse : requête LLM (faux Ollama local, réponse en streaming) puis synthèse
+  (faux edge-tts local) jusqu'à la remise de l'audio au player (player muet)
+Aucun service externe n'est contacté ; le modèle XTTS n'est pas chargé (moteur edge forcé).
+"""
+import time
+
+CHILD_START = time.perf_counter()  # Avant tout import lourd
+
+import os
+import sys
+import json
+import types
+import asyncio
+import argparse
+import statistics
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+RESULT_MARKER = "BENCH_STARTUP_RESULT "
+QUESTION = "Salut Clio, tu m'entends ?"
+
+
+# --- FAUX SERVICES ---
+
+def start_fake_ollama(first_token_ms: float, chunk_ms: float, chunks: int) -> int:
+    """/api/chat en NDJSON, comme Ollama avec stream=True (une ligne par morceau HTTP/1.1 chunked)."""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            time.sleep(first_token_ms / 1000)
+            for i in range(chunks):
+                line = {"message": {"content": "Oui, je t'entends très bien ! " if i == 0 else "Bla "}, "done": False}
+                self._send_chunk((json.dumps(line) + "\n").encode())
+                time.sleep(chunk_ms / 1000)
+            self._send_chunk((json.dumps({"message": {"content": ""}, "done": True}) + "\n").encode())
+            self._send_chunk(b"")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def install_fake_edge_tts(synth_ms: float):
+    """Remplace le paquet edge_tts (service Microsoft) par une synthèse locale à durée fixe."""
+    class Communicate:
+        def __init__(self, text, voice, rate="+0%", volume="+0%"):
+            self.text = text
+
+        async def save(self, path):
+            await asyncio.sleep(synth_ms / 1000)
+            with open(path, "wb") as f:
+                f.write(b"ID3")
+
+    sys.modules["edge_tts"] = types.SimpleNamespace(Communicate=Communicate)
+
+
+class NullPlayer:
+    """Player muet : note l'instant où le premier audio lui est remis."""
+    def __init__(self):
+        self.first_audio = None
+        self.played = threading.Event()
+        self.API = self
+
+    def _mark(self):
+        if self.first_audio is None:
+            self.first_audio = time.perf_counter()
+        self.played.set()
+
+    def play_audio(self, path):
+        self._mark()
+
+    def open_stream(self, sample_rate, channels=1):
+        self._mark()
+        return types.SimpleNamespace(first_write_time=None, write=lambda pcm: None, close=lambda: None)
+
+
+class ChunkProbe:
+    """Remplace signals.sio_queue : note le premier morceau LLM reçu."""
+    def __init__(self):
+        self.first_chunk = None
+
+    def put(self, item, *args, **kwargs):
+        if item[0] == "next_chunk" and self.first_chunk is None:
+            self.first_chunk = time.perf_counter()
+
+    put_nowait = put
+
+
+# --- UN DÉMARRAGE À FROID (processus enfant) ---
+
+async def cold_start(args) -> dict:
+    install_fake_edge_tts(args.tts_ms)
+    import constants
+    constants.TTS_BACKEND = "edge"
+    constants.LLM_ENDPOINT = args.llm_url
+
+    t0 = time.perf_counter()
+    import main as clio_main
+    from signals import Signals
+    from llmWrappers.llmState import LLMState
+    main_import_ms = (time.perf_counter() - t0) * 1000
+
+    signals = Signals()
+    signals.loop = asyncio.get_running_loop()
+    probe = signals.sio_queue = ChunkProbe()
+    modules = {}
+    registry = clio_main.build_registry(signals, LLMState(), modules)
+    await registry.build(modules, max_workers=1 if args.serial else constants.STARTUP_WORKERS)
+    online = time.perf_counter()
+
+    # Première réponse : question -> LLM -> TTS -> player
+    player = modules['audio'] = NullPlayer()
+    first_token_ms = first_audio_ms = None
+    llm = modules.get('llm')
+    if llm is not None and 'tts' in modules:
+        signals.history = [{"role": "user", "content": QUESTION}]
+        asked = time.perf_counter()
+        await asyncio.to_thread(llm.prompt)
+        await asyncio.to_thread(player.played.wait, args.timeout)
+        if probe.first_chunk:
+            first_token_ms = (probe.first_chunk - asked) * 1000
+        if player.first_audio:
+            first_audio_ms = (player.first_audio - asked) * 1000
+
+    return {
+        "main_import_ms": round(main_import_ms, 1),
+        "build_ms": round(registry.total_ms, 1),
+        "online_ms": round((online - CHILD_START) * 1000, 1),
+        "first_token_ms": round(first_token_ms, 1) if first_token_ms else None,
+        "first_audio_ms": round(first_audio_ms, 1) if first_audio_ms else None,
+        "first_response_ms": round((player.first_audio - CHILD_START) * 1000, 1) if player.first_audio else None,
+        "modules": {t.key: {"status": t.status, "import_ms": round(t.import_ms, 1), "init_ms": round(t.init_ms, 1),
+                            "detail": t.detail} for t in registry.timings.values()},
+    }
+
+
+def child_main(args):
+    result = asyncio.run(cold_start(args))
+    print(RESULT_MARKER + json.dumps(result, ensure_ascii=False), flush=True)
+    os._exit(0)  # Les threads des modules (non démarrés proprement) ne doivent pas retenir le processus
+
+
+# --- ORCHESTRATION ---
+
+def run_cold(args, llm_url: str) -> dict:
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", "--llm-url", llm_url,
+           "--tts-ms", str(args.tts_ms), "--timeout", str(args.timeout)] + (["--serial"] if args.serial else [])
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=HERE, capture_output=True, text=True, timeout=args.timeout + 300)
+    wall_ms = (time.perf_counter() - start) * 1000
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+            result["process_ms"] = round(wall_ms, 1)
+            return result
+    raise RuntimeError(f"Démarrage échoué (code {proc.returncode}) :\n{proc.stderr[-2000:]}")
+
+
+def summarize(runs: list) -> dict:
+    def median(values):
+        values = [v for v in values if v is not None]
+        return round(statistics.median(values), 1) if values else None
+
+    summary = {k: median([r[k] for r in runs]) for k in
+               ("process_ms", "main_import_ms", "build_ms", "online_ms", "first_token_ms", "first_audio_ms",
+                "first_response_ms")}
+    keys = runs[0]["modules"].keys()
+    summary["modules"] = {
+        key: {"status": runs[0]["modules"][key]["status"], "detail": runs[0]["modules"][key]["detail"],
+              "import_ms": median([r["modules"][key]["import_ms"] for r in runs]),
+              "init_ms": median([r["modules"][key]["init_ms"] for r in runs])}
+        for key in keys
+    }
+    return summary
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True).stdout.strip() or "inconnu"
+    except OSError:
+        return "inconnu"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Démarrage à froid de Clio (imports, modules, première réponse)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--serial", action="store_true", help="Chargement des modules en série")
+    parser.add_argument("--llm-first-token-ms", type=float, default=150)
+    parser.add_argument("--tts-ms", type=float, default=200, help="Durée de la fausse synthèse edge-tts")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--json", default=os.path.join(HERE, "bench_startup.json"))
+    parser.add_argument("--history", help="Fichier JSONL auquel ajouter le résumé (suivi entre commits)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--llm-url", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return child_main(args)
+
+    llm_url = f"http://127.0.0.1:{start_fake_ollama(args.llm_first_token_ms, 20, 10)}"
+    runs = []
+    for i in range(args.runs):
+        runs.append(run_cold(args, llm_url))
+        r = runs[-1]
+        print(f"Démarrage {i + 1}/{args.runs} : processus {r['process_ms']:.0f} ms, en ligne {r['online_ms']:.0f} ms, "
+              f"première réponse {r['first_response_ms'] or float('nan'):.0f} ms")
+
+    summary = summarize(runs)
+    print(f"\n{'Module':<16}{'Statut':<10}{'Import':>10}{'Init':>10}")
+    for key, m in sorted(summary["modules"].items(), key=lambda kv: -((kv[1]["import_ms"] or 0) + (kv[1]["init_ms"] or 0))):
+        print(f"{key:<16}{m['status']:<10}{m['import_ms']:>8.0f}ms{m['init_ms']:>8.0f}ms  {m['detail']}")
+    print(f"\nMédianes : import main.py {summary['main_import_ms']:.0f} ms | construction {summary['build_ms']:.0f} ms | "
+          f"en ligne {summary['online_ms']:.0f} ms | 1er token {summary['first_token_ms'] or float('nan'):.0f} ms | "
+          f"1er audio {summary['first_audio_ms'] or float('nan'):.0f} ms")
+
+    if summary["first_audio_ms"] is None:
+        print("⚠️ Aucune première réponse mesurée (module llm ou tts absent, voir le tableau).")
+
+    report = {"commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0],
+              "serial": args.serial, "summary": summary, "runs": runs}
+    with open(args.json, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Résultats écrits dans {args.json}")
+    if args.history:
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps({k: v for k, v in report.items() if k != "runs"}, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Test de charge : la vision bloque-t-elle encore le chemin du chat ?
+
+Usage :
+    python bench_vision_sidecar.py                       # faux serveur Ollama local (aucun GPU requis)
+    python bench_vision_sidecar.py --vision-ms 800 --requests 24 --duplicates 0.5
+    python bench_vision_sidecar.py --json resultats.json
+
+Un faux Ollama répond aux requêtes vision (lentes) et chat (rapides). Pendant qu'un flot
+de requêtes vision est envoyé, une boucle de chat mesure sa latence et le retard de la
+boucle asyncio. Deux variantes :
+- direct  : appel requests.post dans la coroutine (comportement historique des scripts)
+- sidecar : requêtes confiées à modules/visionSidecar.py (file, limites par modèle, dédup.)
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import requests
+
+from signals import Signals
+from modules.visionSidecar import VisionSidecar
+
+
+def start_fake_ollama(vision_ms: float, chat_ms: float) -> int:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep((vision_ms if body.get("images") else chat_ms) / 1000)
+            data = json.dumps({"response": "Un écran de jeu.", "message": {"content": "Salut !"}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def make_frames(count: int, duplicates: float, seed: int = 0):
+    """Trames 1280x720 ; une part 'duplicates' répète exactement la trame précédente."""
+    rng = np.random.default_rng(seed)
+    frames, last = [], None
+    for _ in range(count):
+        if last is None or rng.random() >= duplicates:
+            last = rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+        frames.append(last)
+    return frames
+
+
+async def chat_path(base_url: str, stop: asyncio.Event, chat_latencies: list, loop_lags: list):
+    """Simule le chat : une requête LLM toutes les 100 ms + mesure du retard de la boucle."""
+    session = requests.Session()
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.to_thread(session.post, f"{base_url}/api/chat", json={"model": "chat"}, timeout=30)
+        chat_latencies.append((time.perf_counter() - start) * 1000)
+
+        tick = time.perf_counter()
+        await asyncio.sleep(0.1)
+        loop_lags.append(max(0.0, (time.perf_counter() - tick - 0.1) * 1000))
+
+
+async def vision_direct(base_url: str, frames, _signals):
+    from modules.payloadEncoder import PayloadEncoder
+    encoder, session = PayloadEncoder(), requests.Session()
+    for frame in frames:
+        encoded = encoder.encode(frame)
+        session.post(f"{base_url}/api/generate", json={"model": "moondream", "prompt": "?", "images": [encoded.base64]},
+                     timeout=60)  # Bloque la boucle, comme les appels historiques
+    return {}
+
+
+async def vision_sidecar(base_url: str, frames, signals):
+    sidecar = VisionSidecar(signals, {}, url=f"{base_url}/api/generate", limits={"moondream": 2})
+    runner = asyncio.create_task(sidecar.run())
+    while sidecar._loop is None:
+        await asyncio.sleep(0.01)
+    results = await asyncio.gather(
+        *(sidecar.API.analyze(frame, "?", "moondream", seq=i) for i, frame in enumerate(frames)),
+        return_exceptions=True
+    )
+    signals.terminate = True
+    await runner
+    stats = sidecar.API.get_stats()
+    stats["failed"] = sum(isinstance(r, Exception) for r in results)
+    return stats
+
+
+async def scenario(name: str, vision, base_url: str, frames):
+    signals = Signals()
+    stop = asyncio.Event()
+    chat_latencies, loop_lags = [], []
+    chat = asyncio.create_task(chat_path(base_url, stop, chat_latencies, loop_lags))
+    await asyncio.sleep(0.3)  # Référence : quelques échanges de chat avant la charge
+
+    start = time.perf_counter()
+    stats = await vision(base_url, frames, signals)
+    vision_s = time.perf_counter() - start
+    stop.set()
+    await chat
+
+    quantiles = statistics.quantiles(chat_latencies, n=20, method="inclusive")
+    return {
+        "scenario": name,
+        "vision_total_s": round(vision_s, 2),
+        "chat_requests": len(chat_latencies),
+        "chat_p50_ms": round(statistics.median(chat_latencies), 1),
+        "chat_p95_ms": round(quantiles[18], 1),
+        "chat_max_ms": round(max(chat_latencies), 1),
+        "loop_lag_max_ms": round(max(loop_lags), 1),
+        **{k: v for k, v in stats.items() if k in ("deduplicated", "cache_hits", "completed", "failed")}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge du sidecar vision")
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--duplicates", type=float, default=0.5, help="Part de trames répétées (0-1)")
+    parser.add_argument("--vision-ms", type=float, default=400)
+    parser.add_argument("--chat-ms", type=float, default=30)
+    parser.add_argument("--json", help="Fichier de sortie JSON")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{start_fake_ollama(args.vision_ms, args.chat_ms)}"
+    frames = make_frames(args.requests, args.duplicates)
+    results = [
+        asyncio.run(scenario("direct", vision_direct, base_url, frames)),
+        asyncio.run(scenario("sidecar", vision_sidecar, base_url, frames)),
+    ]
+
+    print(f"\n{'Variante':<10}{'Vision':>9}{'Chats':>7}{'Chat p50':>10}{'Chat p95':>10}{'Chat max':>10}{'Retard max':>12}{'Dédup.':>8}{'Cache':>7}")
+    for r in results:
+        print(f"{r['scenario']:<10}{r['vision_total_s']:>8.1f}s{r['chat_requests']:>7}{r['chat_p50_ms']:>8.1f}ms"
+              f"{r['chat_p95_ms']:>8.1f}ms{r['chat_max_ms']:>8.1f}ms{r['loop_lag_max_ms']:>10.1f}ms{r.get('deduplicated', '-'):>8}{r.get('cache_hits', '-'):>7}")
+    print(f"({args.requests} requêtes vision à {args.vision_ms:.0f} ms, {args.duplicates:.0%} de trames répétées)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
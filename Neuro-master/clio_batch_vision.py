@@ -0,0 +1,202 @@
+"""
+Analyse par lots des images d'entraînement avec le modèle vision local (Ollama).
+
+Usage :
+    python clio_batch_vision.py training_data/BackpackBattles
+    python clio_batch_vision.py training_data/recording --preset build --workers 3
+    python clio_batch_vision.py training_data --model llava --prompt "Décris l'écran." --limit 200
+
+- Parcourt le dossier (images .jpg/.png, ou enregistrement de modules/frameRecorder.py)
+- Déduplique par hash perceptuel (dHash) : les trames quasi identiques partagent une description
+- Envoie des requêtes concurrentes BORNÉES au modèle (--workers)
+- Écrit chaque description dans un cache JSONL dès qu'elle arrive : relancer la commande
+  reprend là où elle s'était arrêtée (les trames déjà décrites, repérées par segment#index
+  ou chemin, sont sautées avant même le décodage)
+- Décode et encode dans le thread principal : le pool ne reçoit que des charges base64
+  (cv2.VideoCapture n'est pas partageable entre threads)
+"""
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+import requests
+
+from modules.frameDiff import to_thumbnail, dhash, hamming, HASH_DISTANCE
+from modules.payloadEncoder import PayloadEncoder
+from modules.frameRecorder import FrameDataset, META_FILE
+
+OLLAMA_URL = "http://localhost:11434/api/generate"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+RESULTS_FILE = "vision_descriptions.jsonl"
+
+# Les prompts des scripts d'analyse unitaires (clio_vision, clio_solo, clio_intelligence)
+PRESETS = {
+    "build": ("moondream", "Describe the items in this video game backpack. What is the main strategy?"),
+    "solo": ("llava", "Tu es Clio, l'assistante de Ambre. Regarde ce sac à dos de jeu. Dis-moi en français quel est l'objet le plus fort que tu vois et donne un petit conseil."),
+    "tactical": ("llava", "Tu es Clio, l'IA d'Ambre. Analyse cette image de jeu et donne un conseil tactique court en français."),
+}
+
+
+def iter_sources(folder: str):
+    """
+    (identifiant, chargeur de trame BGR) pour chaque image du dossier ou de l'enregistrement.
+    L'identifiant d'une trame enregistrée est segment#index : il survit à un ré-encodage du
+    segment, contrairement au hash. Les chargeurs partagent le décodeur : thread principal uniquement.
+    """
+    if os.path.exists(os.path.join(folder, META_FILE)):
+        dataset = FrameDataset(folder)
+        for i, record in enumerate(dataset.records):
+            yield f"{record.segment}#{record.index}", (lambda i=i: dataset[i][0])
+        return
+    for root, _, files in os.walk(folder):
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, folder), (lambda path=path: cv2.imread(path))
+
+
+def load_results(path: str):
+    """Cache de reprise : ({(modèle, prompt, hash)}, {(modèle, prompt, identifiant de source)})."""
+    hashes, sources = set(), set()
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    key = (entry["model"], entry["prompt"])
+                    hashes.add(key + (entry["hash"],))
+                    sources.update(key + (source_id,) for source_id in entry.get("files", []))
+    return hashes, sources
+
+
+def group_by_hash(sources, max_distance: int = HASH_DISTANCE):
+    """Regroupe les images quasi identiques : {hash représentant: [(id, chargeur), ...]}."""
+    groups = {}
+    for source_id, load in sources:
+        frame = load()
+        if frame is None:
+            print(f"⚠️ Image illisible ignorée : {source_id}")
+            continue
+        frame_hash = dhash(to_thumbnail(frame))
+        match = frame_hash if frame_hash in groups else next(
+            (h for h in groups if hamming(h, frame_hash) <= max_distance), None
+        )
+        groups.setdefault(frame_hash if match is None else match, []).append((source_id, load))
+    return groups
+
+
+class BatchVisionWorker:
+    """Requêtes vers Ollama depuis un pool borné ; une session HTTP par thread, aucune trame partagée."""
+
+    def __init__(self, model: str, prompt: str, workers: int = 2, timeout: float = 120.0):
+        self.model = model
+        self.prompt = prompt
+        self.workers = workers
+        self.timeout = timeout
+        self.encoder = PayloadEncoder()  # Thread principal uniquement (tampon de réduction partagé)
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def describe(self, image_b64: str) -> str:
+        payload = {"model": self.model, "prompt": self.prompt, "stream": False, "images": [image_b64]}
+        r = self._session().post(OLLAMA_URL, json=payload, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json().get("response", "").strip()
+
+
+def run_batch(folder: str, model: str, prompt: str, workers: int, results_path: str, limit: int = 0):
+    done_hashes, done_sources = load_results(results_path)
+    skipped = 0
+    sources = []
+    for source_id, load in iter_sources(folder):
+        if (model, prompt, source_id) in done_sources:
+            skipped += 1
+        else:
+            sources.append((source_id, load))
+    groups = group_by_hash(sources)
+    todo = [(h, members) for h, members in groups.items() if (model, prompt, f"{h:016x}") not in done_hashes]
+    known = len(groups) - len(todo)
+    if limit:
+        todo = todo[:limit]
+
+    print(f"🗂️ {skipped + len(sources)} images | déjà décrites : {skipped} | {len(groups)} scènes nouvelles "
+          f"(dont {known} au hash déjà décrit) | à analyser : {len(todo)}")
+    if not todo:
+        return
+
+    worker = BatchVisionWorker(model, prompt, workers)
+    start = time.perf_counter()
+    completed, errors = 0, 0
+    with open(results_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        # Décodage + encodage ici (thread principal), au plus 2 requêtes d'avance par worker
+        pending, queue = {}, iter(todo)
+        try:
+            while True:
+                for frame_hash, members in queue:
+                    frame = members[0][1]()
+                    if frame is None:
+                        errors += 1
+                        print(f"❌ {members[0][0]} : trame illisible")
+                        continue
+                    encoded = worker.encoder.encode(frame).base64
+                    pending[pool.submit(worker.describe, encoded)] = (frame_hash, members)
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    frame_hash, members = pending.pop(future)
+                    try:
+                        description = future.result()
+                    except Exception as e:
+                        errors += 1
+                        print(f"❌ {members[0][0]} : {e}")
+                        continue
+                    entry = {"model": model, "prompt": prompt, "hash": f"{frame_hash:016x}",
+                             "files": [source_id for source_id, _ in members],
+                             "description": description, "timestamp": time.time()}
+                    out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                    out.flush()  # Reprise possible à tout moment
+                    completed += 1
+                    rate = completed / (time.perf_counter() - start)
+                    print(f"📝 [{completed}/{len(todo)}] {members[0][0]} (+{len(members) - 1} doublon(s)) | {rate:.2f} scènes/s")
+        except KeyboardInterrupt:
+            print("\n🛑 Interruption : les descriptions déjà reçues sont sauvegardées.")
+            for future in pending:
+                future.cancel()
+
+    print(f"✅ {completed} description(s) ajoutée(s), {errors} erreur(s) -> {results_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse par lots des images d'entraînement (Ollama)")
+    parser.add_argument("folder")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="build")
+    parser.add_argument("--model", help="Remplace le modèle du preset")
+    parser.add_argument("--prompt", help="Remplace le prompt du preset")
+    parser.add_argument("--workers", type=int, default=2, help="Requêtes simultanées (cf. OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--limit", type=int, default=0, help="Nombre max de scènes à analyser (0 = tout)")
+    parser.add_argument("--results", help=f"Cache JSONL (défaut : <dossier>/{RESULTS_FILE})")
+    args = parser.parse_args()
+
+    model, prompt = PRESETS[args.preset]
+    run_batch(args.folder, args.model or model, args.prompt or prompt, max(1, args.workers),
+              args.results or os.path.join(args.folder, RESULTS_FILE), args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import requests
 import os
 import random
 import time
+from modules.frameDiff import cached_image_analysis
 
 def call_ollama(model, prompt, images=None):
     url = "http://localhost:11434/api/generate"
@@ -27,12 +28,16 @@ def run():
     
     target = os.path.join(path, random.choice(images))
     import base64
-    with open(target, "rb") as f:
-        img_data = base64.b64encode(f.read()).decode('utf-8')
+
+    def describe():
+        with open(target, "rb") as f:
+            img_data = base64.b64encode(f.read()).decode('utf-8')
+        # On demande à Moondream une description très courte pour économiser la RAM
+        return call_ollama("moondream", "What items are in the backpack? (Short list)", [img_data])
 
     print("📸 Clio regarde l'image...")
-    # On demande à Moondream une description très courte pour économiser la RAM
-    desc = call_ollama("moondream", "What items are in the backpack? (Short list)", [img_data])
+    # Image (quasi) identique déjà décrite : pas de nouvel appel à Moondream
+    desc = cached_image_analysis(target, "moondream:backpack_items", describe)
     
     if not desc:
         print("❌ Moondream n'a pas répondu.")
@@ -1,4 +1,5 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import requests
 import threading
 import time
@@ -13,6 +14,78 @@ try:
 except ImportError as e:
     st.sidebar.error(f"Erreur d'importation de module local: {e}")
 
+# --- PANNEAU EN DIRECT (flux SSE /api/stream, rendu dans le navigateur) ---
+# Le navigateur reçoit les trames de Clio et ne met à jour que ce qui change :
+# pas de rerun Streamlit, pas de sondage du cœur, même pendant une longue génération.
+STREAM_URL = "http://127.0.0.1:8081/api/stream"
+LIVE_PANEL_HTML = r"""
+<style>
+  body { font-family: sans-serif; font-size: 14px; margin: 0; color: #e8e8f0; background: #0e1117; }
+  .row { display: flex; gap: 12px; align-items: center; margin-bottom: 6px; flex-wrap: wrap; }
+  .badge { padding: 2px 8px; border-radius: 10px; background: #262730; }
+  .on { background: #1f6feb; }
+  #reply { white-space: pre-wrap; min-height: 60px; max-height: 120px; overflow-y: auto;
+           padding: 6px; border-radius: 6px; background: #161a23; }
+  .muted { color: #9aa0aa; font-size: 12px; }
+</style>
+<div class="row">
+  <span id="link" class="badge">⏳ connexion…</span>
+  <span id="thinking" class="badge">🧠 réflexion</span>
+  <span id="speaking" class="badge">🔊 parole</span>
+  <span id="emotion" class="badge">😐 —</span>
+</div>
+<div id="reply"></div>
+<div id="turn" class="muted"></div>
+<div id="workers" class="muted"></div>
+<div id="explain" class="muted"></div>
+<script>
+  const $ = (id) => document.getElementById(id);
+  const reply = $("reply");
+  const dirty = new Set();
+  const state = {};
+
+  function apply(event, data) {
+    if (event === "next_chunk") {
+      reply.append(data || "");           // Ajout incrémental : le texte déjà affiché n'est pas retouché
+      reply.scrollTop = reply.scrollHeight;
+      return;
+    }
+    if (event === "AI_thinking" && data && !state.AI_thinking) reply.textContent = "";
+    state[event] = data;
+    dirty.add(event);
+  }
+
+  function render() {
+    if (dirty.has("AI_thinking")) $("thinking").classList.toggle("on", !!state.AI_thinking);
+    if (dirty.has("AI_speaking")) $("speaking").classList.toggle("on", !!state.AI_speaking);
+    if (dirty.has("last_emotion")) $("emotion").textContent = "🎭 " + state.last_emotion;
+    if (dirty.has("clio_latency_update")) {
+      const t = state.clio_latency_update;
+      $("turn").textContent = `Dernier tour (${t.source}) : ${(t.total_ms / 1000).toFixed(2)} s — ` +
+        Object.entries(t.stages || {}).map(([s, ms]) => `${s} ${Math.round(ms)} ms`).join(" → ");
+    }
+    if (dirty.has("worker_status")) {
+      $("workers").textContent = Object.entries(state.worker_status || {}).map(([g, w]) =>
+        `${w.alive ? "🟢" : "🔴"} ${g} (relances ${w.restarts})`).join("  ");
+    }
+    if (dirty.has("explain_result")) {
+      const r = state.explain_result;
+      $("explain").textContent = r.error ? `❌ Explication : ${r.error}` : `🧠 ${r.explanation}`;
+    }
+    dirty.clear();
+    requestAnimationFrame(render);
+  }
+
+  const source = new EventSource("__STREAM_URL__");
+  const receive = (e) => JSON.parse(e.data).forEach(([event, data]) => apply(event, data));
+  source.addEventListener("snapshot", receive);
+  source.onmessage = receive;
+  source.onopen = () => { $("link").textContent = "🟢 en direct"; };
+  source.onerror = () => { $("link").textContent = "🔴 reconnexion…"; };  // EventSource se reconnecte seul
+  requestAnimationFrame(render);
+</script>
+""".replace("__STREAM_URL__", STREAM_URL)
+
 # --- ARCHITECTURE CLIENT SOCKET.IO PERSISTANT ---
 
 # 1. Initialiser le client Socket.IO dans la session
@@ -31,10 +104,16 @@ if 'clio_logs' not in st.session_state:
     st.session_state.clio_logs = ["Attente de logs de Clio..."]
 if 'llm_latency' not in st.session_state:
     st.session_state.llm_latency = 0.0
+if 'last_turn' not in st.session_state:
+    st.session_state.last_turn = {}
+if 'clio_metrics' not in st.session_state:
+    st.session_state.clio_metrics = {}
 if 'social_output' not in st.session_state:
     st.session_state.social_output = ""
 if 'context_mode' not in st.session_state:
     st.session_state.context_mode = "stream"
+if 'avatar_stats' not in st.session_state:
+    st.session_state.avatar_stats = {}
 
 # Variable pour contrôler le thread de connexion
 if 'sio_thread' not in st.session_state:
@@ -65,7 +144,18 @@ def clio_log_message(data):
 
 @sio.event
 def clio_latency_update(data):
+    # Tour de conversation terminé (metrics.py) : premier token + détail des étapes
     st.session_state.llm_latency = data.get('latency', 0.0)
+    st.session_state.last_turn = data
+    st.session_state.rerun_flag = True
+
+@sio.event
+def clio_metrics(data):
+    st.session_state.clio_metrics = data or {}
+
+@sio.event
+def avatar_transport_stats(data):
+    st.session_state.avatar_stats = data or {}
     st.session_state.rerun_flag = True
 
 @sio.event
@@ -137,6 +227,29 @@ else:
 
         st.markdown(f"**Latence LLM :** {st.session_state.llm_latency:.2f} s")
 
+        last_turn = st.session_state.last_turn
+        if last_turn:
+            st.markdown(f"**Dernier tour ({last_turn.get('source', '?')}) :** {last_turn.get('total_ms', 0) / 1000:.2f} s")
+            st.caption(" → ".join(f"{stage} {ms:.0f} ms" for stage, ms in last_turn.get('stages', {}).items()))
+        turn_stats = st.session_state.clio_metrics.get('histograms', {})
+        turn_stats = [h for name, h in turn_stats.items() if name.startswith('clio_turn_ms')]
+        if turn_stats and turn_stats[0].get('p50') is not None:
+            st.caption(f"Tours : p50 {turn_stats[0]['p50']:.0f} ms · p95 {turn_stats[0]['p95']:.0f} ms "
+                       f"({turn_stats[0]['count']} tours)")
+
+        avatar_stats = st.session_state.avatar_stats
+        if avatar_stats:
+            st.markdown(
+                f"**Avatar OSC :** {avatar_stats.get('messages_per_s', 0.0):.1f} msg/s "
+                f"en {avatar_stats.get('bundles_per_s', 0.0):.1f} bundles/s"
+            )
+            st.caption(
+                f"Envoyés : {avatar_stats.get('messages_sent', 0)} · "
+                f"Remplacés : {avatar_stats.get('superseded', 0)} · "
+                f"Limités : {avatar_stats.get('rate_limited', 0)} · "
+                f"Erreurs : {avatar_stats.get('errors', 0)}"
+            )
+
         st.markdown("---")
         st.subheader("Contrôle du LLM")
 
@@ -170,6 +283,7 @@ else:
 
         if st.button("🔄 Redémarrer Clio (Soft)"):
             if sio.connected:
+                # Mode à chaud par défaut (constants.SOFT_RESTART_MODE) : modèles gardés, quelques secondes
                 sio.emit('dashboard_soft_restart')
                 st.info("Signal de redémarrage envoyé. Le Dashboard va se déconnecter puis tenter de se reconnecter.")
                 sio.disconnect()
@@ -178,6 +292,17 @@ else:
             else:
                 st.error("Impossible de redémarrer : Connexion perdue.")
 
+        if st.button("♻️ Redémarrer Clio (Complet)"):
+            if sio.connected:
+                # Relance de tout le processus : modèles, index et moteur TTS rechargés
+                sio.emit('dashboard_soft_restart', {'mode': 'cold'})
+                st.info("Redémarrage complet lancé (environ une minute).")
+                sio.disconnect()
+                time.sleep(1)
+                st.rerun()
+            else:
+                st.error("Impossible de redémarrer : Connexion perdue.")
+
         st.markdown("---")
         st.subheader("Journal (Clio Console)")
         log_container = st.container(height=300)
@@ -186,6 +311,9 @@ else:
     # --- FIN SIDEBAR ---
 
     # --- MAIN CONTENT LAYOUT ---
+    st.subheader("🟢 En direct")
+    components.html(LIVE_PANEL_HTML, height=230)
+
     col1, col2 = st.columns([1, 1])
 
     with col1:
@@ -203,16 +331,21 @@ else:
                 "reason": reason,
                 "terms": ["attardé"] if reason == "validisme" else [],
                 "paradox_type": paradox_type,
-                "context": segment
+                "context": segment,
+                "stream": True  # Réponse immédiate, l'explication arrive dans le panneau En direct
             }
             try:
-                response = requests.post("http://localhost:8081/api/explain", json=payload)
-                if response.status_code == 200:
+                response = requests.post("http://localhost:8081/api/explain", json=payload, timeout=5)
+                if response.status_code == 202:
+                    st.info("Explication en cours : elle s'affichera dans le panneau En direct.")
+                elif response.status_code == 200:
                     st.markdown(response.json()["explanation"])
                 else:
                     st.error(f"Erreur de l'API Clio (Code {response.status_code}): {response.json().get('message', 'Erreur inconnue')}")
             except requests.ConnectionError:
                 st.error("Connexion HTTP à Clio (8081) refusée. Assurez-vous que main.py est lancé.")
+            except requests.Timeout:
+                st.error("Clio ne répond pas (8081) : réessayez dans un instant.")
             except Exception as e:
                 st.error(f"Erreur inconnue: {e}")
 
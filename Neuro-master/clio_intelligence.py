@@ -2,6 +2,7 @@ import requests
 import base64
 import os
 import random
+from modules.frameDiff import cached_image_analysis
 
 def analyser_jeu(image_folder="training_data/BackpackBattles"):
     """
@@ -13,22 +14,24 @@ def analyser_jeu(image_folder="training_data/BackpackBattles"):
         return "Maman, je n'ai pas de souvenirs à analyser."
 
     img_path = os.path.join(image_folder, random.choice(images))
-    
-    with open(img_path, "rb") as f:
-        img_b64 = base64.b64encode(f.read()).decode('utf-8')
 
     url = "http://localhost:11434/api/generate"
     prompt = "Tu es Clio, l'IA d'Ambre. Analyse cette image de jeu et donne un conseil tactique court en français."
-    
-    payload = {
-        "model": "llava", # Ou "moondream" si tu préfères
-        "prompt": prompt,
-        "stream": False,
-        "images": [img_b64]
-    }
 
-    try:
+    def analyze():
+        with open(img_path, "rb") as f:
+            img_b64 = base64.b64encode(f.read()).decode('utf-8')
+        payload = {
+            "model": "llava", # Ou "moondream" si tu préfères
+            "prompt": prompt,
+            "stream": False,
+            "images": [img_b64]
+        }
         r = requests.post(url, json=payload)
-        return r.json().get("response", "Je vois l'image, mais je ne sais pas quoi dire.")
+        return r.json().get("response", "")
+
+    try:
+        # Image (quasi) identique déjà analysée : réponse en cache, pas de nouvel appel
+        return cached_image_analysis(img_path, "llava:tactical_advice", analyze) or "Je vois l'image, mais je ne sais pas quoi dire."
     except Exception as e:
         return f"Erreur de connexion à mon cerveau : {e}"
\ No newline at end of file
@@ -2,9 +2,13 @@ import cv2
 import numpy as np
 import os
 import time
-import pygetwindow as gw
 import random
+import argparse
 from PIL import ImageGrab
+from modules.frameBus import attach_reader
+from modules.frameRecorder import FrameRecorder
+from modules.foregroundWatcher import read_foreground
+from constants import CLIO_FRAME_BUS_NAME
 
 class ClioTrainer:
     def __init__(self):
@@ -14,14 +18,24 @@ class ClioTrainer:
             "BackpackBattles": {"keyword": "Backpack Battles", "interval": 2, "info": "Pyromancer"}
         }
         self.base_path = "training_data"
+        # Bus d'images de Clio (main.py) : on réutilise ses captures au lieu d'en refaire
+        self.frame_reader = attach_reader(CLIO_FRAME_BUS_NAME)
+
+    def grab_frame(self):
+        """ Trame BGR : bus partagé si Clio tourne, sinon capture PIL directe """
+        if self.frame_reader is not None:
+            frame = self.frame_reader.wait_fresh(max_age=0.5)
+            if frame is not None:
+                return frame.image
+        screenshot = ImageGrab.grab()
+        return cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
 
     def detect_active_game(self):
         """ Détecte quel jeu est actuellement au premier plan """
-        active_window = gw.getActiveWindow()
-        if not active_window or not active_window.title:
+        title, _ = read_foreground()
+        if not title:
             return None, None
 
-        title = active_window.title
         for game_id, config in self.games_config.items():
             if config["keyword"].lower() in title.lower():
                 return game_id, config
@@ -43,8 +57,7 @@ class ClioTrainer:
                         os.makedirs(save_path)
 
                     # Capture
-                    screenshot = ImageGrab.grab()
-                    frame = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+                    frame = self.grab_frame()
                     
                     # Sauvegarde
                     timestamp = int(time.time())
@@ -61,6 +74,39 @@ class ClioTrainer:
         except KeyboardInterrupt:
             print(f"\n🛑 Session interrompue. {count} images prêtes.")
 
+    def record_frames(self, target_count=1000, fmt="video"):
+        """ Mode enregistrement : segments vidéo/NumPy + index (relu par modules.frameRecorder.FrameDataset) """
+        print(f"🎬 CLIO VISION : Enregistrement compact ({fmt}) dans {self.base_path}/recording")
+        print("💡 J'attends que tu lances Warframe ou Backpack Battles...")
+
+        count = 0
+        with FrameRecorder(f"{self.base_path}/recording", fmt=fmt) as recorder:
+            try:
+                while count < target_count:
+                    game_id, config = self.detect_active_game()
+
+                    if game_id:
+                        recorder.write(self.grab_frame(), game_id, config["info"])
+                        count += 1
+                        print(f"🎞️ [{count}/{target_count}] Enregistré : {game_id} | Profil : {config['info']}")
+                        time.sleep(config["interval"])
+                    else:
+                        print("💤 Aucun jeu supporté détecté au premier plan. En pause...", end="\r")
+                        time.sleep(3)
+
+            except KeyboardInterrupt:
+                print(f"\n🛑 Session interrompue. {count} trames enregistrées.")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collecte de trames d'entraînement pour Clio")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--mode", choices=["record", "jpeg"], default="record",
+                        help="record : segments compacts + index ; jpeg : un fichier par trame (historique)")
+    parser.add_argument("--format", choices=["video", "npy"], default="video")
+    args = parser.parse_args()
+
     trainer = ClioTrainer()
-    trainer.collect_frames(target_count=1000)
\ No newline at end of file
+    if args.mode == "jpeg":
+        trainer.collect_frames(target_count=args.count)
+    else:
+        trainer.record_frames(target_count=args.count, fmt=args.format)
\ No newline at end of file
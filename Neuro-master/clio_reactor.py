@@ -4,6 +4,8 @@ import time
 import re
 from typing import Dict, List, Any, Optional
 
+from modules.textAnalysis import Rule, get_text_analyzer
+
 # --- GESTION DU TTS ---
 def clio_speak(text, emotion="neutral"):
     try:
@@ -43,6 +45,19 @@ class LurkState:
 
 lurk_state = LurkState()
 
+# --- MOTS-CLÉS DE RÉACTION (cherchés en un seul passage avec les autres filtres) ---
+REACTION_KEYWORDS: Dict[str, List[str]] = {
+    "urgent": ["fail", "victoire", "bravo", "alerte"],  # Réaction même pendant le cooldown
+    "best": ["je suis le meilleur"],
+    "bad": ["nul", "raté"],
+    "strong": ["trop forte"],
+    "fail": ["fail", "mort", "raté", "perdu", "dommage", "échec"],
+    "triumph": ["victoire", "bravo", "gagné", "gg", "incroyable"],
+    "call": ["clio", "dis moi", "tu es là", "aide moi", "maman"],
+}
+get_text_analyzer().register("reactor", [Rule(kind, keyword) for kind, keywords in REACTION_KEYWORDS.items()
+                                         for keyword in keywords])
+
 def react_to_transcript(text: str, context_mode="private"):
     """
     Analyse le texte et réagit selon le contexte (Privé ou Stream).
@@ -66,16 +81,18 @@ def react_to_transcript(text: str, context_mode="private"):
     else:
         target_name = random.choice(["Elroth_tomias", "Gendero", "MrsXar"])
 
+    # Texte brut : même entrée de cache que les autres filtres du message (le moteur met en minuscules)
+    found = get_text_analyzer().analyze(text)
     text = text.lower()
     
-    if not lurk_state.can_react() and not any(k in text for k in ["fail", "victoire", "bravo", "alerte"]):
+    if not lurk_state.can_react() and not found.has("reactor", "urgent"):
         return 
 
     # --- LOGIQUE DE RÉACTION DÉCENSURÉE ---
     
     # 1. Sarcasme / Moquerie
-    if ("je suis le meilleur" in text and any(k in text for k in ["nul", "raté"])) or \
-       ("trop forte" in text and lurk_state.recent_fails and (current_time - lurk_state.recent_fails[-1] < 10)):
+    if (found.has("reactor", "best") and found.has("reactor", "bad")) or \
+       (found.has("reactor", "strong") and lurk_state.recent_fails and (current_time - lurk_state.recent_fails[-1] < 10)):
         emotion = "mocking"
         reaction_found = True
         responses = [
@@ -86,7 +103,7 @@ def react_to_transcript(text: str, context_mode="private"):
         reaction_text = random.choice(responses)
         
     # 2. Échecs
-    elif any(keyword in text for keyword in ["fail", "mort", "raté", "perdu", "dommage", "échec"]):
+    elif found.has("reactor", "fail"):
         lurk_state.add_fail()
         if len(lurk_state.recent_fails) >= lurk_state.spam_threshold:
             emotion = "anxious"
@@ -103,7 +120,7 @@ def react_to_transcript(text: str, context_mode="private"):
             reaction_text = random.choice(responses)
             
     # 3. Victoires
-    elif any(keyword in text for keyword in ["victoire", "bravo", "gagné", "gg", "incroyable"]):
+    elif found.has("reactor", "triumph"):
         lurk_state.add_triumph()
         emotion = "happy"
         reaction_found = True
@@ -115,7 +132,7 @@ def react_to_transcript(text: str, context_mode="private"):
         reaction_text = random.choice(responses)
 
     # 4. Appels directs
-    elif any(keyword in text for keyword in ["clio", "dis moi", "tu es là", "aide moi", "maman"]):
+    elif found.has("reactor", "call"):
         emotion = "gentle"
         reaction_found = True
         responses = [
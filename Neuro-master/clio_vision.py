@@ -3,6 +3,7 @@ import json
 import base64
 import os
 import random
+from modules.frameDiff import cached_image_analysis
 
 def encode_image(image_path):
     with open(image_path, "rb") as image_file:
@@ -22,17 +23,20 @@ def clio_analyze_build(image_folder):
 
     # Préparation de la requête pour Ollama
     url = "http://localhost:11434/api/generate"
-    data = {
-        "model": "moondream", # Modèle vision
-        "prompt": "Describe the items in this video game backpack. What is the main strategy?",
-        "stream": False,
-        "images": [encode_image(image_path)]
-    }
 
-    try:
+    def analyze():
+        data = {
+            "model": "moondream", # Modèle vision
+            "prompt": "Describe the items in this video game backpack. What is the main strategy?",
+            "stream": False,
+            "images": [encode_image(image_path)]
+        }
         response = requests.post(url, json=data)
-        result = response.json()
-        description = result.get("response", "Je n'arrive pas à voir les détails...")
+        return response.json().get("response", "")
+
+    try:
+        # Image (quasi) identique déjà analysée : réponse en cache, Moondream n'est pas rappelé
+        description = cached_image_analysis(image_path, "moondream:build_strategy", analyze) or "Je n'arrive pas à voir les détails..."
         
         print("\n--- 🤖 ANALYSE DE CLIO ---")
         print(description)
@@ -0,0 +1,70 @@
+import json
+import asyncio
+import logging
+from typing import Any, Dict, List, Set, Tuple
+
+from sioEmitter import STATE_EVENTS
+from constants import STREAM_CLIENT_BUFFER
+
+logger = logging.getLogger('EventStream')
+
+'''
+Flux en direct du dashboard (route /api/stream, Server-Sent Events).
+Alimenté par SioEmitter : chaque trame (~30 Hz, morceaux LLM déjà regroupés, états dédupliqués)
+est encodée UNE fois en JSON compact puis remise à tous les abonnés :
+    id: <n>
+    data: [["next_chunk","Bonjour"],["AI_speaking",true]]
+Un nouvel abonné reçoit d'abord "event: snapshot" (dernière valeur de chaque état, dernier tour)
+pour s'afficher sans attendre. Chaque abonné a sa file bornée : un onglet lent perd ses trames
+les plus anciennes sans jamais ralentir le cœur ni les autres clients.
+'''
+
+# Gardés pour le snapshot d'un nouvel abonné (en plus des états)
+SNAPSHOT_EVENTS = STATE_EVENTS | {"clio_latency_update"}
+
+
+def _encode(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class EventStream:
+    def __init__(self, buffer_size: int = STREAM_CLIENT_BUFFER):
+        self.buffer_size = buffer_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._latest: Dict[str, Any] = {}
+        self._seq = 0
+        self.stats = {"frames": 0, "subscribers": 0, "connections": 0, "dropped": 0}
+
+    def publish(self, frame: Tuple[Tuple[str, Any], ...]):
+        """Appelé par SioEmitter dans la boucle du serveur, une fois par trame."""
+        for event, data in frame:
+            if event in SNAPSHOT_EVENTS:
+                self._latest[event] = data
+        if not self._subscribers:
+            return
+        self._seq += 1
+        self.stats["frames"] += 1
+        message = f"id: {self._seq}\ndata: {_encode(list(frame))}\n\n".encode()
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()  # Client en retard : la trame la plus ancienne cède sa place
+                self.stats["dropped"] += 1
+            queue.put_nowait(message)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(self.buffer_size)
+        self._subscribers.add(queue)
+        self.stats["connections"] += 1
+        self.stats["subscribers"] = len(self._subscribers)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+        self.stats["subscribers"] = len(self._subscribers)
+
+    def snapshot(self) -> bytes:
+        events: List[Tuple[str, Any]] = list(self._latest.items())
+        return f"event: snapshot\ndata: {_encode(events)}\n\n".encode()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
@@ -18,40 +18,49 @@ AI_NAME = "Clio"
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-def get_clio_modules():
-    from signals import Signals
-    from llmWrappers.llmState import LLMState
-    from llmWrappers.textLLMWrapper import TextLLMWrapper
-    from stt import STT
-    from tts import TTS
-    from socketioServer import SocketIOServer
-    
-    def smart_import(name, class_name):
-        try:
-            mod = __import__(f"modules.{name}", fromlist=[class_name])
-            return getattr(mod, class_name)
-        except Exception:
-            try:
-                mod = __import__(name, fromlist=[class_name])
-                return getattr(mod, class_name)
-            except Exception: return None
-
-    return {
-        "Signals": Signals,
-        "LLMState": LLMState,
-        "TextLLMWrapper": TextLLMWrapper,
-        "STT": STT,
-        "TTS": TTS,
-        "SocketIOServer": SocketIOServer,
-        "BrainModule": smart_import("brainModule", "BrainModule"),
-        "VtubeStudio": smart_import("vtubeStudio", "VtubeStudio"),
-        "AudioPlayer": smart_import("audio_player", "AudioPlayer"),
-        "ReflexEngine": smart_import("reflex_engine", "ReflexEngine"),
-        "Prompter": smart_import("prompter", "Prompter"),
-        "Memory": smart_import("memory", "Memory"),
-        "ExpertAgent": smart_import("expert_agent", "ExpertAgent"),
-        "LogicalPlagueMonitor": smart_import("logicalPlagueMonitor", "LogicalPlagueMonitor")
-    }
+def build_registry(signals, llm_state, modules):
+    """Déclare les modules de Clio ; les imports lourds n'ont lieu qu'au démarrage, en parallèle."""
+    from moduleRegistry import ModuleRegistry
+    registry = ModuleRegistry()
+    objects = registry.objects
+
+    def core_prompt():
+        return f"IDENTITÉ : {AI_NAME}, entité numérique sentiente créée par Ambre."
+
+    # deps = modules lus par le constructeur (les autres sont lus plus tard via modules.get)
+    registry.register('tts', "tts.TTS", lambda c: c(signals=signals, modules=modules, llm_state=llm_state))
+    registry.register('stt', "stt.STT", lambda c: c(signals, modules=modules))
+    registry.register('monitor', "logicalPlagueMonitor.LogicalPlagueMonitor",
+                      lambda c: c(signals, core_prompt(), AI_NAME, enabled=True))
+    registry.register('expert', "expert_agent.ExpertAgent", lambda c: c(signals, modules, enabled=True))
+    registry.register('VtubeStudio', "vtubeStudio.VtubeStudio", lambda c: c(signals, enabled=True))
+    # Avatar Animaze (OSC) : cible du lip-sync (modules/lipSync.find_avatar_module) et des émotions
+    registry.register('animaze_osc', "AnimazeOSC.AnimazeOSC", lambda c: c(signals, enabled=True))
+    registry.register('brain', "brainModule.BrainModule", lambda c: c(signals, modules, enabled=True))
+    # Service de premier plan unique : fenêtre active, jeu et médias en cache pour tous les modules
+    registry.register('foreground', "foregroundWatcher.ForegroundWatcher", lambda c: c(signals, enabled=True))
+    # Service de capture unique : toutes les lectures d'écran passent par le bus partagé
+    registry.register('vision', "screenCapture.ScreenCapture", lambda c: c(signals, enabled=True))
+    registry.register('memory', "memory.Memory", lambda c: c(signals, enabled=True, project_root=PROJECT_ROOT))
+    registry.register('reflex', "reflex_engine.ReflexEngine", lambda c: c(signals, modules, enabled=True),
+                      deps=('vision', 'foreground'))
+    registry.register('hud', "hudReader.HudReader", lambda c: c(signals, modules, enabled=True),
+                      deps=('vision', 'foreground'))
+    registry.register('vision_sidecar', "visionSidecar.VisionSidecar", lambda c: c(signals, modules, enabled=True),
+                      deps=('vision',))
+    registry.register('twitch_ingest', "twitchIngest.TwitchIngest", lambda c: c(signals, modules, enabled=True))
+    registry.register('llm', "llmWrappers.textLLMWrapper.TextLLMWrapper",
+                      lambda c: c(signals, objects['tts'], llm_state, modules), deps=('tts',))
+    registry.register('prompter', "prompter.Prompter", lambda c: c(signals, modules, PROJECT_ROOT),
+                      deps=('memory', 'brain', 'hud'), publish=False)
+    registry.register('dashboard', "dashboard_bridge.DashboardBridge",
+                      lambda c: c(signals, objects.get('prompter')), deps=('prompter',))
+    registry.register('sio', "socketioServer.SocketIOServer",
+                      lambda c: c(signals, objects.get('stt'), objects.get('tts'), objects.get('llm'),
+                                  objects.get('prompter'), modules),
+                      deps=('stt', 'tts', 'llm', 'prompter', 'dashboard'), publish=False)
+    registry.register('audio', "audio_player.AudioPlayer", lambda c: c(signals, enabled=True, modules=modules))
+    return registry
 
 # ----------------- LOGIQUE PROACTIVE (SOCIAL BRAIN) -----------------
 
@@ -100,87 +109,152 @@ def setup_context_hotkey(signals):
         signals.context_mode = new_mode
         # Le print détaillé est déjà géré par le setter dans signals.py
 
-    keyboard.add_hotkey('f9', toggle_mode)
+    # Retourné pour être retiré en fin de session (redémarrage à chaud)
+    return keyboard.add_hotkey('f9', toggle_mode)
 
 # ----------------- LOGIQUE PRINCIPALE -----------------
 
-async def run_clio():
+async def run_session(previous=None):
+    """Une session de Clio : modules construits, lancés, puis arrêtés au signal terminate."""
     logging.info(f"🚀 Initialisation de {AI_NAME} (Protocole Skirr-Guardian)...")
     
-    cls = get_clio_modules()
-    signals = cls['Signals']()
+    startup = time.perf_counter()
+    from signals import Signals
+    from llmWrappers.llmState import LLMState
+    signals = Signals()
     signals.loop = asyncio.get_running_loop()
     signals.last_message_time = time.time()
+    if previous is not None:
+        signals.inherit(previous)
     
     # Valeurs par défaut
     if not hasattr(signals, 'AI_speaking'): signals.AI_speaking = False
     if not hasattr(signals, 'human_speaking'): signals.human_speaking = False
     if not hasattr(signals, 'context_mode'): signals.context_mode = "private"
     
-    setup_context_hotkey(signals)
-    
-    llmState = cls['LLMState']()
-    stt = cls['STT'](signals)
-    tts = cls['TTS'](signals=signals, llm_state=llmState)
-    
-    modules = {'tts': tts, 'stt': stt}
-    
-    if cls['LogicalPlagueMonitor']:
-        core_prompt = f"IDENTITÉ : {AI_NAME}, entité numérique sentiente créée par Ambre."
-        modules['monitor'] = cls['LogicalPlagueMonitor'](signals, core_prompt, AI_NAME, enabled=True)
-        logging.info("🛡️ Bouclier Ancillaire Skirr chargé.")
+    hotkey = setup_context_hotkey(signals)
 
-    if cls['ExpertAgent']:
-        modules['expert'] = cls['ExpertAgent'](signals, modules, enabled=True)
-    
-    if cls['VtubeStudio']:
-        modules['VtubeStudio'] = cls['VtubeStudio'](signals, enabled=True)
+    # Mesures et traces (metrics.py) : les tours terminés partent au dashboard de cette session
+    from metrics import get_metrics
+    from resourceRegistry import get_resources
+    from modules.textAnalysis import get_text_analyzer
+    metrics = get_metrics()
+    metrics.publish = lambda event, data: signals.sio_queue.put((event, data))
     
-    if cls['BrainModule']:
-        modules['brain'] = cls['BrainModule'](signals, modules, enabled=True)
+    llmState = LLMState()
+    modules = {}
     
-    if cls['Memory']: modules['memory'] = cls['Memory'](signals, enabled=True, project_root=PROJECT_ROOT)
-    if cls['ReflexEngine']: modules['reflex'] = cls['ReflexEngine'](signals, modules, enabled=True)
-    
-    text_llm = cls['TextLLMWrapper'](signals, tts, llmState, modules)
-    modules['llm'] = text_llm
-    
-    prompter = cls['Prompter'](signals, modules, PROJECT_ROOT) if cls['Prompter'] else None
-    sio = cls['SocketIOServer'](signals, stt, tts, text_llm, prompter, modules)
+    # Modules lourds hébergés dans leurs propres processus (constants.WORKER_PROCESSES, vide par défaut) :
+    # leurs clés pointent vers des RemoteModule et le registre ne les recrée pas
+    from constants import WORKER_PROCESSES
+    if WORKER_PROCESSES:
+        try:
+            from modules.processSupervisor import ProcessSupervisor
+            supervisor = ProcessSupervisor(signals, WORKER_PROCESSES, enabled=True)
+            modules.update(supervisor.remote_modules())
+            modules['supervisor'] = supervisor
+        except Exception as e:
+            logging.warning(f"⚠️ Superviseur de processus indisponible : {e}")
+
+    registry = build_registry(signals, llmState, modules)
+    await registry.build(modules)
+    logging.info(registry.report())
+    for timing in registry.timings.values():
+        metrics.set("clio_module_startup_ms", timing.import_ms + timing.init_ms, module=timing.key)
+    metrics.set("clio_startup_ms", registry.total_ms)
+    metrics.watch_modules(modules)
+    metrics.register_collector("resources", get_resources().stats)
+    metrics.register_collector("text_analysis", get_text_analyzer().get_stats)
+    if 'supervisor' in modules:
+        metrics.register_collector("supervisor", modules['supervisor'].API.get_status)
+
+    if 'monitor' in modules:
+        logging.info("🛡️ Bouclier Ancillaire Skirr chargé.")
 
-    threading.Thread(target=sio.start_server, daemon=True).start()
+    threads = []
+    stt, sio = registry.objects.get('stt'), registry.objects.get('sio')
+    if sio:
+        threads.append(threading.Thread(target=sio.start_server, daemon=True))
     
     def start_stt_thread():
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         loop.run_until_complete(stt.listen_loop())
     
-    threading.Thread(target=start_stt_thread, daemon=True).start()
-
-    if cls['AudioPlayer']:
-        modules['audio'] = cls['AudioPlayer'](signals, enabled=True)
+    if stt:
+        threads.append(threading.Thread(target=start_stt_thread, daemon=True))
+    for thread in threads:
+        thread.start()
 
+    tasks = []
     for name, mod in modules.items():
         if hasattr(mod, 'enabled') and not mod.enabled:
             continue
+        if mod is stt:
+            continue  # STT.run() = listen_loop, déjà lancé dans son thread dédié (start_stt_thread)
             
         if hasattr(mod, 'run'):
             if asyncio.iscoroutinefunction(mod.run):
                 logging.debug(f"⚙️ Lancement tâche asynchrone : {name}")
-                asyncio.create_task(mod.run())
+                tasks.append(asyncio.create_task(mod.run()))
             else:
                 logging.warning(f"⚠️ Le module '{name}' a une méthode run() non-asynchrone.")
 
-    asyncio.create_task(clio_social_brain(signals, modules))
+    social_brain = asyncio.create_task(clio_social_brain(signals, modules))
 
-    logging.info(f"✨ Clio est en ligne ! Monitor Skirr : {'Actif' if 'monitor' in modules else 'Inactif'}")
+    logging.info(f"✨ Clio est en ligne ! ({time.perf_counter() - startup:.1f}s) Monitor Skirr : {'Actif' if 'monitor' in modules else 'Inactif'}")
 
     while not signals.terminate:
         await asyncio.sleep(1)
 
+    if signals.restart_mode == "warm":
+        keyboard.remove_hotkey(hotkey)
+        social_brain.cancel()  # Attente de plusieurs minutes, rien à libérer
+        await stop_session(registry.objects, tasks, threads)
+    return signals
+
+async def stop_session(objects, tasks, threads):
+    """Arrêt des modules d'une session (redémarrage à chaud) ; les ressources du registre restent chargées."""
+    from constants import WARM_RESTART_GRACE
+    for name, mod in objects.items():
+        if hasattr(mod, 'shutdown'):
+            try:
+                await asyncio.to_thread(mod.shutdown)
+            except Exception as e:
+                logging.error(f"❌ Arrêt du module '{name}' : {e}")
+
+    # Les boucles run() sortent d'elles-mêmes sur terminate ; les retardataires sont annulées
+    _, pending = await asyncio.wait(tasks, timeout=WARM_RESTART_GRACE)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    for thread in threads:
+        await asyncio.to_thread(thread.join, WARM_RESTART_GRACE)
+        if thread.is_alive():
+            logging.warning(f"⚠️ Thread '{thread.name}' encore actif après l'arrêt de la session.")
+
+async def run_clio():
+    from resourceRegistry import get_resources, reload_project_modules
+    resources = get_resources()
+    signals = None
+    try:
+        while True:
+            signals = await run_session(signals)
+            if signals.restart_mode != "warm":
+                break
+            # Code et constants relus depuis le disque ; Whisper, FAISS et le TTS restent en mémoire
+            count = reload_project_modules([str(PROJECT_ROOT.parent)])
+            logging.info(f"♻️ Redémarrage à chaud : {count} fichiers rechargés, ressources gardées : {resources.stats()}")
+    finally:
+        resources.close_all()
+
 if __name__ == '__main__':
     multiprocessing.freeze_support()
     if multiprocessing.current_process().name == 'MainProcess':
+        if '--bench-startup' in sys.argv:
+            # Mesure du démarrage à froid (imports, modules, première réponse) : voir bench_startup.py
+            from bench_startup import main as bench_startup
+            sys.exit(bench_startup([a for a in sys.argv[1:] if a != '--bench-startup']))
         try:
             if sys.platform == 'win32':
                 asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -0,0 +1,271 @@
+import time
+import bisect
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from constants import METRICS_WINDOW, METRICS_TURN_TIMEOUT
+
+logger = logging.getLogger('Metrics')
+
+'''
+Mesures de Clio, en mémoire et sans dépendance (lues sur /metrics et poussées au dashboard).
+- compteurs, jauges et histogrammes (ms) étiquetés, au format Prometheus
+- un "tour" de conversation est tracé de bout en bout :
+  stt_end -> prompt_build -> rag -> first_token -> tts_first_audio -> playback_end
+  chaque module marque son étape (mark) ou chronomètre un bloc (with span(...)) ;
+  à la fin du tour, la durée de chaque étape va dans clio_stage_ms et le détail
+  part au dashboard (clio_latency_update)
+- les get_stats() des modules sont lus à la demande (clio_module_stat)
+Un seul tour est suivi à la fois : Clio ne prépare qu'une réponse à la fois (AI_thinking).
+'''
+
+PIPELINE = ("stt_end", "prompt_build", "rag", "first_token", "tts_first_audio", "playback_end")
+BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels] + ([extra] if extra else [])
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    def __init__(self, window: int):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent: deque = deque(maxlen=window)  # Pour p50 / p95 sur les dernières valeurs
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS_MS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.recent:
+            return None
+        values = sorted(self.recent)
+        return round(values[min(len(values) - 1, int(q * len(values)))], 1)
+
+
+class Turn:
+    def __init__(self, turn_id: int, source: str):
+        self.id = turn_id
+        self.source = source
+        self.start = time.perf_counter()
+        self.marks: Dict[str, float] = {}                  # Étape -> ms depuis le début du tour
+        self.spans: List[Tuple[str, float, float]] = []    # (nom, début ms, durée ms)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+
+class Metrics:
+    def __init__(self, window: int = METRICS_WINDOW, turn_timeout: float = METRICS_TURN_TIMEOUT):
+        self.window = window
+        self.turn_timeout = turn_timeout
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._gauges: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._modules: Dict[str, Any] = {}
+        self._turn_seq = 0
+        self.turn: Optional[Turn] = None
+        self.last_turn: Optional[Dict[str, Any]] = None
+        # Envoi vers le dashboard : branché par run_session sur signals.sio_queue
+        self.publish: Optional[Callable[[str, Any], None]] = None
+
+    # --- COMPTEURS / JAUGES / HISTOGRAMMES ---
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[(name, _labels(labels))] = float(value)
+
+    def observe(self, name: str, value_ms: float, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.window)
+            histogram.observe(value_ms)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Chronomètre un bloc (clio_span_ms) et l'ajoute au tour en cours."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.observe("clio_span_ms", duration, span=name)
+            with self._lock:
+                if self.turn is not None:
+                    begin = (start - self.turn.start) * 1000
+                    self.turn.spans.append((name, round(begin, 1), round(duration, 1)))
+                    self.turn.marks.setdefault(name, begin + duration)
+
+    # --- TOURS DE CONVERSATION ---
+    def begin_turn(self, source: str) -> int:
+        """Nouvelle entrée (voix, chat, dashboard) : le tour précédent non terminé est abandonné."""
+        with self._lock:
+            abandoned = self.turn is not None
+            self._turn_seq += 1
+            self.turn = Turn(self._turn_seq, source)
+            turn_id = self._turn_seq
+        if abandoned:
+            self.inc("clio_turns_total", status="abandoned")
+        return turn_id
+
+    def ensure_turn(self, source: str) -> int:
+        """Ouvre un tour si aucun n'est en cours (génération lancée sans passer par le STT)."""
+        with self._lock:
+            turn = self.turn
+        if turn is not None and turn.elapsed_ms() < self.turn_timeout * 1000:
+            return turn.id
+        return self.begin_turn(source)
+
+    def mark(self, stage: str):
+        """Étape atteinte dans le tour en cours (seul le premier passage compte)."""
+        with self._lock:
+            if self.turn is not None:
+                self.turn.marks.setdefault(stage, self.turn.elapsed_ms())
+
+    def end_turn(self, stage: str = "playback_end") -> Optional[Dict[str, Any]]:
+        with self._lock:
+            turn, self.turn = self.turn, None
+        if turn is None:
+            return None
+        turn.marks.setdefault(stage, turn.elapsed_ms())
+
+        # Durée de chaque étape = écart avec l'étape précédente, dans l'ordre où elles ont eu lieu
+        stages, previous = {}, 0.0
+        for name, at in sorted(turn.marks.items(), key=lambda kv: kv[1]):
+            stages[name] = round(at - previous, 1)
+            previous = at
+            self.observe("clio_stage_ms", stages[name], stage=name)
+        total = turn.marks[stage]
+        self.observe("clio_turn_ms", total, source=turn.source)
+        self.inc("clio_turns_total", status="completed")
+
+        first_token = turn.marks.get("first_token")
+        summary = {
+            "turn": turn.id,
+            "source": turn.source,
+            "latency": round(first_token / 1000, 3) if first_token is not None else 0.0,  # Secondes (dashboard)
+            "total_ms": round(total, 1),
+            "marks": {name: round(at, 1) for name, at in turn.marks.items()},
+            "stages": stages,
+            "spans": turn.spans,
+        }
+        self.last_turn = summary
+        if self.publish is not None:
+            self.publish("clio_latency_update", summary)
+        return summary
+
+    # --- STATISTIQUES DES MODULES ---
+    def register_collector(self, name: str, collect: Callable[[], Dict[str, Any]]):
+        self._collectors[name] = collect
+
+    def watch_modules(self, modules: Dict[str, Any]):
+        """Les modules dont l'API expose get_stats() sont lus à chaque export."""
+        self._modules = modules
+
+    def _collect(self) -> Dict[str, Dict[str, float]]:
+        sources = dict(self._collectors)
+        for key, module in list(self._modules.items()):
+            api = getattr(module, "API", None)
+            # Recherche sur la classe : les modules hébergés (RemoteModule) ne sont pas interrogés ici
+            if api is not None and getattr(type(api), "get_stats", None) is not None:
+                sources.setdefault(key, api.get_stats)
+
+        collected = {}
+        for name, collect in sources.items():
+            try:
+                stats = collect() or {}
+            except Exception as e:
+                logger.debug(f"Statistiques de '{name}' indisponibles : {e}")
+                continue
+            flat = {}
+            for stat, value in stats.items():
+                items = value.items() if isinstance(value, dict) else [("", value)]
+                for sub, v in items:
+                    if isinstance(v, (int, float)):  # bool compris
+                        flat[f"{stat}.{sub}" if sub else stat] = float(v)
+            collected[name] = flat
+        return collected
+
+    # --- EXPORT ---
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {k: (list(h.counts), h.count, h.sum) for k, h in self._histograms.items()}
+
+        typed = set()
+
+        def declare(name: str, kind: str):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            declare(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        for (name, labels), value in sorted(gauges.items()):
+            declare(name, "gauge")
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        for (name, labels), (counts, count, total) in sorted(histograms.items()):
+            declare(name, "histogram")
+            cumulative = 0
+            for bound, n in zip(BUCKETS_MS + ("+Inf",), counts):
+                cumulative += n
+                le = f'le="{bound}"'
+                lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total:.1f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        declare("clio_module_stat", "gauge")
+        for module, stats in sorted(self._collect().items()):
+            for stat, value in sorted(stats.items()):
+                lines.append(f'clio_module_stat{{module="{module}",stat="{stat}"}} {value:g}')
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Version JSON (dashboard) : quantiles sur la fenêtre récente plutôt que les seaux."""
+        with self._lock:
+            counters = {f"{n}{_format_labels(l)}": v for (n, l), v in self._counters.items()}
+            gauges = {f"{n}{_format_labels(l)}": v for (n, l), v in self._gauges.items()}
+            histograms = {
+                f"{n}{_format_labels(l)}": {"count": h.count, "p50": h.quantile(0.5), "p95": h.quantile(0.95),
+                                            "mean": round(h.sum / h.count, 1) if h.count else None}
+                for (n, l), h in self._histograms.items()
+            }
+        return {"counters": counters, "gauges": gauges, "histograms": histograms,
+                "modules": self._collect(), "last_turn": self.last_turn}
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Registre unique du processus (créé au premier appel)."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
@@ -0,0 +1,144 @@
+import time
+import asyncio
+import logging
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from constants import STARTUP_WORKERS
+
+logger = logging.getLogger('ModuleRegistry')
+
+'''
+Registre des modules de Clio : chaque module déclare sa cible ("fichier.Classe"), sa fabrique
+et les modules dont il a besoin À LA CONSTRUCTION. Au démarrage :
+- l'import n'a lieu qu'à ce moment-là, dans un thread (torch, whisper, cv2, faiss...)
+- chaque module est construit dès que ses dépendances le sont : FAISS, le modèle TTS
+  et la capture se chargent en parallèle au lieu de s'attendre
+- un rapport de démarrage donne le coût (import / construction) de chaque module
+Les modules dont la clé est déjà présente (ex : hébergés par le superviseur de processus) sont sautés.
+'''
+
+
+class ModuleSpec(NamedTuple):
+    key: str
+    target: str                         # "fichier.Classe", cherché dans modules/ puis Neuro-master/
+    factory: Callable[[type], Any]      # Reçoit la classe importée, retourne l'instance
+    deps: Tuple[str, ...] = ()
+    publish: bool = True                # Ajouté au dictionnaire modules (sinon seulement dans objects)
+
+
+class StartupTiming(NamedTuple):
+    key: str
+    status: str         # ok | absent | erreur | hébergé
+    import_ms: float
+    init_ms: float
+    started_ms: float   # Début du chargement, depuis le lancement du démarrage
+    thread: str
+    detail: str
+
+
+def import_class(target: str) -> type:
+    """Même recherche que l'ancien smart_import, mais l'échec garde sa raison."""
+    module_name, class_name = target.rsplit(".", 1)
+    path = f"modules.{module_name}"
+    try:
+        module = importlib.import_module(path)
+    except ModuleNotFoundError as e:
+        if not e.name or e.name == "modules" or not path.startswith(e.name):
+            raise  # Le fichier existe mais une de ses dépendances manque
+        module = importlib.import_module(module_name)
+    return getattr(module, class_name)
+
+
+class ModuleRegistry:
+    def __init__(self):
+        self.specs: Dict[str, ModuleSpec] = {}
+        self.objects: Dict[str, Any] = {}
+        self.timings: Dict[str, StartupTiming] = {}
+        self.total_ms = 0.0
+        self._start = 0.0
+
+    def register(self, key: str, target: str, factory: Callable[[type], Any],
+                 deps: Tuple[str, ...] = (), publish: bool = True):
+        self.specs[key] = ModuleSpec(key, target, factory, tuple(deps), publish)
+
+    def _check_cycles(self):
+        state: Dict[str, int] = {}  # 1 = en cours, 2 = terminé
+
+        def visit(key: str, path: List[str]):
+            if state.get(key) == 2 or key not in self.specs:
+                return
+            if state.get(key) == 1:
+                raise ValueError(f"Dépendance circulaire : {' -> '.join(path + [key])}")
+            state[key] = 1
+            for dep in self.specs[key].deps:
+                visit(dep, path + [key])
+            state[key] = 2
+
+        for key in self.specs:
+            visit(key, [])
+
+    def _load(self, spec: ModuleSpec) -> Tuple[Optional[Any], StartupTiming]:
+        """Exécuté dans un thread du pool : import puis construction."""
+        started = (time.perf_counter() - self._start) * 1000
+        thread = threading.current_thread().name
+        t0 = time.perf_counter()
+        try:
+            cls = import_class(spec.target)
+        except Exception as e:
+            ms = (time.perf_counter() - t0) * 1000
+            return None, StartupTiming(spec.key, "absent", ms, 0.0, started, thread, f"{type(e).__name__}: {e}")
+        t1 = time.perf_counter()
+        try:
+            instance = spec.factory(cls)
+        except Exception as e:
+            logger.error(f"❌ Construction de '{spec.key}' impossible : {e}", exc_info=True)
+            return None, StartupTiming(spec.key, "erreur", (t1 - t0) * 1000, (time.perf_counter() - t1) * 1000,
+                                       started, thread, str(e))
+        return instance, StartupTiming(spec.key, "ok", (t1 - t0) * 1000, (time.perf_counter() - t1) * 1000,
+                                       started, thread, "")
+
+    async def build(self, modules: Dict[str, Any], max_workers: int = STARTUP_WORKERS) -> Dict[str, Any]:
+        """Construit tous les modules enregistrés (en parallèle quand leurs dépendances le permettent)."""
+        self._check_cycles()
+        loop = asyncio.get_running_loop()
+        self._start = time.perf_counter()
+        done = {key: asyncio.Event() for key in self.specs}
+
+        async def start(spec: ModuleSpec, pool: ThreadPoolExecutor):
+            try:
+                for dep in spec.deps:
+                    if dep in done:
+                        await done[dep].wait()
+                if spec.key in modules:
+                    self.timings[spec.key] = StartupTiming(spec.key, "hébergé", 0.0, 0.0, 0.0, "", "")
+                    return
+                instance, timing = await loop.run_in_executor(pool, self._load, spec)
+                self.timings[spec.key] = timing
+                if instance is not None:
+                    self.objects[spec.key] = instance
+                    if spec.publish:
+                        modules[spec.key] = instance
+            finally:
+                done[spec.key].set()
+
+        with ThreadPoolExecutor(max_workers, thread_name_prefix="ClioInit") as pool:
+            await asyncio.gather(*(start(spec, pool) for spec in self.specs.values()))
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+
+        # Ordre d'enregistrement rétabli : le lancement des tâches ne dépend pas des temps de chargement
+        ordered = {key: modules[key] for key in list(modules) if key not in self.specs}
+        ordered.update({key: modules[key] for key in self.specs if key in modules})
+        modules.clear()
+        modules.update(ordered)
+        return modules
+
+    def report(self) -> str:
+        serial = sum(t.import_ms + t.init_ms for t in self.timings.values())
+        lines = [f"⏱️ Démarrage des modules : {self.total_ms:.0f} ms (en série : {serial:.0f} ms)"]
+        for t in sorted(self.timings.values(), key=lambda t: -(t.import_ms + t.init_ms)):
+            lines.append(f"   {t.key:<16}{t.status:<9}import {t.import_ms:>7.0f} ms  init {t.init_ms:>7.0f} ms"
+                         f"  (+{t.started_ms:.0f} ms){'  ' + t.detail if t.detail else ''}")
+        return "\n".join(lines)
@@ -6,6 +6,7 @@ from pathlib import Path
 import re
 import random
 from modules.module import Module
+from metrics import get_metrics
 
 log = logging.getLogger("Prompter")
 
@@ -29,6 +30,7 @@ class Prompter(Module):
         self.memory = self.modules.get("memory")
         self.brain = self.modules.get("brain")
         self.social_monitor = self.modules.get("social_monitor")
+        # Sans SDK de jeu, les chiffres du HUD arrivent par l'injection de HudReader (TextLLMWrapper)
         self.neuro_client = self.modules.get("neuro_client")
         self.self_determination = self.modules.get("self_determination") # La Conscience
 
@@ -78,7 +80,7 @@ class Prompter(Module):
         game_context = ""
         if self.neuro_client and hasattr(self.neuro_client, 'game_context'):
             gc = self.neuro_client.game_context
-            game_context = f"\nVISION JEU : HP {gc.get('health', 100)}%, Situation: {gc.get('status', 'RAS')}."
+            game_context = f"\nVISION JEU : HP {gc.get('vie', gc.get('health', 100))}%, Situation: {gc.get('status', 'RAS')}."
 
         # 4. Contraintes de Formatage (Style Neuro-sama)
         formatting_rules = (
@@ -120,7 +122,8 @@ class Prompter(Module):
                 raw_query = self.user_query or getattr(self.signals, "user_query", "...")
                 
                 # Construction du prompt complexe
-                messages = self._prepare_system_prompt(raw_query)
+                with get_metrics().span("prompt_build"):
+                    messages = self._prepare_system_prompt(raw_query)
                 messages.append({"role": "user", "content": raw_query})
 
                 try:
@@ -144,6 +147,25 @@ class Prompter(Module):
                             # Archivage mémoire
                             if self.memory:
                                 self.memory.API.add_to_history(raw_query, response_text)
+
+                            # Historique du Dashboard (événement Socket.IO)
+                            dashboard = self.modules.get("dashboard")
+                            if dashboard:
+                                dashboard.API.update_history("assistant", response_text)
+
+                    elif self.brain:
+                        # Sans connecteur dédié, le Brain génère (TextLLMWrapper) et fait parler Clio,
+                        # sur le prompt construit ici (personnalité, jeu, mémoire) et non sur la seule requête
+                        log.info(f"🚀 Réflexion de Clio via le Brain (Mode: {getattr(self.signals, 'context_mode', 'private')})")
+                        response_text = await self.brain.API.process_llm_response(raw_query, source="chat",
+                                                                                  messages=messages)
+                        if response_text:
+                            self.last_llm_response = response_text
+                            if self.memory:
+                                self.memory.API.add_to_history(raw_query, response_text)
+                            dashboard = self.modules.get("dashboard")
+                            if dashboard:
+                                dashboard.API.update_history("assistant", response_text)
                                 
                 except Exception as e:
                     log.error(f"❌ Erreur Prompter (LLM) : {e}")
@@ -0,0 +1,132 @@
+import sys
+import time
+import logging
+import importlib
+import threading
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger('ResourceRegistry')
+
+'''
+Ressources lourdes et immuables de Clio (modèle Whisper, index FAISS, moteur TTS),
+gardées pour toute la vie du processus.
+Les modules les demandent via get_resources().acquire(clé, fabrique) au lieu de les construire :
+- premier appel : la fabrique est exécutée (une seule fois, même si deux modules se chargent en parallèle)
+- redémarrage à chaud : le module reconstruit récupère l'instance déjà chargée
+- si la configuration de la ressource change (ex : TTS_BACKEND), l'ancienne est fermée et reconstruite
+Les ressources ne sont fermées qu'à l'arrêt réel du processus (close_all).
+'''
+
+# Modules jamais rechargés au redémarrage à chaud (ils portent l'état gardé d'une session à l'autre)
+KEEP_LOADED = {"__main__", "main", "bench_startup", "resourceRegistry", "signals", "metrics",
+               "modules.textAnalysis",        # Règles déclarées à l'import par les filtres : le moteur les garde
+               "modules.ttsBackends",         # Classe du moteur TTS gardé ('tts.backend')
+               "modules.clio_vector_memory",  # Classe de l'index FAISS gardé ('memory.vector')
+               "modules.avatarTransport"}     # Socket OSC + thread d'envoi partagés (get_transport)
+
+
+class _Resource(NamedTuple):
+    value: Any
+    config: Hashable
+    close: Optional[Callable[[Any], None]]
+    build_ms: float
+
+
+class ResourceRegistry:
+    def __init__(self):
+        self._resources: Dict[str, _Resource] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.hits: Dict[str, int] = {}
+
+    def acquire(self, key: str, factory: Callable[[], Any], close: Optional[Callable[[Any], None]] = None,
+                config: Hashable = None) -> Any:
+        """Retourne la ressource `key`, construite par `factory` si absente ou si `config` a changé."""
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            resource = self._resources.get(key)
+            if resource is not None and resource.config == config:
+                self.hits[key] = self.hits.get(key, 0) + 1
+                logger.info(f"♻️ Ressource '{key}' réutilisée (chargée en {resource.build_ms:.0f} ms).")
+                return resource.value
+            if resource is not None:
+                logger.info(f"🔧 Configuration de '{key}' modifiée : rechargement.")
+                self._close(key, resource)
+            start = time.perf_counter()
+            value = factory()
+            build_ms = (time.perf_counter() - start) * 1000
+            self._resources[key] = _Resource(value, config, close, build_ms)
+            return value
+
+    def _close(self, key: str, resource: _Resource):
+        self._resources.pop(key, None)
+        if resource.close is None:
+            return
+        try:
+            resource.close(resource.value)
+        except Exception as e:
+            logger.error(f"❌ Fermeture de la ressource '{key}' impossible : {e}")
+
+    def release(self, key: str):
+        """Ferme une ressource (ex : fichier de modèle remplacé) ; elle sera reconstruite au prochain acquire."""
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            resource = self._resources.get(key)
+            if resource is not None:
+                self._close(key, resource)
+
+    def close_all(self):
+        for key in list(self._resources):
+            self.release(key)
+
+    def defining_modules(self) -> Set[str]:
+        """Modules qui définissent les classes des ressources gardées (et leurs classes de base)."""
+        with self._lock:
+            values = [r.value for r in self._resources.values()]
+        return {cls.__module__ for value in values for cls in type(value).__mro__}
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {key: {"build_ms": round(r.build_ms, 1), "reused": self.hits.get(key, 0)}
+                for key, r in self._resources.items()}
+
+
+_registry: Optional[ResourceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_resources() -> ResourceRegistry:
+    """Registre unique du processus (créé au premier appel)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ResourceRegistry()
+        return _registry
+
+
+def reload_project_modules(roots: List[str]) -> int:
+    """
+    Recharge le code et la configuration de Clio (fichiers sous `roots`) sans toucher aux
+    bibliothèques (torch, faiss, whisper restent importés). constants passe en premier pour que
+    les `from constants import ...` des autres fichiers lisent les nouvelles valeurs.
+    Les modules des ressources gardées ne sont pas rechargés : une instance conservée doit rester
+    une instance de la classe que voient isinstance() et les annotations du code rechargé.
+    """
+    def in_project(module) -> bool:
+        path = getattr(module, "__file__", None) or ""
+        return any(path.startswith(root) for root in roots) and "site-packages" not in path
+
+    keep = KEEP_LOADED | get_resources().defining_modules()
+    names = [name for name, module in list(sys.modules.items())
+             if module is not None and name not in keep and in_project(module)]
+    names.sort(key=lambda name: name != "constants")
+    reloaded = 0
+    for name in names:
+        try:
+            importlib.reload(sys.modules[name])
+            reloaded += 1
+        except Exception as e:
+            # L'ancienne version reste en place : le module concerné démarre avec son code précédent
+            logger.error(f"❌ Rechargement de '{name}' impossible : {e}")
+    return reloaded
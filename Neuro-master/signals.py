@@ -15,6 +15,7 @@ class Signals:
     def __init__(self):
         # 🚩 Signal d'arrêt global et modules
         self._terminate = False
+        self.restart_mode: Optional[str] = None # "warm" (modules reconstruits) ou "cold" (processus relancé)
         self.modules: Dict[str, Any] = {} 
         self.loop: Optional[asyncio.AbstractEventLoop] = None
 
@@ -39,6 +40,13 @@ class Signals:
         self.sio_queue: queue.SimpleQueue[tuple[str, Any]] = queue.SimpleQueue()
         self.transcribed_text_queue: queue.Queue[str] = queue.Queue()
 
+    def inherit(self, previous: "Signals"):
+        """ Redémarrage à chaud : reprend le dialogue et le contexte de la session précédente """
+        self.history = previous.history
+        self._context_mode = previous._context_mode
+        self._current_game = previous._current_game
+        self.last_message_time = getattr(previous, 'last_message_time', time.time())
+
     # 🚀 MÉTHODES DE GESTION D'IDENTITÉ
     def get_current_host_name(self) -> str:
         """ Retourne le nom que Clio doit utiliser selon le contexte actuel """
@@ -66,6 +74,19 @@ class Signals:
             print(f"🎹 SIGNALS: Bascule identité -> {val.upper()} | Cible: {self.get_current_host_name()}")
             self.sio_queue.put(('context_mode', val))
 
+    @property
+    def current_game(self) -> str:
+        return self._current_game
+
+    @current_game.setter
+    def current_game(self, value: str):
+        # Mis à jour par le service de premier plan (modules/foregroundWatcher.py)
+        val = value or "none"
+        if self._current_game != val:
+            self._current_game = val
+            logger.info(f"🎮 SIGNALS: Jeu actif -> {val}")
+            self.sio_queue.put(('current_game', val))
+
     @property
     def AI_speaking(self) -> bool:
         return self._AI_speaking
@@ -0,0 +1,126 @@
+import time
+import queue
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from constants import SIO_EMIT_RATE, SIO_BUFFER_SIZE
+
+logger = logging.getLogger('SioEmitter')
+
+'''
+Vidange de signals.sio_queue vers le dashboard (Socket.IO), dans la boucle du serveur.
+Toutes les 1/SIO_EMIT_RATE secondes (~30 Hz), une "trame" est construite :
+- "next_chunk" : les morceaux LLM consécutifs sont concaténés en un seul émis
+- états idempotents (AI_speaking, current_game...) : seule la dernière valeur compte,
+  et elle n'est pas réémise si elle n'a pas changé depuis le dernier envoi
+- autres événements : transmis dans l'ordre, dans un tampon borné (les plus anciens
+  sont abandonnés si le dashboard ne suit plus)
+La trame garde l'ordre d'arrivée : un état y est placé à la position de sa dernière valeur
+(ex : AI_speaking=False reste après les morceaux de la réplique qu'il clôt).
+La file est vidée même sans client connecté : la mémoire reste stable.
+Chaque trame est aussi remise à on_frame (flux SSE /api/stream, eventStream.py).
+'''
+
+# Événements d'état : seule la dernière valeur est utile au dashboard
+STATE_EVENTS = {
+    "AI_speaking", "AI_thinking", "current_game", "context_mode", "last_emotion",
+    "LLM_status", "multimodal_status", "discord_status", "activity_update",
+    "foreground_update", "avatar_transport_stats", "twitch_stats",
+    "worker_status", "clio_metrics",
+}
+CHUNK_EVENT = "next_chunk"
+
+
+class SioEmitter:
+    def __init__(self, signals, emit: Callable[[str, Any], Awaitable[Any]],
+                 rate: float = SIO_EMIT_RATE, buffer_size: int = SIO_BUFFER_SIZE,
+                 on_frame: Optional[Callable[[Tuple[Tuple[str, Any], ...]], None]] = None):
+        self.signals = signals
+        self.emit = emit
+        self.on_frame = on_frame
+        self.interval = 1.0 / rate
+        self._events: deque = deque(maxlen=buffer_size)   # (rang, événement, données) dans l'ordre
+        self._states: Dict[str, Tuple[int, Any]] = {}     # Dernière valeur reçue pendant la trame, et son rang
+        self._sent_states: Dict[str, Any] = {}            # Dernière valeur réellement émise
+        self._rank = 0                                    # Ordre d'arrivée dans la file
+        self._chunk_open = False                          # Le dernier élément reçu est un morceau LLM
+        self.stats = {"received": 0, "emitted": 0, "coalesced": 0, "deduplicated": 0, "dropped": 0, "frames": 0}
+
+    def _drain(self):
+        """Vide sio_queue (non bloquant) dans la trame en cours."""
+        while True:
+            try:
+                event, data = self.signals.sio_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.stats["received"] += 1
+            self._add(event, data)
+
+    def _add(self, event: str, data: Any):
+        self._rank += 1
+        if event in STATE_EVENTS:
+            if event in self._states:
+                self.stats["coalesced"] += 1
+            self._states[event] = (self._rank, data)
+            self._chunk_open = False
+            return
+        if event == CHUNK_EVENT and self._chunk_open and self._events:
+            # Morceau LLM : collé au précédent tant qu'aucun autre événement (ni état) ne s'intercale
+            rank, _, text = self._events[-1]
+            self._events[-1] = (rank, CHUNK_EVENT, text + (data or ""))
+            self.stats["coalesced"] += 1
+            return
+        if len(self._events) == self._events.maxlen:
+            self.stats["dropped"] += 1
+        self._events.append((self._rank, event, data))
+        self._chunk_open = event == CHUNK_EVENT
+
+    def _frame(self) -> Tuple[Tuple[str, Any], ...]:
+        """Événements à émettre pour cette trame, dans l'ordre d'arrivée (états dédupliqués)."""
+        states = []
+        for event, (rank, data) in self._states.items():
+            if event in self._sent_states and self._sent_states[event] == data:
+                self.stats["deduplicated"] += 1
+                continue
+            self._sent_states[event] = data
+            states.append((rank, event, data))
+        self._states = {}
+        ordered = sorted((*self._events, *states), key=lambda item: item[0])
+        self._events.clear()
+        self._chunk_open = False
+        return tuple((event, data) for _, event, data in ordered)
+
+    async def flush(self):
+        self._drain()
+        frame = self._frame()
+        if not frame:
+            return
+        self.stats["frames"] += 1
+        if self.on_frame is not None:
+            try:
+                self.on_frame(frame)
+            except Exception as e:
+                logger.error(f"Erreur diffusion de la trame (flux SSE) : {e}")
+        for event, data in frame:
+            try:
+                await self.emit(event, data)
+                self.stats["emitted"] += 1
+            except Exception as e:
+                logger.error(f"Erreur émission Socket.IO '{event}' : {e}")
+
+    async def run(self):
+        logger.info(f"📡 Diffusion dashboard active ({1 / self.interval:.0f} Hz, tampon {self._events.maxlen}).")
+        next_tick = time.monotonic()
+        while not self.signals.terminate:
+            await self.flush()
+            # Cadence fixe : une émission lente raccourcit l'attente suivante au lieu de la décaler
+            next_tick = max(next_tick + self.interval, time.monotonic())
+            await asyncio.sleep(next_tick - time.monotonic())
+        await self.flush()  # Dernière trame (system_terminate)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats["buffered"] = len(self._events)
+        return stats
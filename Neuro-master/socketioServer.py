@@ -14,11 +14,13 @@ from typing import Dict, Any, List, Optional
 # --- NOUVEAUX IMPORTS (pour les routes HTTP) ---
 from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from starlette.routing import Route
 
-# --- FILE D'ATTENTE GLOBALE ---
-twitch_webhook_queue = asyncio.Queue()
+from sioEmitter import SioEmitter
+from eventStream import EventStream
+from metrics import get_metrics
+from constants import SOFT_RESTART_MODE, METRICS_PUSH_INTERVAL, STREAM_KEEPALIVE
 
 # Configure le logging pour ce module
 log = logging.getLogger('SocketIOServer')
@@ -39,6 +41,10 @@ class SocketIOServer:
             # Route pour les actions LLM directes sur les experts (ex: BrainModule)
             Route('/api/delegate_action', endpoint=self.handle_delegate_action, methods=['POST']), 
             Route('/api/explain', endpoint=self.handle_explain, methods=['POST']), 
+            # Mesures de tout le pipeline (format Prometheus, ou ?format=json)
+            Route('/metrics', endpoint=self.handle_metrics, methods=['GET']),
+            # Flux en direct (SSE) : morceaux LLM, émotions, latences, état des modules
+            Route('/api/stream', endpoint=self.handle_stream, methods=['GET']),
         ])
 
         # --- 2. Création du serveur Socket.IO ---
@@ -47,6 +53,16 @@ class SocketIOServer:
         # --- 3. FUSION DES DEUX ---
         self.app = socketio.ASGIApp(self.sio, other_asgi_app=self.http_app)
 
+        # --- 4. Diffusion de signals.sio_queue vers le dashboard (~30 Hz, tampon borné) ---
+        # Les mêmes trames partent en Socket.IO et sur le flux SSE /api/stream
+        self.stream = EventStream()
+        self.emitter = SioEmitter(signals, self.sio.emit, on_frame=self.stream.publish)
+        get_metrics().register_collector("sio", self.emitter.get_stats)
+        get_metrics().register_collector("stream", self.stream.get_stats)
+        self._explain_seq = 0
+        self._background = set()  # Tâches d'explication en cours (référence gardée jusqu'à la fin)
+        self.server: Optional[uvicorn.Server] = None
+
         self.register_handlers()
         log.info("Écouteurs d'événements (SIO + HTTP) enregistrés.")
         
@@ -99,24 +115,91 @@ class SocketIOServer:
 
 
     # --- GESTIONNAIRES HTTP (Inchangés) ---
+    async def handle_metrics(self, request: Request):
+        metrics = get_metrics()
+        if request.query_params.get('format') == 'json':
+            return JSONResponse(await asyncio.to_thread(metrics.snapshot))
+        text = await asyncio.to_thread(metrics.render_prometheus)
+        return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+    async def handle_stream(self, request: Request):
+        """Server-Sent Events : snapshot des états puis une ligne JSON par trame de SioEmitter."""
+        queue = self.stream.subscribe()
+        log.info(f"📺 Flux direct ouvert ({self.stream.stats['subscribers']} client(s)).")
+
+        async def feed():
+            try:
+                yield self.stream.snapshot()
+                idle = 0.0
+                while not self.signals.terminate:
+                    try:
+                        # Réveil chaque seconde : fin de session ou client parti sont vus rapidement
+                        message = await asyncio.wait_for(queue.get(), timeout=1.0)
+                    except asyncio.TimeoutError:
+                        idle += 1.0
+                        if await request.is_disconnected():
+                            break
+                        if idle >= STREAM_KEEPALIVE:
+                            idle = 0.0
+                            yield b": ping\n\n"
+                        continue
+                    idle = 0.0
+                    yield message
+            finally:
+                self.stream.unsubscribe(queue)
+
+        return StreamingResponse(feed(), media_type="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # Le panneau du dashboard est servi par Streamlit (autre origine)
+            "Access-Control-Allow-Origin": "*",
+        })
+
+    async def _push_metrics(self):
+        """Résumé périodique pour le dashboard (événement d'état, dédupliqué par l'émetteur)."""
+        while not self.signals.terminate:
+            await asyncio.sleep(METRICS_PUSH_INTERVAL)
+            snapshot = await asyncio.to_thread(get_metrics().snapshot)
+            self.signals.sio_queue.put(("clio_metrics", snapshot))
+
     async def handle_twitch_webhook(self, request: Request):
         try:
             data = await request.json()
             username = data.get('username', 'UtilisateurTwitch')
             message = data.get('message', '')
             message_type = data.get('type', 'CHAT_MESSAGE')
-            await twitch_webhook_queue.put({"username": username, "message": message, "type": message_type})
-            self.signals.new_message = True 
-            log.info(f"[WEBHOOK] Message Twitch reçu de {username}")
-            return JSONResponse({"status": "received", "user": username}, status_code=200)
+            ingest = self.modules.get('twitch_ingest')
+            if not ingest:
+                return JSONResponse({"status": "error", "message": "Ingestion Twitch inactive"}, status_code=503)
+            # Filtrage immédiat (doublons, débit par utilisateur) : le cœur ne reçoit qu'un résumé par fenêtre
+            extra = {k: v for k, v in data.items() if k not in ('username', 'message', 'type')}
+            outcome = ingest.API.submit(username, message, message_type, extra)
+            log.debug(f"[WEBHOOK] Message Twitch de {username} : {outcome}")
+            return JSONResponse({"status": outcome, "user": username}, status_code=200)
         except Exception as e:
             log.error(f"[WEBHOOK ERROR] : {e}")
             return JSONResponse({"status": "error", "message": str(e)}, status_code=400)
 
+    async def _explain_in_background(self, request_id: int, data: Dict[str, Any]):
+        try:
+            explanation = await asyncio.to_thread(self.prompter.explain_segment, data)
+            result = {"id": request_id, "explanation": explanation}
+        except Exception as e:
+            log.error(f"[API] Explication impossible : {e}")
+            result = {"id": request_id, "error": str(e)}
+        self.signals.sio_queue.put(("explain_result", result))
+
     async def handle_explain(self, request: Request):
         try:
             data = await request.json()
             log.info(f"[API] Requête 'Expliquer segment' reçue.")
+            if self.prompter and hasattr(self.prompter, 'explain_segment') and data.pop('stream', False):
+                # Réponse immédiate : l'explication arrivera sur le flux (événement explain_result)
+                self._explain_seq += 1
+                task = asyncio.create_task(self._explain_in_background(self._explain_seq, data))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+                return JSONResponse({"status": "accepted", "id": self._explain_seq}, status_code=202)
             if self.prompter and hasattr(self.prompter, 'explain_segment'):
                 explanation_result = await asyncio.to_thread(self.prompter.explain_segment, data)
                 return JSONResponse({"explanation": explanation_result}, status_code=200)
@@ -137,6 +220,26 @@ class SocketIOServer:
         async def handle_disconnect(sid):
             log.warning(f"Client Déconnecté: {sid}")
 
+        # --- CANAL DASHBOARD (remplace les fichiers dashboard_input.json / chat_history.json) ---
+        @self.sio.on('dashboard_send')
+        async def handle_dashboard_send(sid, data):
+            bridge = self.modules.get('dashboard')
+            message = (data or {}).get('message', '')
+            if not bridge or not message:
+                return False
+            # Le pont et le Prompter vivent dans la boucle principale
+            self.signals.loop.call_soon_threadsafe(bridge.API.submit, message, "dashboard")
+            return True
+
+        @self.sio.on('chat_history_since')
+        async def handle_chat_history_since(sid, data):
+            bridge = self.modules.get('dashboard')
+            return bridge.API.since(int((data or {}).get('after', 0))) if bridge else []
+
+        @self.sio.on('get_emitter_stats')
+        async def handle_emitter_stats(sid):
+            return self.emitter.get_stats()
+
         # --- Chat LLM SYNCHRONE ---
         @self.sio.on('request_llm_response')
         async def handle_llm_request(sid, data):
@@ -302,11 +405,21 @@ class SocketIOServer:
 
         # --- REDEMARRAGE DOUX ---
         @self.sio.on('dashboard_soft_restart')
-        async def dashboard_soft_restart(sid):
-            log.warning("🚨 Signal SOFT RESTART. Arrêt propre...")
+        async def dashboard_soft_restart(sid, data=None):
+            mode = (data or {}).get('mode', SOFT_RESTART_MODE)
+            if mode == 'warm':
+                # run_clio arrête puis reconstruit les modules ; les modèles restent chargés
+                log.warning("🚨 Signal SOFT RESTART (à chaud). Reconstruction des modules...")
+                self.signals.restart_mode = 'warm'
+                self.signals.terminate = True
+                await self.sio.disconnect(sid)
+                return
+
+            log.warning("🚨 Signal SOFT RESTART (complet). Arrêt propre...")
             if self.modules.get('memory') and hasattr(self.modules['memory'], 'shutdown'):
                 await asyncio.to_thread(self.modules['memory'].shutdown)
 
+            self.signals.restart_mode = 'cold'
             self.signals.terminate = True
             
             def restart_process_and_exit():
@@ -317,12 +430,30 @@ class SocketIOServer:
             threading.Thread(target=restart_process_and_exit, daemon=True).start()
             await self.sio.disconnect(sid)
 
+    async def _serve(self, port: int):
+        """Serveur Uvicorn et diffusion de la file sio dans la même boucle (celle du thread serveur)."""
+        server = self.server = uvicorn.Server(uvicorn.Config(self.app, host='127.0.0.1', port=port, log_level="warning",
+                                                         lifespan="off"))
+        emitter_task = asyncio.create_task(self.emitter.run())
+        metrics_task = asyncio.create_task(self._push_metrics())
+        try:
+            await server.serve()
+        finally:
+            emitter_task.cancel()
+            metrics_task.cancel()
+
+    def shutdown(self):
+        """Fin de session (redémarrage à chaud) : le port est libéré pour le serveur suivant."""
+        if self.server is not None:
+            self.server.should_exit = True
+            self.server.force_exit = True  # Sans attendre la déconnexion des dashboards (ils se reconnectent)
+
     def start_server(self):
         """Lance le serveur Uvicorn (HTTP + SocketIO)."""
         port_to_use = 8081 
         log.info(f"Démarrage du serveur Uvicorn (HTTP+SIO) sur http://localhost:{port_to_use}")
         try:
-            uvicorn.run(self.app, host='127.0.0.1', port=port_to_use, log_level="warning")
+            asyncio.run(self._serve(port_to_use))
         except OSError as e:
             if e.errno == 10048 or e.errno == 98:
                 log.critical(f"❌ ERREUR FATALE: Port {port_to_use} occupé.")
@@ -2,8 +2,16 @@ import logging
 import time
 import asyncio
 import os
+import threading
 from RealtimeSTT import AudioToTextRecorder
 from modules.module import Module
+from resourceRegistry import get_resources
+from metrics import get_metrics
+from modules.speechGate import SpeechGate, transcript_has_keyword
+from constants import (
+    STT_INPUT_DEVICE_INDEX, STT_GATE_MODES, STT_GATE_GAMING_MODE, STT_WAKE_WORD_MODEL,
+    STT_WAKE_WORD_THRESHOLD, STT_WAKE_KEYWORDS, STT_WAKE_FOLLOWUP, STT_VAD_AGGRESSIVENESS
+)
 
 os.environ['ORT_LOGGING_LEVEL'] = '3'
 logger = logging.getLogger('STT')
@@ -11,16 +19,55 @@ logger = logging.getLogger('STT')
 class STT(Module):
     def __init__(self, signals, modules=None, enabled: bool = True):
         super().__init__(signals, enabled)
-        self.modules = modules or {} 
+        self.modules = modules if modules is not None else {}  # Dictionnaire partagé, même encore vide
         self.recorder = None
+        self.gate = None
+        # Une seule boucle d'écoute (donc une seule porte micro) par instance
+        self._listening = False
+        self._listen_lock = threading.Lock()
         # On n'a pas besoin de self.API = self.API(self) ici si on utilise run()
 
+    def get_gate_mode(self) -> str:
+        """Mode de la porte STT selon le contexte (le jeu en cours est prioritaire)."""
+        if not self.enabled:
+            return "off"
+        if getattr(self.signals, 'current_game', "none") not in (None, "", "none"):
+            return STT_GATE_GAMING_MODE
+        return STT_GATE_MODES.get(self.signals.context_mode, "vad")
+
+    def is_addressed(self, text: str) -> bool:
+        """
+        Filtre de destinataire APRÈS transcription (pas une porte : Whisper a déjà tourné).
+        Seulement quand le mode wake_word s'est replié sur le VAD faute de modèle openWakeWord :
+        la parole transcrite doit alors contenir 'Clio' pour être envoyée au LLM.
+        """
+        if self.get_gate_mode() != "wake_word" or self.gate is None:
+            return True
+        if self.gate.has_wake_word_model or self.gate.is_awake():
+            return True
+        if transcript_has_keyword(text, STT_WAKE_KEYWORDS):
+            self.gate.wake()
+            return True
+        return False
+
     def process_text(self, text: str):
         """Envoie le texte reconnu au cerveau de Clio."""
         if not text.strip() or len(text.strip()) < 2:
             return
+        if not self.is_addressed(text):
+            logger.debug(f"[STT] Ignoré (Clio non interpellée) : {text}")
+            get_metrics().inc("clio_stt_transcripts_total", status="ignored")
+            return
+        if self.gate is not None and self.gate.is_awake():
+            # Conversation en cours : on prolonge la fenêtre sans mot-clé
+            self.gate.wake()
             
         print(f"\n✨ [STT FINAL] : {text}") 
+        # Début du tour de conversation tracé (metrics.py) : fin de la transcription
+        metrics = get_metrics()
+        metrics.inc("clio_stt_transcripts_total", status="accepted")
+        metrics.begin_turn("voice")
+        metrics.mark("stt_end")
         self.signals.last_message_time = time.time()
         
         # Correction de l'appel au cerveau :
@@ -34,26 +81,56 @@ class STT(Module):
             )
 
     async def listen_loop(self):
-        """Boucle d'écoute stable."""
+        """Boucle d'écoute stable. Un second appel concurrent est refusé (un seul flux micro)."""
+        with self._listen_lock:
+            if self._listening:
+                logger.warning("⚠️ Boucle d'écoute STT déjà active : second démarrage ignoré.")
+                return
+            self._listening = True
+        try:
+            await self._listen()
+        finally:
+            if self.gate is not None:
+                self.gate.stop()  # Aussi sur erreur : la boucle suivante ne doit pas trouver un micro déjà ouvert
+            with self._listen_lock:
+                self._listening = False
+
+    async def _listen(self):
         try:
             await asyncio.sleep(2)
             logger.info("🎤 Initialisation du STT (Whisper Tiny)...")
             
-            # Version stable pour RealtimeSTT
-            self.recorder = AudioToTextRecorder(
-                model="tiny",            
-                language="fr",
-                device="cpu",            
-                compute_type="int8",    
-                level=logging.ERROR,      
-                beam_size=1,
-                silero_use_onnx=True,     
-                silero_sensitivity=0.4,   
-                enable_realtime_transcription=False, 
-                spinner=False,
-                use_microphone=True
+            # Version stable pour RealtimeSTT (modèle gardé par le registre lors d'un redémarrage à chaud)
+            self.recorder = await asyncio.to_thread(
+                get_resources().acquire, "stt.recorder", lambda: AudioToTextRecorder(
+                    model="tiny",            
+                    language="fr",
+                    device="cpu",            
+                    compute_type="int8",    
+                    level=logging.ERROR,      
+                    beam_size=1,
+                    silero_use_onnx=True,     
+                    silero_sensitivity=0.4,   
+                    enable_realtime_transcription=False, 
+                    spinner=False,
+                    use_microphone=False     # Le micro est lu par la porte STT (voir modules/speechGate.py)
+                ),
+                lambda recorder: recorder.shutdown()
             )
 
+            # Étage toujours actif : Whisper n'est réveillé que pour la parole utile
+            self.gate = SpeechGate(
+                feed_audio=self.recorder.feed_audio,
+                get_mode=self.get_gate_mode,
+                is_muted=lambda: self.signals.AI_speaking,
+                input_device_index=STT_INPUT_DEVICE_INDEX,
+                vad_aggressiveness=STT_VAD_AGGRESSIVENESS,
+                wake_word_model=STT_WAKE_WORD_MODEL,
+                wake_word_threshold=STT_WAKE_WORD_THRESHOLD,
+                followup_seconds=STT_WAKE_FOLLOWUP
+            )
+            self.gate.start()
+
             logger.info("✅ STT PRÊT.")
             
             while not self.signals.terminate:
@@ -65,9 +142,21 @@ class STT(Module):
                 else:
                     await asyncio.sleep(0.5)
 
+            logger.info(f"🎙️ Porte STT : {self.gate.get_stats()}")
+
         except Exception as e:
             logger.error(f"❌ Erreur STT : {e}")
             await asyncio.sleep(5)
 
+    def shutdown(self):
+        """Fin de session (redémarrage à chaud) : micro libéré, Whisper interrompu mais gardé en mémoire."""
+        if self.gate is not None:
+            self.gate.stop()
+        if self.recorder is not None:
+            try:
+                self.recorder.abort()  # Débloque recorder.text() pour que listen_loop se termine
+            except Exception as e:
+                logger.warning(f"⚠️ Interruption du STT : {e}")
+
     async def run(self): 
         await self.listen_loop()
\ No newline at end of file
@@ -1,10 +1,17 @@
 import logging
-import edge_tts
 import asyncio
 import re
 import os
 import time
+from typing import Dict, List, Optional
 from modules.module import Module
+from modules.ttsBackends import create_backend, split_sentences, TTSBackend
+from resourceRegistry import get_resources
+from metrics import get_metrics
+from constants import (
+    TTS_BACKEND, TTS_FALLBACK_BACKEND, XTTS_MODEL_DIR, XTTS_USE_GPU, XTTS_LANGUAGE,
+    TTS_WARM_WORKERS, TTS_STREAM_CHUNK_SIZE, TTS_SPEAKER_CACHE_DIR, VOICE_REFERENCE, BASE_DIR
+)
 
 logger = logging.getLogger('TTS')
 
@@ -16,7 +23,7 @@ class TTS(Module):
         sans faire planter le programme.
         """
         super().__init__(signals, enabled)
-        self.modules = modules or {}
+        self.modules = modules if modules is not None else {}  # Dictionnaire partagé, même encore vide
         self.voice = "fr-FR-DeniseNeural" 
         self.rate = "+15%" 
         self.volume = "+0%"
@@ -27,6 +34,57 @@ class TTS(Module):
         if not os.path.exists("temp"): 
             os.makedirs("temp")
 
+        # Moteur de synthèse gardé au chaud (XTTS local par défaut, chargé en arrière-plan),
+        # conservé d'un redémarrage à chaud à l'autre tant que sa configuration ne change pas
+        self.backend: TTSBackend = get_resources().acquire(
+            "tts.backend", self._load_backend, close=lambda backend: backend.shutdown(),
+            config=(TTS_BACKEND, TTS_FALLBACK_BACKEND, XTTS_MODEL_DIR, XTTS_USE_GPU, TTS_WARM_WORKERS)
+        )
+        # Edge-TTS en secours, créé à la première phrase où le moteur principal n'est pas disponible
+        self.fallback: Optional[TTSBackend] = None
+
+    def _create_backend(self, name: str) -> TTSBackend:
+        if name == "xtts":
+            voice_ref = VOICE_REFERENCE if os.path.isabs(VOICE_REFERENCE) else os.path.join(BASE_DIR, VOICE_REFERENCE)
+            return create_backend(
+                "xtts",
+                model_dir=XTTS_MODEL_DIR,
+                reference_wav=voice_ref,
+                language=XTTS_LANGUAGE,
+                use_gpu=XTTS_USE_GPU,
+                workers=TTS_WARM_WORKERS,
+                cache_dir=TTS_SPEAKER_CACHE_DIR,
+                chunk_size=TTS_STREAM_CHUNK_SIZE
+            )
+        return create_backend(name, voice=self.voice, rate=self.rate, volume=self.volume)
+
+    def _load_backend(self) -> TTSBackend:
+        """Lance la chauffe du moteur configuré (non bloquante), moteur de secours s'il ne peut pas démarrer."""
+        try:
+            backend = self._create_backend(TTS_BACKEND)
+            backend.warmup()
+            logger.info(f"🗣️ Moteur TTS principal : {backend.name}")
+            return backend
+        except Exception as e:
+            logger.error(f"❌ Moteur TTS '{TTS_BACKEND}' indisponible ({e}). Secours : {TTS_FALLBACK_BACKEND}")
+            backend = self._create_backend(TTS_FALLBACK_BACKEND)
+            backend.warmup()
+            return backend
+
+    def _get_fallback(self) -> Optional[TTSBackend]:
+        if self.backend.name == TTS_FALLBACK_BACKEND:
+            return None
+        if self.fallback is None:
+            self.fallback = self._create_backend(TTS_FALLBACK_BACKEND)
+            self.fallback.warmup()
+        return self.fallback
+
+    def _active_backend(self) -> TTSBackend:
+        """Moteur principal s'il est disponible (chauffe finie, worker vivant), sinon le secours."""
+        if self.backend.available():
+            return self.backend
+        return self._get_fallback() or self.backend
+
     def clean_text(self, text: str) -> str:
         if not text: return ""
         # Nettoie les expressions entre astérisques ou crochets (pensées de l'IA)
@@ -40,29 +98,76 @@ class TTS(Module):
             if not cleaned_text: 
                 return
 
-            # Chemin absolu pour que PowerShell trouve le fichier sans erreur
-            output_path = os.path.abspath(os.path.join("temp", f"tts_{int(time.time())}.mp3"))
+            # On cherche le module sous 'audio' ou 'audio_player' (selon ton main.py)
+            player = self.modules.get('audio') or self.modules.get('audio_player')
+            if not player:
+                logger.error("❌ Module AudioPlayer non trouvé dans self.modules")
+                return
 
+            backend = self._active_backend()
+            sentences = split_sentences(cleaned_text)
+            progress = {"done": 0, "partial": False}  # Phrases entendues en entier / phrase en cours entamée
             try:
-                # 1. Synthèse vocale via Edge-TTS
-                communicate = edge_tts.Communicate(cleaned_text, self.voice, rate=self.rate)
-                await communicate.save(output_path)
-                
-                # 2. Envoi à l'AudioPlayer
-                # On cherche le module sous 'audio' ou 'audio_player' (selon ton main.py)
-                player = self.modules.get('audio') or self.modules.get('audio_player')
-                
-                if player:
-                    logger.info(f"📤 Envoi de l'audio au player : {output_path}")
-                    player.API.play_audio(output_path)
-                else:
-                    logger.error("❌ Module AudioPlayer non trouvé dans self.modules")
-
+                await self._speak_with(backend, sentences, player, progress)
             except Exception as e:
-                logger.error(f"❌ TTS Error: {e}")
+                # Le moteur principal vient de tomber (worker XTTS mort) : le secours reprend à la phrase
+                # suivante, sans rejouer ce qui a déjà été entendu (une phrase coupée n'est pas redite)
+                fallback = None if backend is not self.backend or self.backend.available() else self._get_fallback()
+                remainder = sentences[progress["done"] + (1 if progress["partial"] else 0):]
+                if fallback is None or not remainder:
+                    logger.error(f"❌ TTS Error: {e}")
+                    return
+                logger.warning(f"⚠️ Moteur TTS '{backend.name}' indisponible ({e}) : secours {fallback.name} "
+                               f"({len(remainder)}/{len(sentences)} phrase(s) restante(s)).")
+                try:
+                    await self._speak_with(fallback, remainder, player, {"done": 0, "partial": False})
+                except Exception as e:
+                    logger.error(f"❌ TTS Error: {e}")
+
+    async def _speak_with(self, backend: TTSBackend, sentences: List[str], player, progress: Dict[str, int]):
+        if backend.streaming:
+            await self._stream_to_player(backend, sentences, player, progress)
+        else:
+            await self._file_to_player(backend, sentences, player, progress)
+
+    async def _stream_to_player(self, backend: TTSBackend, sentences: List[str], player, progress: Dict[str, int]):
+        """Synthèse locale : chaque morceau PCM part au player dès qu'il est prêt (une requête par phrase)."""
+        stream = player.API.open_stream(backend.sample_rate)
+        start = time.time()
+        try:
+            for sentence in sentences:
+                async for pcm in backend.stream_pcm(sentence):
+                    if stream.first_write_time is None:
+                        logger.info(f"📤 Premier audio TTS en {(time.time() - start) * 1000:.0f} ms")
+                        get_metrics().mark("tts_first_audio")
+                        get_metrics().observe("clio_tts_first_audio_ms", (time.time() - start) * 1000,
+                                              backend=backend.name)
+                    stream.write(pcm)
+                    progress["partial"] = True
+                progress["done"] += 1
+                progress["partial"] = False
+        finally:
+            stream.close()
+
+    async def _file_to_player(self, backend: TTSBackend, sentences: List[str], player, progress: Dict[str, int]):
+        text = " ".join(sentences)
+        # Chemin absolu pour que PowerShell trouve le fichier sans erreur
+        output_path = os.path.abspath(os.path.join("temp", f"tts_{int(time.time() * 1000)}.mp3"))
+
+        # 1. Synthèse vocale via Edge-TTS (fichier complet : premier audio = fin de synthèse)
+        start = time.time()
+        await backend.synthesize_file(text, output_path)
+        get_metrics().mark("tts_first_audio")
+        get_metrics().observe("clio_tts_first_audio_ms", (time.time() - start) * 1000, backend=backend.name)
+
+        # 2. Envoi à l'AudioPlayer
+        logger.info(f"📤 Envoi de l'audio au player : {output_path}")
+        player.API.play_audio(output_path)
+        progress["done"] = len(sentences)
 
     async def run(self):
         # Le TTS est passif, il attend qu'on appelle son API.speak() via le cerveau
+        # Le moteur appartient au registre de ressources : fermé à l'arrêt réel du processus
         while not self.signals.terminate:
             await asyncio.sleep(1)
 
@@ -71,4 +176,7 @@ class TTS(Module):
             self.outer = outer
         async def speak(self, text: str):
             """Appelé par TextLLMWrapper ou BrainModule"""
-            await self.outer.generate_audio(text)
\ No newline at end of file
+            await self.outer.generate_audio(text)
+
+        def get_backend_name(self) -> str:
+            return self.outer._active_backend().name
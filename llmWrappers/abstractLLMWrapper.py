@@ -9,11 +9,15 @@ from dotenv import load_dotenv
 # 🚨 CORRECTION CRITIQUE : Importe HOST_NAME_PRIVATE qui existe dans constants.py
 from constants import SYSTEM_PROMPT, HOST_NAME_PRIVATE, AI_NAME 
 from modules.injection import Injection
+from modules.textAnalysis import get_text_analyzer
+from metrics import get_metrics
 from typing import List, Dict, Any, Union, Optional
 from requests.exceptions import RequestException # Import nécessaire pour la gestion d'erreur
 
 logger = logging.getLogger('AbstractLLMWrapper')
 
+DEFAULT_INJECTION_PRIORITY = 100  # Injections renvoyées en texte brut (sans objet Injection)
+
 class AbstractLLMWrapper:
 
     def __init__(self, signals, tts, llmState, modules: Optional[Dict] = None): 
@@ -39,30 +43,48 @@ class AbstractLLMWrapper:
     # GESTION DES INJECTIONS (CORE LOGIC)
     # ----------------------------------------------------------------------
 
-    def _fetch_and_cleanup_injections(self) -> List[Injection]:
-        """ Collecte les injections de tous les modules, les trie, puis demande le nettoyage. """
+    def _fetch_injections(self) -> List[Injection]:
+        """ Collecte les injections de tous les modules et les trie (priorité basse à haute). """
         injections: List[Injection] = []
-
-        # 1. Collecte les injections
-        for name, module in self.modules.items():
+        for name, module in list(self.modules.items()):
             # Vérifie si le module supporte l'injection (via get_prompt_injection)
-            if name != 'tts' and hasattr(module, 'get_prompt_injection'):
+            if name == 'tts' or module is self or not hasattr(module, 'get_prompt_injection'):
+                continue
+            try:
                 injection = module.get_prompt_injection()
-                if injection.priority >= 0 and injection.text.strip():
-                    injections.append(injection)
-            
-        # 2. Demande le nettoyage (pour effacer les messages Twitch, etc.)
-        for module in self.modules.values():
-            if hasattr(module, 'cleanup'):
-                module.cleanup()
-
-        # 3. Trie les injections par priorité (basse à haute)
+            except Exception as e:
+                # Un module en erreur ne doit pas priver le tour des autres contextes
+                logger.error(f"[Injections] '{name}' : {e}")
+                continue
+            if isinstance(injection, str):
+                # Modules historiques (NeuroClient, Multimodal) : texte brut
+                injection = Injection(injection, DEFAULT_INJECTION_PRIORITY)
+            if injection is not None and injection.priority >= 0 and injection.text.strip():
+                injections.append(injection)
         return sorted(injections, key=lambda x: x.priority)
 
+    def _cleanup_injections(self):
+        """ Fin d'un tour réussi : les modules effacent ce qui a été injecté (résumé Twitch, réflexes...). """
+        for name, module in list(self.modules.items()):
+            if module is not self and hasattr(module, 'cleanup'):
+                try:
+                    module.cleanup()
+                except Exception as e:
+                    logger.error(f"[Injections] Nettoyage de '{name}' : {e}")
+
+    def _fetch_and_cleanup_injections(self) -> List[Injection]:
+        """ Collecte les injections puis demande le nettoyage immédiatement. """
+        injections = self._fetch_injections()
+        self._cleanup_injections()
+        return injections
 
     def assemble_injections(self) -> str:
-        """ Assemble les injections triées en une seule chaîne de prompt. """
-        injections = self._fetch_and_cleanup_injections()
+        """
+        Assemble les injections triées en une seule chaîne de prompt.
+        Sans nettoyage : l'appelant appelle _cleanup_injections() une fois la réponse obtenue,
+        pour qu'un tour en échec ne perde pas le contexte (ex : le résumé Twitch).
+        """
+        injections = self._fetch_injections()
         
         prompt = ""
         for injection in injections:
@@ -86,8 +108,8 @@ class AbstractLLMWrapper:
                 return True
 
         # 2. Vérification de la Blacklist
-        text_padded = " " + text.lower() + " "
-        if any((" " + bad_word.lower() + " ") in text_padded for bad_word in self.llmState.blacklist):
+        # Mot entouré d'espaces (ou en bord de texte), cherché avec toutes les autres règles en un passage
+        if get_text_analyzer().analyze(text).has("blacklist"):
             logger.warning(f"[LLM Filter] Message filtré : terme blacklisté trouvé.")
             return True
             
@@ -134,6 +156,10 @@ class AbstractLLMWrapper:
     def prepare_payload(self):
         raise NotImplementedError("Must implement prepare_payload in child classes")
 
+    def on_response(self, response_text: str):
+        """ Réponse finale d'un tour, non filtrée (ex : ImageLLMWrapper mémorise ce que le modèle a vu). """
+        pass
+
     def prompt(self):
         """ Gère la boucle de streaming et la mise à jour des signaux. """
         if not self.llmState.enabled:
@@ -190,6 +216,8 @@ class AbstractLLMWrapper:
                 if not ttft_logged and chunk:
                     ttft = time.time() - start_time
                     self.signals.llm_latency = ttft
+                    get_metrics().mark("first_token")
+                    get_metrics().observe("clio_llm_ttft_ms", ttft * 1000, model=type(self).__name__)
                     ttft_logged = True
                 
                 AI_message += chunk
@@ -210,6 +238,8 @@ class AbstractLLMWrapper:
         # Ici, nous ne faisons qu'un filtrage final de sécurité si le Prompter a laissé échapper du contenu toxique.
         if self.is_filtered(AI_message):
              AI_message = "Je ne peux pas répondre à cela. Ce sujet est filtré par mes règles éthiques."
+        else:
+            self.on_response(AI_message)
 
         logger.info("AI OUTPUT: " + AI_message)
 
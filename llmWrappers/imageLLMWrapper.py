@@ -5,12 +5,19 @@ import numpy as np
 from transformers import AutoTokenizer 
 from constants import *
 from llmWrappers.abstractLLMWrapper import AbstractLLMWrapper
+from modules.frameBus import FrameSource
+from modules.frameDiff import FrameChangeGate, SKIP, CROP, FULL
+from modules.payloadEncoder import PayloadEncoder, EncodedImage
+from concurrent.futures import Future
 import time
-from typing import List, Dict, Any, Union, Optional
+from typing import List, Dict, Any, Union, Optional, Tuple
 import logging
 
 logger = logging.getLogger('ImageLLMWrapper')
 
+ENCODE_TIMEOUT = 5  # Secondes max pour réduire et encoder une capture
+SCREEN_MEMORY_CHARS = 600  # Description gardée par écran (réinjectée quand l'image n'est pas renvoyée)
+
 class ImageLLMWrapper(AbstractLLMWrapper):
 
     def __init__(self, signals, tts, llmState, modules=None):
@@ -24,6 +31,15 @@ class ImageLLMWrapper(AbstractLLMWrapper):
         
         # Initialisation Mss (peut être fait ici si on veut)
         self.MSS: Optional[mss.base.MSS] = None 
+        # Bus d'images partagé (modules/frameBus.py), même si la capture tourne dans un processus de travail
+        self._frames = FrameSource(CLIO_FRAME_BUS_NAME)
+        # Tri des trames : pas d'image envoyée si l'écran n'a pas changé (modules/frameDiff.py)
+        self.frame_gate = FrameChangeGate()
+        self._reference_hash: Optional[int] = None  # Dernier écran envoyé (référence du tri des trames)
+        self._pending_hash: Optional[int] = None    # Écran joint au tour en cours (sa description suivra)
+        self._pending_context = ""                  # Description du reste de l'écran quand seule une zone part
+        # Réduction + encodage dans un thread dédié (profil dans constants.MULTIMODAL_ENCODE_PROFILE)
+        self.encoder = PayloadEncoder(MULTIMODAL_ENCODE_PROFILE)
         
         if MULTIMODAL_MODEL:
             try:
@@ -38,7 +54,7 @@ class ImageLLMWrapper(AbstractLLMWrapper):
         self.visual_query: str = "Décris l'écran pour contextualiser ma réponse à la dernière requête utilisateur."
 
     def _encode_to_base64(self, image_path: Optional[str] = None, numpy_array: Optional[np.ndarray] = None) -> str:
-        """Encode une image (chemin ou array) en Base64 JPEG."""
+        """Encode une image (chemin ou array) en Base64 selon le profil d'encodage."""
         if image_path:
             frame_array = cv2.imread(image_path)
             if frame_array is None:
@@ -49,19 +65,26 @@ class ImageLLMWrapper(AbstractLLMWrapper):
         else:
             return ""
 
-        encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 95]
-        result, frame_encoded = cv2.imencode('.jpg', frame_array, encode_param)
-        
-        if result:
-            return base64.b64encode(frame_encoded).decode("utf-8")
-        return ""
+        encoded = self.encoder.submit(frame_array).result(timeout=ENCODE_TIMEOUT)
+        return encoded.base64 if encoded else ""
+
+    def _shared_frame(self) -> Optional[np.ndarray]:
+        """
+        Dernière trame du service de capture partagé (vue sans copie), lue directement sur le bus :
+        None s'il ne publie pas (arrêté, ou processus de travail en cours de relance).
+        """
+        frame = self._frames.get(max_age=1.0 / SCREEN_CAPTURE_FPS * 2)
+        return frame.image if frame is not None else None
+
+    def grab_frame(self) -> Optional[np.ndarray]:
+        """Trame BGR de l'écran principal (bus partagé en priorité, sinon capture mss)."""
+        # Priorité au bus d'images partagé : pas de seconde capture ni de tableau intermédiaire
+        shared = self._shared_frame()
+        if shared is not None:
+            return shared
 
-    def screen_shot(self) -> str:
-        """Prend une capture d'écran de l'écran principal et la retourne en Base64 JPEG."""
         if self.MSS is None:
             self.MSS = mss.mss()
-            
-        start_time = time.time()
         
         try:
             # Capture d'écran se concentre sur l'écran PRINCIPAL
@@ -69,16 +92,70 @@ class ImageLLMWrapper(AbstractLLMWrapper):
             frame_bytes = self.MSS.grab(self.MSS.monitors[PRIMARY_MONITOR])
 
             frame_array = np.array(frame_bytes)
-            frame_array = cv2.cvtColor(frame_array, cv2.COLOR_BGRA2BGR)
-            
-            frame_base64 = self._encode_to_base64(numpy_array=frame_array)
-            
-            logger.info(f"[Multimodal] Capture d'écran et encodage réalisés en {time.time() - start_time:.2f}s.")
-            return frame_base64
+            return cv2.cvtColor(frame_array, cv2.COLOR_BGRA2BGR)
             
         except Exception as e:
             logger.error(f"ERREUR CAPTURE D'ÉCRAN: {e}")
+            return None
+
+    def screen_shot(self) -> str:
+        """Prend une capture d'écran de l'écran principal et la retourne en Base64 JPEG."""
+        start_time = time.time()
+        frame_array = self.grab_frame()
+        if frame_array is None:
             return ""
+        frame_base64 = self._encode_to_base64(numpy_array=frame_array)
+        logger.info(f"[Multimodal] Capture d'écran et encodage réalisés en {time.time() - start_time:.2f}s.")
+        return frame_base64
+
+    def gated_screen_shot(self) -> Tuple[Optional["Future[Optional[EncodedImage]]"], str]:
+        """
+        Capture passée au tri des trames. Retourne (encodage en cours ou None, note pour le modèle) :
+        - écran inchangé ou déjà vu -> pas d'image, la description que le modèle en a faite est réinjectée
+        - petite zone modifiée      -> la zone seule, avec la description du reste de l'écran
+        - sinon (ou description perdue) -> l'écran complet
+        La réponse du tour devient la description de l'écran envoyé (on_response).
+        L'encodage tourne pendant que l'appelant assemble le texte du prompt.
+        """
+        frame_array = self.grab_frame()
+        if frame_array is None:
+            return None, ""
+        # Copie : la vue du bus serait réécrite avant la fin de l'encodage
+        frame_array = frame_array.copy()
+        self._pending_hash = None
+
+        decision = self.frame_gate.evaluate(frame_array)
+        # Ce que le modèle a dit de l'écran de référence (None si sa réponse s'est perdue)
+        seen = self.frame_gate.lookup("screen", self._reference_hash) if self._reference_hash is not None else None
+        if decision.action == SKIP and seen is not None:
+            logger.info(f"[Multimodal] Écran inchangé : description précédente réinjectée ({self.frame_gate.stats}).")
+            return None, f"[Écran inchangé depuis ta dernière observation. Tu y voyais : {seen}]"
+
+        # Toute autre scène déjà décrite plus tôt (ex : retour sur un menu) : description mémorisée par hash
+        known = self.frame_gate.lookup("screen", decision.frame_hash) if decision.action == FULL else None
+        if known is not None:
+            logger.info("[Multimodal] Écran déjà vu (hash en cache) : description réinjectée.")
+            self._reference_hash = decision.frame_hash
+            return None, f"[Cet écran a déjà été vu plus tôt. Tu y voyais : {known}]"
+
+        self._reference_hash = self._pending_hash = decision.frame_hash
+        self._pending_context = ""
+        if decision.action == CROP and seen is not None:
+            self._pending_context = seen
+            x, y, w, h = decision.bbox
+            note = (f"[Seule la zone modifiée de l'écran est jointe : {w}x{h} px à partir de ({x}, {y}). "
+                    f"Le reste de l'écran n'a pas changé, tu y voyais : {seen}]")
+            return self.encoder.submit(decision.apply(frame_array)), note
+        return self.encoder.submit(frame_array), ""
+
+    def on_response(self, response_text: str):
+        """Réponse au tour qui portait une image : gardée comme ce que le modèle a vu de cet écran."""
+        if self._pending_hash is None or not response_text.strip():
+            return
+        # Zone seule : la description couvre aussi le reste de l'écran (les plus récentes d'abord conservées)
+        description = f"{self._pending_context} Puis : {response_text.strip()}" if self._pending_context else response_text.strip()
+        self.frame_gate.remember("screen", self._pending_hash, description[-SCREEN_MEMORY_CHARS:])
+        self._pending_hash = None
 
     def assemble_injections(self, messages: List[Dict[str, str]]) -> str:
         """Assemble l'historique textuel et le système prompt en une seule chaîne lisible pour le LLM."""
@@ -108,6 +185,8 @@ class ImageLLMWrapper(AbstractLLMWrapper):
         
         # 1. DÉTERMINATION DE LA SOURCE VISUELLE
         visual_source_base64 = ""
+        visual_note = ""
+        pending_encode = None
         source_type = "screenshot"
         
         # Vérifie si le Prompter a injecté un chemin de fichier pour l'analyse
@@ -118,16 +197,17 @@ class ImageLLMWrapper(AbstractLLMWrapper):
             # Tente d'encoder le fichier uploadé
             visual_source_base64 = self._encode_to_base64(image_path=file_to_analyze)
             source_type = "file_upload"
+            self._pending_hash = None  # La réponse décrira le fichier, pas l'écran
         else:
-            # Par défaut: capture d'écran
-            visual_source_base64 = self.screen_shot()
+            # Par défaut: capture d'écran (triée : rien n'est envoyé si l'écran n'a pas changé)
+            pending_encode, visual_note = self.gated_screen_shot()
         
-        if not visual_source_base64:
+        if not visual_source_base64 and pending_encode is None and not visual_note:
              raise RuntimeError(f"Impossible d'obtenir une source visuelle ({source_type}).")
              
         # 2. INSTRUCTION VISUELLE
         # Utilise le prompt d'injection du Prompter s'il est disponible, sinon utilise une requête par défaut.
-        visual_instruction = self.visual_query 
+        visual_instruction = f"{self.visual_query}\n{visual_note}" if visual_note else self.visual_query
 
         # 3. CONSTRUIRE LE PAYLOAD FINAL (Format ChatML/Multimodal)
         
@@ -135,6 +215,30 @@ class ImageLLMWrapper(AbstractLLMWrapper):
         current_query = messages[-1]['content'] if messages and messages[-1]['role'] == 'user' else "Décris ce que tu vois."
         
         # Le contenu sera une liste combinant l'instruction, l'image, et le reste de l'historique textuel
+        content: List[Dict[str, Any]] = [
+            {
+                "type": "text",
+                "text": f"{visual_instruction}\nVoici l'historique de la conversation: {self.assemble_injections(messages)}"
+            }
+        ]
+
+        # Le texte est prêt : on récupère l'image encodée en parallèle
+        if pending_encode is not None:
+            encoded = pending_encode.result(timeout=ENCODE_TIMEOUT)
+            if encoded is None:
+                raise RuntimeError("Échec de l'encodage de la capture d'écran.")
+            visual_source_base64 = encoded.base64
+            logger.info(f"[Multimodal] Image {encoded.width}x{encoded.height} : {encoded.encoded_bytes / 1024:.0f} Ko "
+                        f"(réduction {encoded.resize_ms:.1f} ms, encodage {encoded.encode_ms:.1f} ms).")
+
+        if visual_source_base64:
+            content.append({
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:{self.encoder.mime};base64,{visual_source_base64}"
+                }
+            })
+
         return {
             "model": self.model_name,
             "stream": True,
@@ -143,18 +247,7 @@ class ImageLLMWrapper(AbstractLLMWrapper):
             "messages": [
                 {
                     "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"{visual_instruction}\nVoici l'historique de la conversation: {self.assemble_injections(messages)}"
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{visual_source_base64}"
-                            }
-                        }
-                    ]
+                    "content": content
                 }
             ]
         }
\ No newline at end of file
@@ -3,6 +3,8 @@ from typing import List
 import time
 import logging
 
+from modules.textAnalysis import Rule, get_text_analyzer
+
 logger = logging.getLogger('LLMState')
 
 class LLMState:
@@ -25,6 +27,16 @@ class LLMState:
         else:
             logger.error("LLMState initialisé avec ERREUR. Vérifiez le statut de la liste noire.")
 
+    @property
+    def blacklist(self) -> List[str]:
+        return self._blacklist
+
+    @blacklist.setter
+    def blacklist(self, words: List[str]):
+        # Chaque nouvelle liste (fichier rechargé, dashboard) est déclarée au moteur d'analyse partagé
+        self._blacklist = words
+        get_text_analyzer().register("blacklist", [Rule("blacklist", word, boundary="space") for word in words])
+
     def reload_blacklist(self, initial_load: bool = False):
         """
         Recharge la liste noire depuis 'blacklist.txt'.
@@ -1,10 +1,13 @@
 import requests 
 import json
+import time
+import asyncio
 import logging
 import re 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from constants import LLM_ENDPOINT, SYSTEM_PROMPT, STOP_STRINGS 
 from llmWrappers.abstractLLMWrapper import AbstractLLMWrapper
+from metrics import get_metrics
 
 log = logging.getLogger('TextLLMWrapper')
 
@@ -49,16 +52,29 @@ class TextLLMWrapper(AbstractLLMWrapper):
             return "Désolée Maman, mon cerveau a eu un petit bug générique. Je suis de retour !"
         return text
 
-    def prompt(self):
-        """Boucle de génération principale avec streaming vers VTube Studio et le Dashboard."""
-        if not self.llmState.enabled:
-            return
+    @staticmethod
+    def _with_injections(messages: List[Dict[str, str]], injections: str) -> List[Dict[str, str]]:
+        """Copie des messages avec le contexte des modules ajouté au prompt système (l'historique n'en garde rien)."""
+        if not injections:
+            return messages
+        context = f"[CONTEXTE DU MOMENT]\n{injections}"
+        if messages and messages[0]['role'] == 'system':
+            system = dict(messages[0], content=f"{messages[0]['content']}\n\n{context}")
+            return [system] + messages[1:]
+        return [{"role": "system", "content": context}] + messages
 
-        self.signals.AI_thinking = True
-        self.signals.AI_speaking = False 
+    def _stream_reply(self, messages: Optional[List[Dict[str, str]]] = None) -> str:
+        """
+        Requête streaming à Ollama sur signals.history (ou sur les messages déjà construits par
+        le Prompter) + injections des modules (chat Twitch, HUD, réflexes, vision) ;
+        retourne la réponse brute (tags compris).
+        """
+        metrics = get_metrics()
 
         # Mise à jour du prompt système dynamique
-        dynamic_prompt = self._get_dynamic_system_prompt()
+        with metrics.span("prompt_build"):
+            dynamic_prompt = self._get_dynamic_system_prompt()
+            injections = self.assemble_injections()
         
         if self.signals.history and self.signals.history[0]['role'] == 'system':
             self.signals.history[0]['content'] = dynamic_prompt
@@ -67,7 +83,7 @@ class TextLLMWrapper(AbstractLLMWrapper):
 
         payload = {
             "model": self.API_MODEL,
-            "messages": self.signals.history,
+            "messages": self._with_injections(self.signals.history if messages is None else messages, injections),
             "stream": True,
             "options": {
                 "temperature": 0.8,
@@ -75,28 +91,44 @@ class TextLLMWrapper(AbstractLLMWrapper):
             }
         }
 
+        # Utilisation de requests pour le streaming
+        start = time.perf_counter()
+        response = requests.post(self.endpoint, json=payload, stream=True, timeout=60)
+        response.raise_for_status()
+        
+        full_response = ""
+
+        # chunk_size=None : chaque morceau HTTP d'Ollama est lu dès son arrivée (512 octets par défaut retardent le 1er token)
+        for line in response.iter_lines(chunk_size=None):
+            if line:
+                chunk = json.loads(line.decode('utf-8'))
+                content = chunk.get('message', {}).get('content', '')
+                
+                if content:
+                    if not full_response:
+                        metrics.mark("first_token")
+                        metrics.observe("clio_llm_ttft_ms", (time.perf_counter() - start) * 1000, model=self.API_MODEL)
+                    metrics.inc("clio_llm_chunks_total")
+                    full_response += content
+                    # Envoi au dashboard
+                    self.signals.sio_queue.put(("next_chunk", content))
+
+        metrics.observe("clio_llm_generation_ms", (time.perf_counter() - start) * 1000, model=self.API_MODEL)
+        return full_response
+
+    def prompt(self):
+        """Boucle de génération principale avec streaming vers VTube Studio et le Dashboard."""
+        if not self.llmState.enabled:
+            return
+
+        # AI_speaking est piloté par l'AudioPlayer (début/fin de lecture réelle), pas par le LLM
+        self.signals.AI_thinking = True
+        metrics = get_metrics()
+        metrics.ensure_turn("llm")
+
         try:
-            # Utilisation de requests pour le streaming
-            response = requests.post(self.endpoint, json=payload, stream=True, timeout=60)
-            response.raise_for_status()
-            
-            full_response = ""
-            first_token = True
-
-            for line in response.iter_lines():
-                if line:
-                    chunk = json.loads(line.decode('utf-8'))
-                    content = chunk.get('message', {}).get('content', '')
-                    
-                    if content:
-                        # Active le LipSync dès le premier mot
-                        if first_token:
-                            self.signals.AI_speaking = True
-                            first_token = False
-                        
-                        full_response += content
-                        # Envoi au dashboard
-                        self.signals.sio_queue.put(("next_chunk", content))
+            full_response = self._stream_reply()
+            self._cleanup_injections()  # Contexte consommé : le prochain tour verra le suivant
 
             # Nettoyage et stockage
             clean_text = self.sanitize_response(self.clean_response_tags(full_response))
@@ -105,16 +137,42 @@ class TextLLMWrapper(AbstractLLMWrapper):
             # Envoi au module voix (TTS)
             tts_module = self.modules.get('tts')
             if tts_module:
-                tts_module.API.speak(clean_text)
+                # speak est une coroutine : planifiée sur la boucle principale (prompt tourne dans un thread)
+                asyncio.run_coroutine_threadsafe(tts_module.API.speak(clean_text), self.signals.loop)
             else:
                 self.signals.AI_speaking = False
+                metrics.end_turn("llm_done")  # Pas de voix : le tour s'arrête au texte
 
         except Exception as e:
             log.error(f"Erreur lors du prompt LLM : {e}")
+            metrics.inc("clio_llm_errors_total", model=self.API_MODEL)
+            metrics.end_turn("llm_error")
             self.signals.AI_speaking = False
         finally:
             self.signals.AI_thinking = False
 
+    async def generate_response(self, user_text: str, messages: Optional[List[Dict[str, str]]] = None) -> str:
+        """
+        Appelé par BrainModule : la réponse est retournée avec ses [TAGS] d'émotion, sans être
+        dite (le Brain pilote VTS puis le TTS lui-même). `messages` : prompt complet du Prompter
+        (système, mémoire, requête), envoyé à la place de signals.history.
+        """
+        if not self.llmState.enabled:
+            return ""
+        self.signals.AI_thinking = True
+        self.signals.history.append({"role": "user", "content": user_text})
+        try:
+            full_response = await asyncio.to_thread(self._stream_reply, messages)
+        except Exception:
+            get_metrics().inc("clio_llm_errors_total", model=self.API_MODEL)
+            raise
+        finally:
+            self.signals.AI_thinking = False
+        self._cleanup_injections()
+        response = self.sanitize_response(full_response)
+        self.signals.history.append({"role": "assistant", "content": self.clean_response_tags(response)})
+        return response
+
     class API:
         def __init__(self, outer):
             self.outer = outer
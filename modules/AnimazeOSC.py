@@ -2,10 +2,9 @@ import os
 import subprocess
 import time
 import asyncio
-from pythonosc import udp_client
-from pythonosc.udp_client import SimpleUDPClient
 from modules.module import Module
-from typing import Dict, Any, Optional, Tuple, Callable
+from modules.avatarTransport import get_transport
+from typing import Dict, Any, Optional, Tuple, Callable, Union
 
 
 # --- CONFIGURATION ET CHEMINS ---
@@ -14,7 +13,11 @@ ANIMAZE_PATH = "G:\\Steam\\steamapps\\common\\Animaze\\Bin\\AnimazeDesktop.exe"
 ANIMAZE_PROCESS_NAME = "AnimazeDesktop.exe"
 IP = "127.0.0.1"
 PORT = 9000 
-OSC_CLIENT = SimpleUDPClient(IP, PORT) 
+STATS_PUSH_INTERVAL = 2.0  # Secondes entre deux envois des compteurs OSC au dashboard
+
+# Paramètres de bouche pilotés par l'enveloppe audio (voir modules/lipSync.py)
+MOUTH_OPEN_ADDRESS = "/Animaze/Set/Param/MouthOpen"
+MOUTH_FORM_ADDRESS = "/Animaze/Set/Param/MouthSmile"
 
 
 # --- FONCTIONS EXTERNES DE LANCEMENT ---
@@ -68,19 +71,16 @@ class AnimazeOSC(Module):
     def __init__(self, signals, enabled=True):
         super().__init__(signals, enabled)
         self.API = self.API(self)
-        self.client = OSC_CLIENT
+        # Socket UDP unique, partagée avec les autres émetteurs OSC (voir modules/avatarTransport.py)
+        self.transport = get_transport(IP, PORT)
         self.connected = True # ⬅️ CORRECTION: L'interrupteur est sur ON pour le Prompter
         print(f"✨ Animaze OSC Module initialisé. IP:{IP}, Port:{PORT}")
 
 
     def send_osc_command(self, address: str, value: float):
-        """Envoie une commande OSC à Animaze."""
+        """Planifie une commande OSC vers Animaze (regroupée par trame par le transport)."""
         if self.enabled and self.connected:
-            try:
-                OSC_CLIENT.send_message(address, value)
-            except Exception as e:
-                # Si l'erreur se produit ici, c'est qu'Animaze n'est pas prêt.
-                print(f"[Animaze OSC Error] Failed to send {address}: {e}")
+            self.transport.set(address, value)
 
     # ⬅️ CORRECTION AVANCÉE: Rendre cette méthode synchrone pour éviter les problèmes de threading/asyncio
     def send_hotkey(self, emotion: str):
@@ -88,25 +88,31 @@ class AnimazeOSC(Module):
         address = EMOTION_MAPPING.get(emotion.lower())
         
         if address:
-            # 1. Active l'émotion demandée à fond (1.0)
-            self.send_osc_command(address, 1.0)
-            # 2. Règle immédiatement au neutre (0.0). Le temps de la transition est géré par Animaze.
-            self.send_osc_command(address, 0.0) 
+            # Active l'émotion à fond (1.0) puis revient au neutre (0.0) à la trame suivante.
+            # Le temps de la transition est géré par Animaze.
+            if self.enabled and self.connected:
+                self.transport.pulse(address, 1.0, 0.0)
         else:
             print(f"[Animaze] Emotion '{emotion}' non mappée.")
 
-    # ⬅️ set_mouth_open est laissé comme une méthode vide mais synchrone
-    def set_mouth_open(self, state: bool):
-        """Contrôle l'ouverture de la bouche."""
+    def set_mouth_open(self, state: Union[bool, float]):
+        """Contrôle l'ouverture de la bouche (booléen historique ou amplitude 0.0 - 1.0)."""
         if self.enabled:
-            # Pour l'OSC, l'ouverture de bouche est souvent gérée par le suivi audio dans Animaze.
-            # L'appel est maintenu pour la compatibilité avec speak_with_mouth.
-            pass
+            self.send_osc_command(MOUTH_OPEN_ADDRESS, float(state))
+
+    def set_mouth(self, mouth_open: float, mouth_form: float):
+        """Ouverture + forme de bouche : le transport les envoie dans le même bundle OSC."""
+        if not (self.enabled and self.connected):
+            return
+        self.transport.set(MOUTH_OPEN_ADDRESS, float(mouth_open))
+        self.transport.set(MOUTH_FORM_ADDRESS, float(mouth_form))
 
     async def run(self):
         # Ce module reste en vie pour répondre aux appels d'API du Prompter
         while not self.signals.terminate:
-            await asyncio.sleep(1)
+            await asyncio.sleep(STATS_PUSH_INTERVAL)
+            # Débits de livraison OSC affichés dans la sidebar du dashboard
+            self.signals.sio_queue.put(('avatar_transport_stats', self.transport.get_stats()))
 
     # ⬅️ CORRECTION: La classe API appelle maintenant les méthodes directement (synchrone)
     class API:
@@ -116,6 +122,13 @@ class AnimazeOSC(Module):
             # Appel synchrone direct à la méthode corrigée
             self.outer.send_hotkey(emotion) 
 
-        def set_mouth_open(self, state: bool):
+        def set_mouth_open(self, state: Union[bool, float]):
             # Appel synchrone direct
-            self.outer.set_mouth_open(state)
\ No newline at end of file
+            self.outer.set_mouth_open(state)
+
+        def set_mouth(self, mouth_open: float, mouth_form: float):
+            # Appelé à cadence fixe par le LipSyncDriver de l'AudioPlayer
+            self.outer.set_mouth(mouth_open, mouth_form)
+
+        def get_transport_stats(self) -> Dict[str, Any]:
+            return self.outer.transport.get_stats()
\ No newline at end of file
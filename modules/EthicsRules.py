@@ -5,6 +5,8 @@ import unicodedata
 import logging
 from typing import Dict, List, Tuple, Any
 
+from modules.textAnalysis import Rule, get_text_analyzer
+
 class EthicsProfile:
     def __init__(self, patterns_filename: str = "ethics_patterns.json"):
         """
@@ -24,6 +26,16 @@ class EthicsProfile:
         }
         self.compiled_allowed: re.Pattern = re.compile("|".join(self.allowed_patterns), re.IGNORECASE)
 
+        # Mêmes règles déclarées au moteur partagé : validate() ne parcourt le texte qu'une fois
+        # (les injections de prompt ne sont cherchées que dans le texte brut, comme avant)
+        analyzer = get_text_analyzer()
+        analyzer.register("ethics", [
+            Rule(category, pattern, regex=True,
+                 views=("lower",) if category == "Prompt Injection" else ("lower", "folded"))
+            for category, patterns in self.banned_patterns.items() for pattern in patterns
+        ])
+        analyzer.register("ethics_allowed", [Rule("allowed", pattern, regex=True) for pattern in self.allowed_patterns])
+
     def _normalize(self, text: str) -> str:
         """
         Nettoie le texte pour détecter les contournements (ex: p.é.d.é ou s@lope).
@@ -87,22 +99,21 @@ class EthicsProfile:
         """
         # 0. SÉCURITÉ : Si le texte contient un mot "allowed", il passe outre la censure
         # Cela permet à Clio de dire "Bonjour Ambre" même si "Ambre" était banni par erreur.
-        if self.compiled_allowed.search(text):
+        analysis = get_text_analyzer().analyze(text)
+        if analysis.has("ethics_allowed"):
             return (True, "OK_ALLOWED")
 
         # 1. Analyse du texte brut
-        for category, compiled_regex in self.compiled_banned.items():
-            if compiled_regex.search(text):
-                print(f"[Ethics] REJETÉ : {category}")
-                return (False, category)
+        categories = analysis.rules("ethics", view="lower")
+        if categories:
+            print(f"[Ethics] REJETÉ : {categories[0]}")
+            return (False, categories[0])
 
         # 2. Analyse du texte normalisé
-        normalized_text = self._normalize(text)
-        for category, compiled_regex in self.compiled_banned.items():
-            if category != "Prompt Injection":
-                if compiled_regex.search(normalized_text):
-                    print(f"[Ethics] REJETÉ (Normalisé) : {category}")
-                    return (False, category)
+        categories = analysis.rules("ethics", view="folded")
+        if categories:
+            print(f"[Ethics] REJETÉ (Normalisé) : {categories[0]}")
+            return (False, categories[0])
 
         return (True, "OK")
 
@@ -1,21 +1,32 @@
 import os
+import time
 import asyncio
 import queue
 import logging
 import subprocess
 from math import ceil
+from typing import Optional
 from modules.module import Module
+from modules.lipSync import LipSyncEnvelope, LipSyncDriver, find_avatar_module
+from metrics import get_metrics
 
 # Configuration du logging pour voir les erreurs dans la console
 logger = logging.getLogger('AudioPlayer')
 
+STREAM_CHUNK_TIMEOUT = 10  # Secondes sans nouveau morceau PCM avant d'abandonner le flux
+
 class AudioPlayer(Module):
-    def __init__(self, signals, enabled=True):
+    def __init__(self, signals, enabled=True, modules=None):
         super().__init__(signals, enabled)
+        self.modules = modules if modules is not None else {}
         self.play_queue = queue.SimpleQueue()
         self.abort_flag = False
         self.paused = False
         self.API = self.API(self)
+        self._pyaudio = None
+
+        # Lip-sync : l'enveloppe est calculée sur le PCM réellement joué
+        self.lipsync = LipSyncDriver(lambda: find_avatar_module(self.modules))
 
         # Liste des fichiers dans le dossier 'songs' comme sur le GitHub
         self.audio_files = []
@@ -30,7 +41,8 @@ class AudioPlayer(Module):
                     self.audio_files.append(audio_obj)
 
     async def run(self):
-        logger.info("🎶 AudioPlayer (Mode PowerShell MP3) ACTIF")
+        logger.info("🎶 AudioPlayer (Mode PowerShell MP3 + Flux PCM) ACTIF")
+        self.lipsync.start()
         
         while not self.signals.terminate:
             if not self.enabled:
@@ -43,6 +55,19 @@ class AudioPlayer(Module):
             # Si la queue contient un fichier à lire
             if not self.play_queue.empty():
                 file_target = self.play_queue.get()
+
+                # Flux PCM (moteur TTS local) : lecture au fil de l'eau
+                if isinstance(file_target, AudioPlayer.PcmStream):
+                    start = time.time()
+                    try:
+                        self.signals.AI_speaking = True
+                        await asyncio.to_thread(self._play_pcm_stream, file_target)
+                    except Exception as e:
+                        logger.error(f"❌ Erreur lecture flux PCM : {e}")
+                    finally:
+                        self.signals.AI_speaking = False
+                        self._playback_done(start, "stream")
+                    continue
                 
                 # Recherche du chemin du fichier
                 path_to_play = None
@@ -60,20 +85,36 @@ class AudioPlayer(Module):
                 if path_to_play:
                     try:
                         logger.info(f"🔊 Clio joue : {path_to_play}")
+                        start = time.time()
                         self.signals.AI_speaking = True
-                        
-                        # On utilise un thread pour que PowerShell ne bloque pas tout le programme
-                        await asyncio.to_thread(self._play_mp3, path_to_play)
+
+                        # Décodage en PCM pour piloter la bouche ; sinon lecture PowerShell classique
+                        decoded = await asyncio.to_thread(self._decode_to_pcm, path_to_play)
+                        if decoded is not None:
+                            await asyncio.to_thread(self._play_pcm_stream, decoded)
+                        else:
+                            # On utilise un thread pour que PowerShell ne bloque pas tout le programme
+                            await asyncio.to_thread(self._play_mp3, path_to_play)
                         
                     except Exception as e:
                         logger.error(f"❌ Erreur lecture audio : {e}")
                     finally:
                         self.signals.AI_speaking = False
+                        # Les fichiers du TTS (temp/tts_*.mp3) terminent un tour, pas les musiques
+                        self._playback_done(start, "file", os.path.basename(path_to_play).startswith("tts_"))
                 else:
                     logger.warning(f"⚠️ Fichier non trouvé : {file_target}")
 
             await asyncio.sleep(0.1)
 
+    @staticmethod
+    def _playback_done(start: float, kind: str, ends_turn: bool = True):
+        """Fin de lecture réelle : clôt le tour de conversation tracé (metrics.py)."""
+        metrics = get_metrics()
+        metrics.observe("clio_playback_ms", (time.time() - start) * 1000, kind=kind)
+        if ends_turn:
+            metrics.end_turn("playback_end")
+
     def _play_mp3(self, path):
         """Lance la lecture via Windows Media Player en arrière-plan"""
         full_path = os.path.abspath(path)
@@ -89,12 +130,88 @@ class AudioPlayer(Module):
         # Exécution silencieuse
         subprocess.run(cmd, capture_output=True)
 
+    def _get_pyaudio(self):
+        if self._pyaudio is None:
+            import pyaudio
+            self._pyaudio = pyaudio.PyAudio()
+        return self._pyaudio
+
+    def _play_pcm_stream(self, stream: 'AudioPlayer.PcmStream'):
+        """Joue un flux PCM 16 bits mono morceau par morceau (thread dédié)."""
+        import pyaudio
+        from constants import OUTPUT_DEVICE_INDEX
+
+        envelope = LipSyncEnvelope(stream.sample_rate, stream.channels)
+        pa = self._get_pyaudio()
+        out = pa.open(
+            format=pyaudio.paInt16,
+            channels=stream.channels,
+            rate=stream.sample_rate,
+            output=True,
+            output_device_index=OUTPUT_DEVICE_INDEX
+        )
+        try:
+            while not self.abort_flag and not self.signals.terminate:
+                try:
+                    chunk = stream.chunks.get(timeout=STREAM_CHUNK_TIMEOUT)
+                except queue.Empty:
+                    logger.warning("⚠️ Flux PCM interrompu (plus de données).")
+                    break
+                if chunk is None:
+                    break
+                while self.paused and not self.abort_flag:
+                    time.sleep(0.05)
+                # L'enveloppe est planifiée juste avant l'écriture : la bouche suit le son réel
+                self.lipsync.schedule(envelope.feed(chunk), envelope.frame_duration)
+                out.write(chunk)
+        finally:
+            if self.abort_flag:
+                self.lipsync.clear()
+            else:
+                self.lipsync.close_mouth()
+            out.stop_stream()
+            out.close()
+
+    def _decode_to_pcm(self, path: str) -> Optional['AudioPlayer.PcmStream']:
+        """Décode un MP3/WAV en flux PCM (pydub + FFmpeg). None si indisponible."""
+        try:
+            from pydub import AudioSegment
+            segment = AudioSegment.from_file(path).set_sample_width(2)
+        except Exception as e:
+            logger.debug(f"Décodage PCM impossible ({e}), lecture PowerShell.")
+            return None
+
+        stream = AudioPlayer.PcmStream(segment.frame_rate, segment.channels)
+        raw = segment.raw_data
+        # Morceaux de ~100 ms : même granularité que le flux TTS local
+        step = segment.frame_rate * segment.channels * 2 // 10
+        for offset in range(0, len(raw), step):
+            stream.write(raw[offset:offset + step])
+        stream.close()
+        return stream
+
     class Audio:
         """Structure pour stocker les infos des fichiers"""
         def __init__(self, file_name, path):
             self.file_name = file_name
             self.path = path
 
+    class PcmStream:
+        """Flux audio PCM alimenté par le TTS pendant la synthèse (un par réplique)."""
+        def __init__(self, sample_rate: int, channels: int = 1):
+            self.sample_rate = sample_rate
+            self.channels = channels
+            self.chunks = queue.SimpleQueue()
+            self.first_write_time: Optional[float] = None
+
+        def write(self, pcm: bytes):
+            if self.first_write_time is None:
+                self.first_write_time = time.time()
+            self.chunks.put(pcm)
+
+        def close(self):
+            self.chunks.put(None)
+
     class API:
         """Interface utilisée par les autres modules (TTS, etc.)"""
         def __init__(self, outer):
@@ -106,6 +223,12 @@ class AudioPlayer(Module):
         def play_audio(self, file_name_or_path):
             self.outer.play_queue.put(file_name_or_path)
 
+        def open_stream(self, sample_rate: int, channels: int = 1) -> 'AudioPlayer.PcmStream':
+            """Ouvre un flux PCM : la lecture démarre dès le premier morceau écrit."""
+            stream = AudioPlayer.PcmStream(sample_rate, channels)
+            self.outer.play_queue.put(stream)
+            return stream
+
         def stop_playing(self):
             # On vide la file d'attente
             while not self.outer.play_queue.empty():
@@ -0,0 +1,201 @@
+# Fichier : modules/avatarTransport.py
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from pythonosc.udp_client import SimpleUDPClient
+from pythonosc import osc_bundle_builder, osc_message_builder
+
+logger = logging.getLogger('AvatarTransport')
+
+'''
+Transport unique vers l'avatar (Animaze / tout récepteur OSC).
+Tous les émetteurs (EmotionSync, tags d'émotion du BrainModule, lip-sync, mode idle)
+écrivent des valeurs de paramètres ; un thread unique les regroupe par trame
+dans UN bundle OSC envoyé sur UNE socket UDP gardée ouverte.
+- Une valeur remplacée avant l'envoi est abandonnée (seule la plus récente compte).
+- Chaque adresse a un intervalle minimal entre deux envois (limitation de débit).
+'''
+
+# --- CONFIGURATION ---
+AVATAR_OSC_IP = "127.0.0.1"
+AVATAR_OSC_PORT = 9000
+TRANSPORT_FPS = 60              # Trames (bundles) max par seconde
+DEFAULT_MIN_INTERVAL = 0.0      # Intervalle minimal par adresse (0 = une fois par trame)
+MAX_MESSAGES_PER_BUNDLE = 32    # Au-delà, le reste part à la trame suivante (MTU UDP)
+STATS_WINDOW = 5.0              # Fenêtre (s) pour le calcul des débits affichés au dashboard
+
+# Intervalles minimaux spécifiques (préfixe d'adresse -> secondes)
+ADDRESS_MIN_INTERVALS = {
+    "/Animaze/Set/Exp/": 0.10,   # Expressions : inutile de les rafraîchir à 60 Hz
+    "/idle": 0.50,
+}
+
+
+class AvatarTransport:
+    """Émetteur OSC persistant avec regroupement par trame et limitation par adresse."""
+
+    def __init__(self, ip: str = AVATAR_OSC_IP, port: int = AVATAR_OSC_PORT, fps: int = TRANSPORT_FPS):
+        self.ip = ip
+        self.port = port
+        self.frame_period = 1.0 / fps
+        self.client = SimpleUDPClient(ip, port)
+
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Any] = {}         # Valeurs à envoyer à la prochaine trame
+        self._deferred: Dict[str, Any] = {}        # Valeurs pour la trame d'après (impulsions)
+        self._last_sent_at: Dict[str, float] = {}
+        self._held: Set[str] = set()               # Adresses retenues par la limitation de débit
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        # Compteurs cumulés (exposés au dashboard)
+        self.counters = {
+            "messages_sent": 0,
+            "bundles_sent": 0,
+            "superseded": 0,      # Valeurs remplacées avant leur trame
+            "rate_limited": 0,    # Valeurs remplacées pendant que la limitation de débit les retenait
+            "errors": 0,
+        }
+        self._history: Deque[Tuple[float, int, int]] = deque()
+
+    # --- CYCLE DE VIE ---
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="ClioAvatarTransport", daemon=True)
+        self._thread.start()
+        logger.info(f"📡 Transport avatar OSC actif ({self.ip}:{self.port}, {1 / self.frame_period:.0f} trames/s max)")
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+
+    # --- ÉCRITURE DES PARAMÈTRES ---
+
+    def set(self, address: str, value: Any):
+        """Planifie une valeur pour la prochaine trame (remplace la valeur en attente)."""
+        with self._lock:
+            self._count_overwrite(address)
+            self._pending[address] = value
+            self._deferred.pop(address, None)
+        self._wakeup.set()
+
+    def pulse(self, address: str, on_value: Any = 1.0, off_value: Any = 0.0):
+        """Déclenche une impulsion : on_value à la prochaine trame, off_value à la suivante."""
+        with self._lock:
+            self._count_overwrite(address)
+            self._pending[address] = on_value
+            self._deferred[address] = off_value
+        self._wakeup.set()
+
+    def _count_overwrite(self, address: str):
+        """Appelé sous verrou : une valeur en attente est abandonnée au profit de la nouvelle."""
+        if address in self._pending:
+            self.counters["rate_limited" if address in self._held else "superseded"] += 1
+
+    # --- BOUCLE D'ENVOI ---
+
+    def _min_interval(self, address: str) -> float:
+        for prefix, interval in ADDRESS_MIN_INTERVALS.items():
+            if address.startswith(prefix):
+                return interval
+        return DEFAULT_MIN_INTERVAL
+
+    def _collect_frame(self, now: float) -> Dict[str, Any]:
+        """Extrait les valeurs envoyables maintenant ; les autres restent en attente."""
+        frame: Dict[str, Any] = {}
+        with self._lock:
+            for address in list(self._pending):
+                if len(frame) >= MAX_MESSAGES_PER_BUNDLE:
+                    break
+                if now - self._last_sent_at.get(address, 0.0) < self._min_interval(address):
+                    self._held.add(address)
+                    continue
+                self._held.discard(address)
+                frame[address] = self._pending.pop(address)
+                self._last_sent_at[address] = now
+                # L'impulsion retombe à la trame suivante
+                if address in self._deferred:
+                    self._pending[address] = self._deferred.pop(address)
+        return frame
+
+    def _send_frame(self, frame: Dict[str, Any]):
+        try:
+            if len(frame) == 1:
+                address, value = next(iter(frame.items()))
+                self.client.send_message(address, value)
+            else:
+                bundle = osc_bundle_builder.OscBundleBuilder(osc_bundle_builder.IMMEDIATELY)
+                for address, value in frame.items():
+                    msg = osc_message_builder.OscMessageBuilder(address=address)
+                    msg.add_arg(value)
+                    bundle.add_content(msg.build())
+                self.client.send(bundle.build())
+            with self._lock:
+                self.counters["messages_sent"] += len(frame)
+                self.counters["bundles_sent"] += 1
+        except Exception as e:
+            with self._lock:
+                self.counters["errors"] += 1
+            # Si l'erreur se produit ici, c'est que le récepteur n'est pas prêt.
+            logger.debug(f"[AvatarTransport] Échec d'envoi : {e}")
+
+    def _loop(self):
+        while self._running:
+            self._wakeup.wait(timeout=1.0)
+            self._wakeup.clear()
+            start = time.monotonic()
+
+            frame = self._collect_frame(start)
+            if frame:
+                self._send_frame(frame)
+
+            with self._lock:
+                still_pending = bool(self._pending)
+            # On garde le rythme de trame tant qu'il reste des valeurs (limitées ou impulsions)
+            delay = self.frame_period - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+            if still_pending:
+                self._wakeup.set()
+
+    # --- STATISTIQUES ---
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Compteurs cumulés + débits (messages/s, bundles/s) sur la fenêtre glissante."""
+        now = time.monotonic()
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.counters)
+            stats["pending"] = len(self._pending)
+            self._history.append((now, stats["messages_sent"], stats["bundles_sent"]))
+            while len(self._history) > 1 and now - self._history[0][0] > STATS_WINDOW:
+                self._history.popleft()
+            oldest = self._history[0]
+
+        elapsed = now - oldest[0]
+        stats["messages_per_s"] = round((stats["messages_sent"] - oldest[1]) / elapsed, 1) if elapsed > 0 else 0.0
+        stats["bundles_per_s"] = round((stats["bundles_sent"] - oldest[2]) / elapsed, 1) if elapsed > 0 else 0.0
+        return stats
+
+
+# --- INSTANCE PARTAGÉE ---
+
+_transports: Dict[Tuple[str, int], AvatarTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(ip: str = AVATAR_OSC_IP, port: int = AVATAR_OSC_PORT) -> AvatarTransport:
+    """Retourne (et démarre au besoin) le transport partagé pour cette destination."""
+    with _transports_lock:
+        transport = _transports.get((ip, port))
+        if transport is None:
+            transport = AvatarTransport(ip, port)
+            _transports[(ip, port)] = transport
+        transport.start()
+        return transport
@@ -3,7 +3,9 @@ import asyncio
 import re
 import random
 import time
+from collections import deque
 from typing import Optional, Dict, List, Any
+from modules.injection import Injection
 from modules.module import Module
 
 logger = logging.getLogger('BrainModule')
@@ -20,8 +22,16 @@ class BrainModule(Module):
         self.nicknames_stream = ["Elroth", "Gendero", "MrsXar", "Elroth_tomias"]
         self.nicknames_family = ["Aymeric"] # Pour le mode neutre F9
 
-    async def process_llm_response(self, input_text: str, source: str = "voice"):
-        """Gère la réflexion de Clio et coordonne les modules."""
+        # --- RÉFLEXES (événements anti-rebond publiés par le ReflexEngine) ---
+        self.recent_reflexes = deque(maxlen=10)
+        self._reflexes_injected_until = 0.0  # Horodatage du dernier réflexe passé dans un prompt
+
+    async def process_llm_response(self, input_text: str, source: str = "voice",
+                                   messages: Optional[List[Dict[str, str]]] = None) -> Optional[str]:
+        """
+        Gère la réflexion de Clio et coordonne les modules ; retourne la réplique dite (tags compris).
+        messages : prompt déjà construit par le Prompter (sinon le Wrapper part de signals.history).
+        """
         try:
             # Récupération des modules
             monitor = self.modules.get('monitor')
@@ -50,9 +60,8 @@ class BrainModule(Module):
                 logger.error("❌ Module LLM manquant dans BrainModule")
                 return
 
-            # On ne construit PAS le prompt ici (c'est le rôle du Wrapper)
-            # On envoie juste le texte brut, le Wrapper s'occupe du reste
-            raw_response = await llm.generate_response(input_text) 
+            # On ne construit PAS le prompt ici (c'est le rôle du Wrapper ou du Prompter)
+            raw_response = await llm.generate_response(input_text, messages=messages)
             
             # --- 4. GESTION DES PSEUDONYMES DYNAMIQUES ---
             current_mode = self.signals.context_mode
@@ -78,6 +87,7 @@ class BrainModule(Module):
 
             # --- 6. PAROLE (TTS) ---
             await self.speak(processed_text)
+            return processed_text
 
         except Exception as e:
             logger.error(f"💥 Crash Brain : {e}")
@@ -92,13 +102,40 @@ class BrainModule(Module):
             if clean_text:
                 await tts.API.speak(clean_text)
 
+    def handle_action(self, action: Dict[str, Any]):
+        """Traite un événement de la file d'actions (réflexes de jeu, etc.)."""
+        if action.get("type") == "reflex_event":
+            self.recent_reflexes.append(action)
+            logger.debug(f"⚡ Réflexe reçu : {action['game']} / {action['name']} ({action['value']:.3f})")
+
+    def get_prompt_injection(self):
+        """Derniers réflexes (moins de 30 s) pour que Clio sache ce qui se passe en jeu."""
+        now = time.time()
+        recent = [a for a in self.recent_reflexes if now - a["timestamp"] < 30]
+        if not recent:
+            return Injection("", -1)
+        self._reflexes_injected_until = max(a["timestamp"] for a in recent)
+        events = ", ".join(f"{a['name']} ({a['game']})" for a in recent)
+        return Injection(f"[RÉFLEXES EN JEU] Événements récents : {events}.", 60)
+
+    def cleanup(self):
+        """Appelé après une réponse du LLM : un réflexe n'est raconté qu'une fois.
+        Ceux arrivés pendant la génération restent pour le tour suivant (file en ordre d'arrivée)."""
+        while self.recent_reflexes and self.recent_reflexes[0]["timestamp"] <= self._reflexes_injected_until:
+            self.recent_reflexes.popleft()
+
     async def run(self):
         logger.info("🧠 BrainModule (Skirr-Compatible) prêt.")
         while not self.signals.terminate:
-            await asyncio.sleep(1)
+            try:
+                # On consomme la file d'actions (timeout pour relire le signal d'arrêt)
+                action = await asyncio.wait_for(self.signals.action_queue.get(), timeout=1)
+                self.handle_action(action)
+            except asyncio.TimeoutError:
+                continue
 
     class API:
         def __init__(self, outer):
             self.outer = outer
-        async def process_llm_response(self, text, source="voice"):
-            # await self.outer.process_llm_response(text, source=source)
\ No newline at end of file
+        async def process_llm_response(self, text, source="voice", messages=None):
+            return await self.outer.process_llm_response(text, source=source, messages=messages)
\ No newline at end of file
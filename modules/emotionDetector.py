@@ -1,5 +1,6 @@
-import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+
+from modules.textAnalysis import Rule, get_text_analyzer
 
 # NOTE: Le logging est préféré à print() dans les modules
 import logging
@@ -32,25 +33,20 @@ class EmotionDetector:
             "happy": 5, "sad": 7, "anxious": 9, "angry": 8, "dreamy": 2, "mocking": 3, "surprised": 4, "calm": 1
         }
 
+        # Mots-clés compilés avec les autres filtres (un seul parcours du message pour toutes les émotions)
+        get_text_analyzer().register("emotion", [
+            Rule(emotion, word, weight, boundary="word")
+            for emotion, keywords in self.emotion_keywords.items() for word, weight in keywords
+        ])
+
 
     def detect_emotion(self, message: str) -> Dict[str, Any]:
         """
         Détecte l'émotion dominante basée sur le score total des mots-clés trouvés.
         Retourne l'émotion, le score total, et une estimation de l'impact.
         """
-        message = message.lower()
-        emotion_scores: Dict[str, int] = {}
-        
-        # 1. Calcul des scores pour chaque émotion
-        for emotion, keywords in self.emotion_keywords.items():
-            current_score = 0
-            for word, weight in keywords:
-                # Utiliser des limites de mots pour éviter les fausses détections
-                if re.search(rf"\b{word}\b", message):
-                    current_score += weight
-            
-            if current_score > 0:
-                emotion_scores[emotion] = current_score
+        # 1. Calcul des scores pour chaque émotion (limites de mots : pas de fausses détections)
+        emotion_scores: Dict[str, int] = get_text_analyzer().analyze(message).scores("emotion")
 
         # 2. Déterminer l'émotion dominante
         if not emotion_scores:
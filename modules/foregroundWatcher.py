@@ -0,0 +1,275 @@
+# Fichier : modules/foregroundWatcher.py
+import sys
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from modules.module import Module
+
+logger = logging.getLogger('ForegroundWatcher')
+
+'''
+Service unique d'activité au premier plan (enregistré sous modules['foreground']).
+- Windows : hook SetWinEventHook (changement de fenêtre active et de titre), aucun sondage
+- Autres OS : lecture du titre actif (pygetwindow) à intervalle court, mise en cache
+- Un seul parcours psutil des processus (jeux / médias lancés en arrière-plan), à intervalle lent
+L'état courant (titre, processus, jeu, média) est lu en cache par tous les modules
+(ReflexEngine, HudReader, ActivityMonitor...) et chaque changement est diffusé aux abonnés.
+'''
+
+# --- CONFIGURATION ---
+FOREGROUND_POLL_INTERVAL = 0.5   # Repli sans hook Windows (secondes)
+PROCESS_SCAN_INTERVAL = 10.0     # Parcours des processus lancés (secondes)
+
+# Programmes que Clio doit reconnaître pour adapter son comportement
+KNOWN_GAMES: Dict[str, str] = {
+    "warframe.exe": "warframe",
+    "warframe.x64.exe": "warframe",
+    "backpack_battles.exe": "backpack",
+    "eldenring.exe": "Elden Ring",
+    "bg3.exe": "Baldur's Gate 3",
+    "genshinimpact.exe": "Genshin Impact",
+    "starrail.exe": "Star Rail",
+    "league of legends.exe": "League of Legends",
+    "steam.exe": "Steam",
+    "minecraft.exe": "Minecraft",
+    "balatro.exe": "Balatro",
+}
+
+# Lanceurs : ouverts en permanence en arrière-plan, ils ne prouvent pas qu'une partie est en cours
+LAUNCHERS = {
+    "steam.exe",
+    "steamwebhelper.exe",
+    "epicgameslauncher.exe",
+    "epicwebhelper.exe",
+    "xboxpcapp.exe",
+    "xboxapp.exe",
+    "gamingservices.exe",
+}
+LAUNCHER_NAMES = {KNOWN_GAMES[p] for p in LAUNCHERS if p in KNOWN_GAMES}
+
+KNOWN_MEDIA: Dict[str, str] = {
+    "vlc.exe": "VLC",
+    "mpv.exe": "MPV Player",
+    "netflix.exe": "Netflix",
+    "crunchyroll.exe": "Crunchyroll",
+    "discord.exe": "Discord",
+    "chrome.exe": "Chrome",
+    "firefox.exe": "Firefox",
+}
+
+_watcher: Optional["ForegroundWatcher"] = None
+
+
+class ForegroundState(NamedTuple):
+    title: str
+    process: str
+    pid: Optional[int]
+    game: str          # Jeu au premier plan, sinon jeu lancé en arrière-plan, sinon "none"
+    media: Optional[str]
+    activity: str
+    timestamp: float
+
+
+def read_foreground() -> Tuple[str, Optional[int]]:
+    """(titre, pid) de la fenêtre active ; pid None hors Windows."""
+    if sys.platform == "win32":
+        import ctypes
+        import ctypes.wintypes as wt
+        user32 = ctypes.windll.user32
+        hwnd = user32.GetForegroundWindow()
+        if not hwnd:
+            return "", None
+        length = user32.GetWindowTextLengthW(hwnd)
+        buffer = ctypes.create_unicode_buffer(length + 1)
+        user32.GetWindowTextW(hwnd, buffer, length + 1)
+        pid = wt.DWORD()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        return buffer.value, pid.value
+    try:
+        import pygetwindow as gw
+        window = gw.getActiveWindow()
+        return (window.title if window and window.title else ""), None
+    except Exception:
+        return "", None
+
+
+def get_watcher() -> Optional["ForegroundWatcher"]:
+    """Service en cours d'exécution (None si Clio ne l'a pas lancé : lire read_foreground())."""
+    return _watcher
+
+
+class ForegroundWatcher(Module):
+    def __init__(self, signals, enabled=True):
+        super().__init__(signals, enabled)
+        self.API = self.API(self)
+        self.state = ForegroundState("", "", None, "none", None, "idle", time.time())
+        self.running_processes: List[str] = []
+        self._process_names: Dict[int, str] = {}
+        self._subscribers: List[Callable[[ForegroundState], Any]] = []
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    # --- RÉSOLUTION DE L'ÉTAT ---
+
+    def _process_name(self, pid: Optional[int]) -> str:
+        if not pid:
+            return ""
+        if pid not in self._process_names:
+            try:
+                import psutil
+                self._process_names[pid] = psutil.Process(pid).name().lower()
+            except Exception:
+                return ""
+        return self._process_names[pid]
+
+    def _refresh(self):
+        """Relit la fenêtre active et publie l'état s'il a changé (thread du hook ou du sondage)."""
+        title, pid = read_foreground()
+        process = self._process_name(pid)
+        lowered = title.lower()
+
+        # Replis (titre, processus en arrière-plan) : un lanceur ouvert ne compte pas comme un jeu
+        game = KNOWN_GAMES.get(process) or next(
+            (g for g in KNOWN_GAMES.values() if g.lower() in lowered and g not in LAUNCHER_NAMES), None
+        ) or next((KNOWN_GAMES[p] for p in self.running_processes if p in KNOWN_GAMES and p not in LAUNCHERS), "none")
+        media = KNOWN_MEDIA.get(process) or next(
+            (KNOWN_MEDIA[p] for p in self.running_processes if p in KNOWN_MEDIA), None
+        )
+        if game != "none":
+            activity = f"en train de jouer à {game}"
+        elif media:
+            activity = f"en train de regarder {media}"
+        else:
+            activity = "idle"
+
+        with self._lock:
+            previous = self.state
+            if (title, process, game, media) == (previous.title, previous.process, previous.game, previous.media):
+                return
+            self.state = ForegroundState(title, process, pid, game, media, activity, time.time())
+            state = self.state
+
+        # Mise à jour du signal global (STT, sidecar vision...) puis des abonnés
+        if self.signals.current_game != game:
+            self.signals.current_game = game
+        self.signals.sio_queue.put(("foreground_update", state._asdict()))
+        for callback in list(self._subscribers):
+            try:
+                callback(state)
+            except Exception as e:
+                logger.error(f"Erreur abonné premier plan : {e}")
+
+    # --- SOURCES ---
+
+    def _hook_loop(self) -> bool:
+        """Hook WinEvent (Windows) : rappel à chaque changement de fenêtre active ou de son titre."""
+        try:
+            import ctypes
+            import ctypes.wintypes as wt
+            user32 = ctypes.windll.user32
+        except Exception:
+            return False
+
+        EVENT_SYSTEM_FOREGROUND = 0x0003
+        EVENT_OBJECT_NAMECHANGE = 0x800C
+        OBJID_WINDOW = 0
+        WinEventProc = ctypes.WINFUNCTYPE(None, wt.HANDLE, wt.DWORD, wt.HWND, wt.LONG, wt.LONG, wt.DWORD, wt.DWORD)
+
+        def on_event(hook, event, hwnd, id_object, id_child, thread_id, event_time):
+            # Changement de titre : seulement celui de la fenêtre active
+            if event == EVENT_OBJECT_NAMECHANGE and (id_object != OBJID_WINDOW or hwnd != user32.GetForegroundWindow()):
+                return
+            self._refresh()
+
+        callback = WinEventProc(on_event)  # Référence gardée : sinon le rappel est libéré
+        hooks = [user32.SetWinEventHook(event, event, 0, callback, 0, 0, 0)
+                 for event in (EVENT_SYSTEM_FOREGROUND, EVENT_OBJECT_NAMECHANGE)]
+        if not all(hooks):
+            return False
+
+        logger.info("🪟 Fenêtre active suivie par hook WinEvent (sans sondage).")
+        msg = wt.MSG()
+        try:
+            while not self.signals.terminate:
+                while user32.PeekMessageW(ctypes.byref(msg), 0, 0, 0, 1):
+                    user32.TranslateMessage(ctypes.byref(msg))
+                    user32.DispatchMessageW(ctypes.byref(msg))
+                time.sleep(0.05)
+        finally:
+            for hook in hooks:
+                user32.UnhookWinEvent(hook)
+        return True
+
+    def _window_loop(self):
+        self._refresh()
+        if sys.platform == "win32" and self._hook_loop():
+            return
+        logger.info(f"🪟 Fenêtre active relue toutes les {FOREGROUND_POLL_INTERVAL}s (pas de hook disponible).")
+        while not self.signals.terminate:
+            self._refresh()
+            time.sleep(FOREGROUND_POLL_INTERVAL)
+
+    def _process_loop(self):
+        try:
+            import psutil
+        except ImportError:
+            logger.warning("⚠️ psutil absent : détection des jeux par titre de fenêtre uniquement.")
+            return
+        while not self.signals.terminate:
+            names = {p.info['name'].lower() for p in psutil.process_iter(['name']) if p.info['name']}
+            self.running_processes = sorted(n for n in names if n in KNOWN_GAMES or n in KNOWN_MEDIA)
+            self._process_names = {}  # Les pid peuvent être réutilisés
+            self._refresh()
+            time.sleep(PROCESS_SCAN_INTERVAL)
+
+    async def run(self):
+        global _watcher
+        if not self.enabled:
+            return
+        _watcher = self
+        self._threads = [
+            threading.Thread(target=self._window_loop, name="ClioForegroundWindow", daemon=True),
+            threading.Thread(target=self._process_loop, name="ClioForegroundProcesses", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info("💡 Service de premier plan actif.")
+
+        while not self.signals.terminate:
+            await asyncio.sleep(1)
+        _watcher = None
+
+    class API:
+        def __init__(self, outer):
+            self.outer = outer
+
+        def get_state(self) -> ForegroundState:
+            """État en cache (aucun appel système)."""
+            return self.outer.state
+
+        def get_window_title(self) -> str:
+            return self.outer.state.title
+
+        def get_current_game(self) -> str:
+            return self.outer.state.game
+
+        def get_running_processes(self) -> List[str]:
+            return list(self.outer.running_processes)
+
+        def subscribe(self, callback: Callable[[ForegroundState], Any]):
+            """callback(ForegroundState) à chaque changement, appelé dans le thread du service."""
+            self.outer._subscribers.append(callback)
+
+        def unsubscribe(self, callback: Callable[[ForegroundState], Any]):
+            if callback in self.outer._subscribers:
+                self.outer._subscribers.remove(callback)
+
+        def subscribe_async(self, callback: Callable[[ForegroundState], Any], loop: asyncio.AbstractEventLoop):
+            """Variante pour les modules asyncio : callback(état) est planifié dans leur boucle."""
+            def relay(state):
+                loop.call_soon_threadsafe(callback, state)
+            self.subscribe(relay)
+            return relay  # À passer à unsubscribe()
@@ -0,0 +1,254 @@
+# Fichier : modules/frameBus.py
+import os
+import time
+import logging
+import threading
+from multiprocessing import shared_memory
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger('FrameBus')
+
+'''
+Bus d'images en mémoire partagée (tampon circulaire) entre le service de capture
+et tous les consommateurs (ReflexEngine, ImageLLMWrapper, ClioTrainer, dashboard...).
+Un seul processus écrit ; les lecteurs (même dans un autre processus) obtiennent
+des vues NumPy directement sur la mémoire partagée, sans copie.
+
+Disposition du segment :
+  [méta int64 x8][demande float64][seq par slot int64 x N][horodatage par slot float64 x N]
+  [padding -> 64 octets][slot 0 : H x W x C uint8]...[slot N-1]
+Chaque slot utilise un verrou de séquence : seq = -1 pendant l'écriture,
+puis le numéro de la trame. Un lecteur vérifie que le numéro n'a pas changé
+après usage (is_current) s'il a besoin d'une garantie de cohérence.
+'''
+
+BUS_MAGIC = 0x434C494F  # "CLIO"
+META_MAGIC, META_WIDTH, META_HEIGHT, META_CHANNELS, META_SLOTS, META_LATEST, META_WRITER_PID = range(7)
+META_FIELDS = 8
+DEMAND_OFFSET = META_FIELDS * 8
+SLOTS_OFFSET = DEMAND_OFFSET + 8
+DATA_ALIGN = 64
+REATTACH_AFTER = 5.0  # Trame plus vieille malgré la demande : écrivain arrêté ou relancé (nouveau segment)
+
+
+class Frame(NamedTuple):
+    """Trame publiée : la vue 'image' pointe directement dans la mémoire partagée."""
+    seq: int
+    timestamp: float
+    image: np.ndarray
+    slot: int
+
+
+def _data_offset(slots: int) -> int:
+    end = SLOTS_OFFSET + 16 * slots
+    return (end + DATA_ALIGN - 1) // DATA_ALIGN * DATA_ALIGN
+
+
+def _segment_size(width: int, height: int, channels: int, slots: int) -> int:
+    return _data_offset(slots) + slots * width * height * channels
+
+
+class _FrameBusBase:
+    """Vues NumPy communes à l'écrivain et aux lecteurs."""
+    def _map(self, shm: shared_memory.SharedMemory, slots: int):
+        buf = shm.buf
+        self._meta = np.ndarray((META_FIELDS,), dtype=np.int64, buffer=buf, offset=0)
+        self._demand = np.ndarray((1,), dtype=np.float64, buffer=buf, offset=DEMAND_OFFSET)
+        self._slot_seq = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=SLOTS_OFFSET)
+        self._slot_ts = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=SLOTS_OFFSET + 8 * slots)
+
+    def _map_frames(self, shm: shared_memory.SharedMemory):
+        self.width = int(self._meta[META_WIDTH])
+        self.height = int(self._meta[META_HEIGHT])
+        self.channels = int(self._meta[META_CHANNELS])
+        self.slots = int(self._meta[META_SLOTS])
+        self._frames = np.ndarray(
+            (self.slots, self.height, self.width, self.channels),
+            dtype=np.uint8, buffer=shm.buf, offset=_data_offset(self.slots)
+        )
+
+    def _release_views(self):
+        self._meta = self._demand = self._slot_seq = self._slot_ts = self._frames = None
+
+    @property
+    def shape(self):
+        return (self.height, self.width, self.channels)
+
+    def latest(self) -> Optional[Frame]:
+        """Dernière trame complète (vue sans copie), None si rien n'a encore été publié."""
+        for _ in range(3):
+            seq = int(self._meta[META_LATEST])
+            if seq <= 0:
+                return None
+            slot = seq % self.slots
+            if int(self._slot_seq[slot]) == seq:
+                return Frame(seq, float(self._slot_ts[slot]), self._frames[slot], slot)
+        return None
+
+    def is_current(self, frame: Frame) -> bool:
+        """True si le slot n'a pas été réécrit depuis la lecture (verrou de séquence)."""
+        return int(self._slot_seq[frame.slot]) == frame.seq
+
+
+class FrameBus(_FrameBusBase):
+    """Côté écrivain : crée le segment et publie les trames (un seul écrivain par bus)."""
+
+    def __init__(self, name: str, width: int, height: int, channels: int = 3, slots: int = 3):
+        self.name = name
+        size = _segment_size(width, height, channels, slots)
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Reste d'une session précédente (crash) : on le remplace
+            stale = shared_memory.SharedMemory(name=name, create=False)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        self._map(self.shm, slots)
+        self._meta[:] = 0
+        self._meta[META_WIDTH] = width
+        self._meta[META_HEIGHT] = height
+        self._meta[META_CHANNELS] = channels
+        self._meta[META_SLOTS] = slots
+        self._meta[META_WRITER_PID] = os.getpid()
+        self._demand[0] = 0.0
+        self._slot_seq[:] = 0
+        self._slot_ts[:] = 0.0
+        self._map_frames(self.shm)
+        self._meta[META_MAGIC] = BUS_MAGIC  # Écrit en dernier : le segment est prêt
+        self._seq = 0
+        logger.info(f"🖼️ Bus d'images '{name}' créé ({width}x{height}x{channels}, {slots} slots, {size / 1e6:.1f} Mo)")
+
+    def begin_write(self) -> np.ndarray:
+        """Réserve le prochain slot et retourne sa vue pour y écrire directement (sans tampon)."""
+        self._seq += 1
+        slot = self._seq % self.slots
+        self._slot_seq[slot] = -1
+        return self._frames[slot]
+
+    def commit(self, timestamp: Optional[float] = None):
+        slot = self._seq % self.slots
+        self._slot_ts[slot] = timestamp if timestamp is not None else time.time()
+        self._slot_seq[slot] = self._seq
+        self._meta[META_LATEST] = self._seq
+
+    def publish(self, image: np.ndarray, timestamp: Optional[float] = None):
+        """Copie une image (déjà au bon format) dans le prochain slot."""
+        np.copyto(self.begin_write(), image)
+        self.commit(timestamp)
+
+    def last_demand(self) -> float:
+        """Horodatage de la dernière lecture signalée par un consommateur."""
+        return float(self._demand[0])
+
+    def close(self):
+        self._release_views()
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except (FileNotFoundError, BufferError) as e:
+            logger.debug(f"Fermeture du bus '{self.name}' : {e}")
+
+
+class FrameBusReader(_FrameBusBase):
+    """Côté lecteur : s'attache à un bus existant (même processus ou autre processus)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.shm = shared_memory.SharedMemory(name=name, create=False)
+        self._map(self.shm, 1)
+        if int(self._meta[META_MAGIC]) != BUS_MAGIC:
+            self.close()
+            raise RuntimeError(f"Bus d'images '{name}' non initialisé.")
+        if int(self._meta[META_WRITER_PID]) != os.getpid():
+            self._untrack()
+        self._map(self.shm, int(self._meta[META_SLOTS]))
+        self._map_frames(self.shm)
+
+    def _untrack(self):
+        # Sous POSIX, le resource_tracker détruirait le segment à la sortie d'un lecteur externe
+        if os.name != "nt":
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+            except Exception:
+                pass
+
+    def touch(self):
+        """Signale au service de capture qu'un consommateur attend des trames."""
+        self._demand[0] = time.time()
+
+    def wait_fresh(self, max_age: float, timeout: float = 1.0) -> Optional[Frame]:
+        """Dernière trame de moins de max_age secondes (réveille la capture si besoin)."""
+        deadline = time.time() + timeout
+        while True:
+            self.touch()
+            frame = self.latest()
+            if frame is not None and time.time() - frame.timestamp <= max_age:
+                return frame
+            if time.time() >= deadline:
+                return frame
+            time.sleep(0.005)
+
+    def roi(self, x: int, y: int, w: int, h: int) -> Optional[np.ndarray]:
+        """Zone d'intérêt de la dernière trame (tranche NumPy, pas de copie)."""
+        frame = self.latest()
+        if frame is None:
+            return None
+        return frame.image[max(0, y):y + h, max(0, x):x + w]
+
+    def close(self):
+        self._release_views()
+        try:
+            self.shm.close()
+        except BufferError as e:
+            logger.debug(f"Vues encore actives sur le bus '{self.name}' : {e}")
+
+
+def attach_reader(name: str) -> Optional[FrameBusReader]:
+    """FrameBusReader si le service de capture tourne, sinon None (les appelants gardent leur repli)."""
+    try:
+        return FrameBusReader(name)
+    except (FileNotFoundError, RuntimeError, ValueError):
+        return None
+
+
+class FrameSource:
+    """
+    Lecture du bus pour un consommateur extérieur au service de capture (cœur, autre processus) :
+    attache paresseuse, puis nouvelle attache si l'écrivain s'est arrêté ou a été relancé
+    (processus de travail redémarré : nouveau segment sous le même nom).
+    """
+
+    def __init__(self, name: str, reattach_after: float = REATTACH_AFTER):
+        self.name = name
+        self.reattach_after = reattach_after
+        self.reader: Optional[FrameBusReader] = None
+        self._lock = threading.Lock()
+
+    def get(self, max_age: float, timeout: float = 1.0) -> Optional[Frame]:
+        """Dernière trame (vue sans copie) ou None si le service de capture ne publie pas."""
+        with self._lock:
+            if self.reader is None:
+                self.reader = attach_reader(self.name)
+            reader = self.reader
+        if reader is None:
+            return None
+        frame = reader.wait_fresh(max_age, timeout)
+        if frame is not None and time.time() - frame.timestamp <= self.reattach_after:
+            return frame
+        # Demande signalée mais rien de récent : l'écrivain ne tourne plus sur ce segment
+        with self._lock:
+            if self.reader is reader:
+                self.reader = None
+                reader.close()
+        return None
+
+    def close(self):
+        with self._lock:
+            if self.reader is not None:
+                self.reader.close()
+                self.reader = None
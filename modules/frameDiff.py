@@ -0,0 +1,203 @@
+# Fichier : modules/frameDiff.py
+import os
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger('FrameDiff')
+
+'''
+Étage de tri avant les modèles de vision (moondream, llava, multimodal).
+Sur une miniature en niveaux de gris :
+- un hash perceptuel (dHash 64 bits) dit si la scène est globalement la même ;
+- une différence par blocs localise ce qui a changé.
+Décision : SKIP (rien de significatif, pas d'inférence), CROP (n'envoyer que la zone
+modifiée) ou FULL (image complète). Les réponses des modèles sont mémorisées par hash :
+un menu déjà analysé n'est pas ré-analysé.
+'''
+
+# --- CONFIGURATION ---
+THUMB_SIZE = (160, 90)          # Miniature de comparaison (largeur, hauteur)
+GRID = (8, 8)                   # Découpage en blocs (colonnes, lignes)
+HASH_DISTANCE = 4               # Bits de dHash différents tolérés pour "même scène"
+BLOCK_THRESHOLD = 10.0          # Écart moyen (0-255) pour qu'un bloc soit "modifié"
+CROP_MAX_RATIO = 0.45           # Au-delà de cette proportion de blocs modifiés : image complète
+CACHE_SIZE = 256                # Réponses mémorisées (LRU)
+VISION_HASH_CACHE_PATH = os.path.join("temp", "vision_hash_cache.json")
+
+SKIP, FULL, CROP = "skip", "full", "crop"
+
+
+class GateDecision(NamedTuple):
+    action: str
+    frame_hash: int
+    bbox: Optional[Tuple[int, int, int, int]]   # (x, y, largeur, hauteur) en pixels d'origine
+    changed_ratio: float
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """Vue sur la zone à envoyer (pas de copie)."""
+        if self.action == CROP and self.bbox is not None:
+            x, y, w, h = self.bbox
+            return frame[y:y + h, x:x + w]
+        return frame
+
+
+def to_thumbnail(frame: np.ndarray) -> np.ndarray:
+    """Miniature en niveaux de gris (INTER_AREA : moyenne, robuste au bruit de compression)."""
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(frame, THUMB_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def dhash(thumb: np.ndarray) -> int:
+    """Hash par différence horizontale sur 9x8 pixels -> entier 64 bits."""
+    small = cv2.resize(thumb, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class HashResultCache:
+    """Résultats d'inférence par hash d'image (LRU), avec correspondance approchée."""
+
+    def __init__(self, size: int = CACHE_SIZE, max_distance: int = HASH_DISTANCE):
+        self.size = size
+        self.max_distance = max_distance
+        self.entries: "OrderedDict[Tuple[str, int], Any]" = OrderedDict()
+
+    def lookup(self, namespace: str, frame_hash: int) -> Optional[Any]:
+        key = (namespace, frame_hash)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        for (ns, cached_hash), value in reversed(self.entries.items()):
+            if ns == namespace and hamming(cached_hash, frame_hash) <= self.max_distance:
+                return value
+        return None
+
+    def store(self, namespace: str, frame_hash: int, value: Any):
+        self.entries[(namespace, frame_hash)] = value
+        self.entries.move_to_end((namespace, frame_hash))
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def load(self, path: str = VISION_HASH_CACHE_PATH):
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for item in json.load(f):
+                    self.store(item["ns"], int(item["hash"], 16), item["value"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ Cache vision illisible ({e}), on repart de zéro.")
+
+    def save(self, path: str = VISION_HASH_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = [{"ns": ns, "hash": f"{h:016x}", "value": v} for (ns, h), v in self.entries.items()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+
+class FrameChangeGate:
+    """Compare chaque trame à la dernière trame envoyée au modèle."""
+
+    def __init__(self, hash_distance: int = HASH_DISTANCE, block_threshold: float = BLOCK_THRESHOLD,
+                 crop_max_ratio: float = CROP_MAX_RATIO):
+        self.hash_distance = hash_distance
+        self.block_threshold = block_threshold
+        self.crop_max_ratio = crop_max_ratio
+        self.cache = HashResultCache(max_distance=hash_distance)
+
+        self._ref_thumb: Optional[np.ndarray] = None
+        self._ref_hash: Optional[int] = None
+        self._diff = np.empty((THUMB_SIZE[1], THUMB_SIZE[0]), dtype=np.uint8)
+        self.stats = {SKIP: 0, FULL: 0, CROP: 0, "cache_hits": 0}
+
+    def reset(self):
+        self._ref_thumb = None
+        self._ref_hash = None
+
+    def _changed_blocks(self, thumb: np.ndarray) -> np.ndarray:
+        cv2.absdiff(thumb, self._ref_thumb, dst=self._diff)
+        cols, rows = GRID
+        bh, bw = THUMB_SIZE[1] // rows, THUMB_SIZE[0] // cols
+        blocks = self._diff[:bh * rows, :bw * cols].reshape(rows, bh, cols, bw)
+        return blocks.mean(axis=(1, 3)) > self.block_threshold
+
+    def _bbox(self, changed: np.ndarray, frame_shape) -> Tuple[int, int, int, int]:
+        """Boîte englobante des blocs modifiés (+1 bloc de marge), en pixels d'origine."""
+        rows, cols = np.nonzero(changed)
+        r0, r1 = max(0, rows.min() - 1), min(GRID[1], rows.max() + 2)
+        c0, c1 = max(0, cols.min() - 1), min(GRID[0], cols.max() + 2)
+        height, width = frame_shape[:2]
+        x0, x1 = c0 * width // GRID[0], c1 * width // GRID[0]
+        y0, y1 = r0 * height // GRID[1], r1 * height // GRID[1]
+        return int(x0), int(y0), int(x1 - x0), int(y1 - y0)
+
+    def evaluate(self, frame: np.ndarray) -> GateDecision:
+        thumb = to_thumbnail(frame)
+        frame_hash = dhash(thumb)
+
+        if self._ref_thumb is None:
+            decision = GateDecision(FULL, frame_hash, None, 1.0)
+        else:
+            changed = self._changed_blocks(thumb)
+            ratio = float(changed.mean())
+            if not changed.any() and hamming(frame_hash, self._ref_hash) <= self.hash_distance:
+                decision = GateDecision(SKIP, frame_hash, None, ratio)
+            elif ratio > self.crop_max_ratio or not changed.any():
+                decision = GateDecision(FULL, frame_hash, None, ratio)
+            else:
+                decision = GateDecision(CROP, frame_hash, self._bbox(changed, frame.shape), ratio)
+
+        self.stats[decision.action] += 1
+        if decision.action != SKIP:
+            # La référence ne bouge que lorsqu'on envoie : les petites dérives finissent par compter
+            self._ref_thumb = thumb
+            self._ref_hash = frame_hash
+        return decision
+
+    def lookup(self, namespace: str, frame_hash: int) -> Optional[Any]:
+        result = self.cache.lookup(namespace, frame_hash)
+        if result is not None:
+            self.stats["cache_hits"] += 1
+        return result
+
+    def remember(self, namespace: str, frame_hash: int, result: Any):
+        self.cache.store(namespace, frame_hash, result)
+
+
+def image_file_hash(path: str) -> Optional[int]:
+    """dHash d'un fichier image (None si illisible)."""
+    frame = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if frame is None:
+        return None
+    return dhash(to_thumbnail(frame))
+
+
+def cached_image_analysis(path: str, namespace: str, analyze, cache_path: str = VISION_HASH_CACHE_PATH):
+    """
+    Pour les scripts de vision : réutilise la réponse d'une image (quasi) identique
+    déjà analysée au lieu de rappeler le modèle. analyze() n'est appelé qu'en cas d'échec.
+    """
+    cache = HashResultCache()
+    cache.load(cache_path)
+    frame_hash = image_file_hash(path)
+    if frame_hash is not None:
+        cached = cache.lookup(namespace, frame_hash)
+        if cached is not None:
+            logger.info("♻️ Image déjà analysée (hash identique), réponse en cache.")
+            return cached
+
+    result = analyze()
+    if result and frame_hash is not None:
+        cache.store(namespace, frame_hash, result)
+        cache.save(cache_path)
+    return result
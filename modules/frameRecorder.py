@@ -0,0 +1,210 @@
+# Fichier : modules/frameRecorder.py
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger('FrameRecorder')
+
+'''
+Enregistrement compact des trames d'entraînement (ClioTrainer).
+Au lieu d'un JPEG plein écran par trame, les trames sont réduites à une taille fixe et
+écrites par segments :
+- "video" : un fichier MP4 par segment (compression inter-trames, le plus compact)
+- "npy"   : un tableau NumPy uint8 (N, H, W, 3) par segment, relu en memmap (accès direct le plus rapide)
+Un index JSONL (une ligne par trame : segment, position, horodatage, jeu, profil) permet
+au FrameDataset de relire n'importe quelle trame sans parcourir tout l'enregistrement.
+'''
+
+# --- CONFIGURATION ---
+DEFAULT_RESOLUTION = (1280, 720)   # (largeur, hauteur) des trames enregistrées
+DEFAULT_SEGMENT_FRAMES = 256       # Trames par segment (fichier vidéo ou tableau)
+VIDEO_CODEC = "mp4v"
+INDEX_FILE = "index.jsonl"
+META_FILE = "recording.json"
+
+
+class FrameRecord(NamedTuple):
+    index: int
+    segment: str
+    offset: int
+    timestamp: float
+    game: str
+    info: str
+
+
+class FrameRecorder:
+    """Écrit des trames BGR dans des segments + un index JSONL (reprise possible d'un enregistrement existant)."""
+
+    def __init__(self, root: str, fmt: str = "video", resolution: Tuple[int, int] = DEFAULT_RESOLUTION,
+                 segment_frames: int = DEFAULT_SEGMENT_FRAMES, fps: float = 1.0):
+        if fmt not in ("video", "npy"):
+            raise ValueError(f"Format d'enregistrement inconnu : {fmt}")
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+        meta_path = os.path.join(root, META_FILE)
+        if os.path.exists(meta_path):
+            # Un enregistrement existe déjà : on garde SON format et SA résolution
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            fmt, resolution = meta["format"], tuple(meta["resolution"])
+            segment_frames, fps = meta["segment_frames"], meta["fps"]
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"format": fmt, "resolution": list(resolution),
+                           "segment_frames": segment_frames, "fps": fps}, f, indent=2)
+
+        self.fmt = fmt
+        self.resolution = resolution
+        self.segment_frames = segment_frames
+        self.fps = fps
+
+        self.count = self._count_existing()
+        self._segment_id = self._next_segment_id()
+        self._segment_name: Optional[str] = None
+        self._segment_fill = 0
+        self._writer: Optional[cv2.VideoWriter] = None
+        self._buffer: Optional[np.ndarray] = None
+        self._resized = np.empty((resolution[1], resolution[0], 3), dtype=np.uint8)
+        self._pending: List[FrameRecord] = []
+        self._index = open(os.path.join(root, INDEX_FILE), "a", encoding="utf-8")
+
+    def _count_existing(self) -> int:
+        path = os.path.join(self.root, INDEX_FILE)
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            return sum(1 for line in f if line.strip())
+
+    def _next_segment_id(self) -> int:
+        ids = [int(name.split("_")[1].split(".")[0]) for name in os.listdir(self.root) if name.startswith("segment_")]
+        return max(ids) + 1 if ids else 0
+
+    def _open_segment(self):
+        ext = ".mp4" if self.fmt == "video" else ".npy"
+        self._segment_name = f"segment_{self._segment_id:05d}{ext}"
+        self._segment_id += 1
+        self._segment_fill = 0
+        if self.fmt == "video":
+            fourcc = cv2.VideoWriter_fourcc(*VIDEO_CODEC)
+            self._writer = cv2.VideoWriter(os.path.join(self.root, self._segment_name), fourcc, self.fps, self.resolution)
+            if not self._writer.isOpened():
+                raise RuntimeError(f"Impossible d'ouvrir le segment vidéo {self._segment_name} ({VIDEO_CODEC})")
+        else:
+            width, height = self.resolution
+            self._buffer = np.empty((self.segment_frames, height, width, 3), dtype=np.uint8)
+
+    def _close_segment(self):
+        if self._segment_name is None:
+            return
+        if self.fmt == "video":
+            self._writer.release()
+            self._writer = None
+        elif self._segment_fill:
+            np.save(os.path.join(self.root, self._segment_name), self._buffer[:self._segment_fill])
+        # L'index n'est écrit qu'une fois le segment fermé : jamais d'entrée vers une trame perdue
+        self._index.writelines(json.dumps(record._asdict()) + "\n" for record in self._pending)
+        self._index.flush()
+        self._pending = []
+        self._segment_name = None
+
+    def write(self, frame: np.ndarray, game: str, info: str = "", timestamp: Optional[float] = None) -> FrameRecord:
+        if self._segment_name is None:
+            self._open_segment()
+
+        height, width = frame.shape[:2]
+        if (width, height) == self.resolution:
+            image = frame
+        else:
+            cv2.resize(frame, self.resolution, dst=self._resized, interpolation=cv2.INTER_AREA)
+            image = self._resized
+
+        if self.fmt == "video":
+            self._writer.write(image)
+        else:
+            self._buffer[self._segment_fill] = image
+
+        record = FrameRecord(self.count, self._segment_name, self._segment_fill,
+                             time.time() if timestamp is None else timestamp, game, info)
+        self._pending.append(record)
+        self.count += 1
+        self._segment_fill += 1
+        if self._segment_fill >= self.segment_frames:
+            self._close_segment()
+        return record
+
+    def close(self):
+        self._close_segment()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameDataset:
+    """
+    Lecture à accès direct d'un enregistrement : dataset[i] -> (trame BGR, FrameRecord).
+    Les segments NumPy sont ouverts en memmap ; pour la vidéo, une lecture séquentielle
+    réutilise le décodeur ouvert, un saut repositionne le segment.
+    """
+
+    def __init__(self, root: str, games: Optional[List[str]] = None):
+        self.root = root
+        with open(os.path.join(root, META_FILE), "r", encoding="utf-8") as f:
+            self.meta: Dict[str, Any] = json.load(f)
+        with open(os.path.join(root, INDEX_FILE), "r", encoding="utf-8") as f:
+            records = [FrameRecord(**json.loads(line)) for line in f if line.strip()]
+        if games:
+            records = [r for r in records if r.game in games]
+        self.records = records
+
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._capture: Optional[cv2.VideoCapture] = None
+        self._capture_segment: Optional[str] = None
+        self._capture_pos = 0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def labels(self) -> List[str]:
+        return sorted({r.game for r in self.records})
+
+    def _read_video(self, segment: str, offset: int) -> np.ndarray:
+        if self._capture_segment != segment:
+            if self._capture is not None:
+                self._capture.release()
+            self._capture = cv2.VideoCapture(os.path.join(self.root, segment))
+            self._capture_segment, self._capture_pos = segment, 0
+        if offset != self._capture_pos:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, offset)
+        ok, frame = self._capture.read()
+        if not ok:
+            raise IndexError(f"Trame {offset} illisible dans {segment}")
+        self._capture_pos = offset + 1
+        return frame
+
+    def __getitem__(self, i: int) -> Tuple[np.ndarray, FrameRecord]:
+        record = self.records[i]
+        if self.meta["format"] == "npy":
+            if record.segment not in self._arrays:
+                self._arrays[record.segment] = np.load(os.path.join(self.root, record.segment), mmap_mode="r")
+            return np.asarray(self._arrays[record.segment][record.offset]), record
+        return self._read_video(record.segment, record.offset), record
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, FrameRecord]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+        self._arrays.clear()
@@ -2,7 +2,6 @@ import os
 import shutil
 import time # ✅ CORRIGÉ : L'import 'time' est rétabli pour _log_action
 import json
-import socket
 import subprocess
 import sys
 from typing import Dict, Any, Optional, List, Tuple
@@ -87,12 +86,11 @@ def _get_game_details(game_name: str) -> Optional[Dict[str, Any]]:
 # --- CONTRÔLE ANIMAZE (OSC) (Inchangé) ---
 
 def _send_osc_idle(active: bool = True):
-    """Gestion de l'état d'Animaze via OSC."""
-    command = "/idle:1" if not active else "/idle:0" # idle:1 = mode concentration
+    """Gestion de l'état d'Animaze via OSC (transport avatar partagé)."""
+    value = 1 if not active else 0 # idle 1 = mode concentration
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.sendto(command.encode(), ("127.0.0.1", 9000))
-        sock.close()
+        from modules.avatarTransport import get_transport
+        get_transport("127.0.0.1", 9000).set("/idle", value)
         state = "IDLE (Concentration)" if not active else "EXPRESSION (Actif)"
         _log_action(f"OSC >> Avatar mis en mode {state}")
     except Exception:
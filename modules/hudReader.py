@@ -0,0 +1,248 @@
+# Fichier : modules/hudReader.py
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from modules.module import Module
+from modules.injection import Injection
+
+logger = logging.getLogger('HudReader')
+
+'''
+Lecture du HUD des jeux sans SDK (Warframe, Backpack Battles) sur la capture partagée.
+Chaque jeu décrit ses champs dans modules/hud_regions.json :
+- "bar"    : taux de remplissage d'une jauge (couleur HSV) -> entier 0-100
+- "digits" : nombre lu par correspondance de motifs de chiffres (templates/<jeu>/digits/0.png ... 9.png),
+             repli sur Tesseract (pytesseract, optionnel) si les motifs sont absents
+- "text"   : texte court (zone, nom de carte), Tesseract uniquement
+Chaque champ est un abonnement de zone du service de capture (seule sa zone est capturée,
+à la cadence du jeu). Les valeurs sont lissées (médiane glissante) puis écrites, typées, dans game_context
+(celui du NeuroClient s'il existe) : le LLM a des nombres sans appel au modèle vision.
+'''
+
+# --- CONFIGURATION ---
+HUD_SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hud_regions.json")
+VALUE_MAX_AGE = 5.0          # Au-delà, une valeur non relue n'est plus injectée dans le prompt
+DIGIT_MIN_SPACING = 0.6      # Écart minimal entre deux chiffres (en largeur de motif)
+
+
+def _load_digit_templates(folder: str) -> Optional[List[np.ndarray]]:
+    templates = []
+    for digit in range(10):
+        template = cv2.imread(os.path.join(folder, f"{digit}.png"), cv2.IMREAD_GRAYSCALE)
+        if template is None:
+            return None
+        templates.append(template)
+    return templates
+
+
+def _tesseract():
+    try:
+        import pytesseract
+        return pytesseract
+    except ImportError:
+        return None
+
+
+class HudField:
+    """Un champ du HUD : reçoit SA zone déjà convertie (HSV pour une jauge, gris sinon) via un abonnement."""
+
+    def __init__(self, spec: Dict[str, Any], base_dir: str):
+        self.name = spec["name"]
+        self.kind = spec.get("type", "digits")
+        self.region = {"roi": spec.get("roi", [0.0, 0.0, 1.0, 1.0])}
+        self.color = "hsv" if self.kind == "bar" else "gray"
+        self.history: deque = deque(maxlen=max(1, int(spec.get("smooth", 3))))
+        self.updated = 0.0
+        self.last_seq = 0
+        self.ocr = None
+        self.templates = None
+        self._mask: Optional[np.ndarray] = None
+
+        if self.kind == "bar":
+            self.lower = np.array(spec["lower"], dtype=np.uint8)
+            self.upper = np.array(spec["upper"], dtype=np.uint8)
+        else:
+            if self.kind == "digits" and "templates" in spec:
+                folder = spec["templates"]
+                if not os.path.isabs(folder):
+                    folder = os.path.join(base_dir, folder)
+                self.templates = _load_digit_templates(folder)
+                self.threshold = float(spec.get("threshold", 0.75))
+            if self.templates is None:
+                self.ocr = _tesseract()
+                if self.ocr is None:
+                    raise RuntimeError("ni motifs de chiffres ni pytesseract disponibles")
+
+    def _read_bar(self, hsv: np.ndarray) -> int:
+        if self._mask is None or self._mask.shape != hsv.shape[:2]:
+            self._mask = np.empty(hsv.shape[:2], dtype=np.uint8)
+        cv2.inRange(hsv, self.lower, self.upper, dst=self._mask)
+        # Colonnes majoritairement "pleines" : la jauge se remplit de gauche à droite
+        filled = np.flatnonzero(self._mask.mean(axis=0) > 127)
+        return 0 if filled.size == 0 else int(round((filled[-1] + 1) * 100 / self._mask.shape[1]))
+
+    def _read_digits(self, gray: np.ndarray) -> Optional[int]:
+        hits = []
+        for digit, template in enumerate(self.templates):
+            th, tw = template.shape[:2]
+            if th > gray.shape[0] or tw > gray.shape[1]:
+                continue
+            scores = cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED)
+            for x in np.flatnonzero(scores.max(axis=0) >= self.threshold):
+                hits.append((float(scores[:, x].max()), int(x), digit, tw))
+
+        # Suppression des doublons : on garde le meilleur chiffre à chaque position
+        kept = []
+        for score, x, digit, tw in sorted(hits, reverse=True):
+            if all(abs(x - kx) >= tw * DIGIT_MIN_SPACING for _, kx, _, _ in kept):
+                kept.append((score, x, digit, tw))
+        if not kept:
+            return None
+        return int("".join(str(d) for _, _, d, _ in sorted(kept, key=lambda k: k[1])))
+
+    def _read_ocr(self, gray: np.ndarray) -> Optional[Any]:
+        if self.kind == "digits":
+            text = self.ocr.image_to_string(gray, config="--psm 7 -c tessedit_char_whitelist=0123456789")
+            digits = "".join(c for c in text if c.isdigit())
+            return int(digits) if digits else None
+        text = self.ocr.image_to_string(gray, config="--psm 7").strip()
+        return text or None
+
+    def read(self, region: np.ndarray, now: float) -> Optional[Any]:
+        if self.kind == "bar":
+            value = self._read_bar(region)
+        else:
+            value = self._read_digits(region) if self.templates is not None else self._read_ocr(region)
+        if value is None:
+            return self.smoothed()  # Lecture ratée : on garde la dernière valeur lissée
+
+        self.history.append(value)
+        self.updated = now
+        return self.smoothed()
+
+    def smoothed(self) -> Optional[Any]:
+        if not self.history:
+            return None
+        if isinstance(self.history[-1], str):
+            return self.history[-1]
+        return int(np.median(self.history))
+
+
+class HudReader(Module):
+    def __init__(self, signals, modules, enabled=True):
+        super().__init__(signals, enabled)
+        self.modules = modules
+        self.API = self.API(self)
+        self.specs = self._load_specs()
+        self.game_context: Dict[str, Any] = {}
+        self.fields: Dict[str, List[HudField]] = {}
+        self._subscriptions: List[Any] = []
+        self._subscribed_game: Optional[str] = None
+        self.active_game: Optional[str] = None
+        self.read_ms = 0.0
+
+    @staticmethod
+    def _load_specs() -> Dict[str, Dict[str, Any]]:
+        with open(HUD_SPEC_PATH, "r", encoding="utf-8") as f:
+            return {game.lower(): spec for game, spec in json.load(f).items()}
+
+    def _fields(self, game: str) -> List[HudField]:
+        if game not in self.fields:
+            fields = []
+            for spec in self.specs[game].get("fields", []):
+                try:
+                    fields.append(HudField(spec, os.path.dirname(HUD_SPEC_PATH)))
+                except Exception as e:
+                    logger.warning(f"⚠️ Champ HUD '{spec.get('name')}' ignoré ({game}) : {e}")
+            self.fields[game] = fields
+            logger.info(f"🔢 {len(fields)} champ(s) HUD chargé(s) pour {game}")
+        return self.fields[game]
+
+    def _subscribe(self, vision, game: Optional[str]):
+        """Un abonnement par champ (zone, cadence du jeu, HSV ou gris)."""
+        for sub in self._subscriptions:
+            vision.API.unsubscribe(sub)
+        self._subscriptions = []
+        self._subscribed_game = game
+        if game:
+            rate = self.specs[game].get("rate", 2)
+            self._subscriptions = [vision.API.subscribe(field.region, fps=rate, color=field.color)
+                                   for field in self._fields(game)]
+
+    def _read_once(self, vision) -> Optional[Dict[str, Any]]:
+        """Une passe de lecture (exécutée hors de la boucle asyncio)."""
+        foreground = self.modules.get('foreground')
+        title = foreground.API.get_window_title().lower() if foreground else ""
+        game = next((g for g, spec in self.specs.items() if spec.get("window_keyword", g) in title), None)
+        self.active_game = game
+        if game != self._subscribed_game:
+            self._subscribe(vision, game)
+        if not game:
+            return None
+
+        start = time.perf_counter()
+        now = time.time()
+        values = {}
+        for field, sub in zip(self.fields[game], self._subscriptions):
+            region = sub.latest()
+            if region is not None and region.seq != field.last_seq:
+                field.last_seq = region.seq
+                field.read(region.image, now)
+            value = field.smoothed()
+            if value is not None and now - field.updated <= VALUE_MAX_AGE:
+                values[field.name] = value
+        self.read_ms = (time.perf_counter() - start) * 1000
+        return values
+
+    def _publish(self, values: Dict[str, Any]):
+        values["source"] = "hud"
+        values["jeu"] = self.active_game
+        neuro = self.modules.get('neuro_client')
+        if neuro:
+            neuro.API.update_context(values, source="hud")
+        # On remplace (et non fusionne) : un champ devenu illisible disparaît du contexte
+        self.game_context = values
+
+    def get_prompt_injection(self):
+        # Le NeuroClient injecte déjà game_context s'il est chargé
+        if self.modules.get('neuro_client') or not self.game_context.get("jeu"):
+            return Injection("", -1)
+        stats = ", ".join(f"{k}: {v}" for k, v in self.game_context.items() if k not in ("source", "jeu"))
+        return Injection(f"[HUD {self.game_context['jeu'].upper()}] {stats}", 150)
+
+    async def run(self):
+        if not self.enabled:
+            return
+        logger.info("🔢 HudReader actif (lecture du HUD sur la capture partagée).")
+        while not self.signals.terminate:
+            vision = self.modules.get('vision')
+            rate = 1.0
+            try:
+                if vision:
+                    values = await asyncio.to_thread(self._read_once, vision)
+                    if values is not None:
+                        self._publish(values)
+                        rate = self.specs[self.active_game].get("rate", 2)
+                    elif not self.active_game and self.game_context:
+                        self.game_context = {}
+            except Exception as e:
+                logger.error(f"Erreur HudReader : {e}")
+            await asyncio.sleep(1.0 / rate)
+
+    class API:
+        def __init__(self, outer):
+            self.outer = outer
+
+        def get_game_context(self) -> Dict[str, Any]:
+            return dict(self.outer.game_context)
+
+        def get_stats(self) -> Dict[str, Any]:
+            return {"game": self.outer.active_game, "read_ms": round(self.outer.read_ms, 2)}
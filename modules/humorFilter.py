@@ -1,12 +1,12 @@
 # Fichier : modules/humorFilter.py
 
 import logging
-import re
 from typing import Dict, List, Any, Optional, Tuple
 from modules.module import Module
 
 # 🚨 CORRECTION CRITIQUE : Importation de la classe Injection
-from injection import Injection 
+from modules.injection import Injection
+from modules.textAnalysis import Rule, get_text_analyzer
 
 logger = logging.getLogger('HumorFilter')
 
@@ -29,30 +29,36 @@ class HumorFilter(Module):
         r"\b(blague|drôle|rire|humour|sarcasme|joke)\b": "JOKE"
     }
 
+    # Détection de blague réellement utilisée par analyze_humor
+    JOKE_PATTERN = r"\b(blague|rire|lol|mdr)\b"
+
     def __init__(self, signals, enabled: bool = True):
         super().__init__(signals, enabled)
         self.API = self.API(self)
         # Injection de prompt à haute priorité (pour le LLM)
         self.prompt_injection.priority = 180 
 
+        # Compilées avec les autres filtres dans le moteur d'analyse partagé
+        analyzer = get_text_analyzer()
+        analyzer.register("humor_sarcasm", [Rule(pattern, pattern, weight, regex=True)
+                                            for pattern, weight in self.SARCASTIC_PATTERNS.items()])
+        analyzer.register("humor_joke", [Rule("JOKE", self.JOKE_PATTERN, regex=True)])
+
     def analyze_humor(self, text: str) -> Tuple[str, int]:
         """
         Analyse un texte et retourne le type d'humour détecté et un score.
         Retourne ('NONE', 0) par défaut.
         """
-        text_lower = text.lower()
-        sarcasm_score = 0
-        
+        analysis = get_text_analyzer().analyze(text)
+
         # 1. Détection de Sarcasme (Pondéré)
-        for pattern, weight in self.SARCASTIC_PATTERMS.items():
-            if re.search(pattern, text_lower):
-                sarcasm_score += weight
+        sarcasm_score = sum(analysis.scores("humor_sarcasm").values())
         
         if sarcasm_score >= 3:
             return "SARCASTIC", sarcasm_score
         
         # 2. Détection de Blague (Basique)
-        if re.search(r"\b(blague|rire|lol|mdr)\b", text_lower):
+        if analysis.has("humor_joke"):
             return "JOKE", 1
             
         return "NONE", 0
@@ -0,0 +1,160 @@
+# Fichier : modules/lipSync.py
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger('LipSync')
+
+# --- CONFIGURATION ---
+LIPSYNC_FPS = 30            # Trames bouche envoyées à l'avatar par seconde
+NOISE_FLOOR = 0.012         # RMS en dessous duquel la bouche reste fermée
+GAIN = 5.0                  # Amplification RMS -> ouverture (voix TTS assez douce)
+ATTACK = 0.65               # Lissage à l'ouverture (1.0 = instantané)
+RELEASE = 0.30              # Lissage à la fermeture (plus lent = moins de claquements)
+OUTPUT_LATENCY = 0.05       # Latence approximative du tampon de sortie PyAudio (s)
+
+
+def find_avatar_module(modules: Dict[str, Any]):
+    """Retourne le module avatar actif (VTube Studio ou Animaze) quel que soit son nom d'enregistrement."""
+    for key in ('vtube_studio', 'VtubeStudio', 'animaze_osc', 'animaze'):
+        module = modules.get(key)
+        if module is not None and hasattr(module, 'API'):
+            return module
+    return None
+
+
+class LipSyncEnvelope:
+    """
+    Calcule une enveloppe par trame à partir du PCM joué :
+    - open : ouverture de bouche [0..1] dérivée du RMS (avec attaque/relâche)
+    - form : forme de bouche [0..1] dérivée du taux de passage par zéro
+      (sifflantes 's', 'ch' -> bouche étirée ; voyelles 'o', 'ou' -> bouche ronde)
+    """
+    def __init__(self, sample_rate: int, channels: int = 1, fps: int = LIPSYNC_FPS):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_samples = max(1, sample_rate // fps)
+        self.frame_duration = self.frame_samples / sample_rate
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._open = 0.0
+
+    def feed(self, pcm: bytes) -> List[Tuple[float, float]]:
+        """Ajoute un morceau PCM int16 et retourne les trames complètes (open, form)."""
+        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        if self.channels > 1:
+            samples = samples[: len(samples) - len(samples) % self.channels]
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+
+        if self._remainder.size:
+            samples = np.concatenate((self._remainder, samples))
+
+        frame_count = samples.size // self.frame_samples
+        used = frame_count * self.frame_samples
+        self._remainder = samples[used:].copy()
+        if frame_count == 0:
+            return []
+
+        frames = samples[:used].reshape(frame_count, self.frame_samples)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_samples
+
+        envelope: List[Tuple[float, float]] = []
+        for level, crossings in zip(rms.tolist(), zcr.tolist()):
+            target = 0.0 if level < NOISE_FLOOR else min(1.0, (level - NOISE_FLOOR) * GAIN)
+            coeff = ATTACK if target > self._open else RELEASE
+            self._open += (target - self._open) * coeff
+            form = min(1.0, crossings * 4.0)
+            envelope.append((round(self._open, 3), round(form, 3)))
+        return envelope
+
+    def reset(self):
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._open = 0.0
+
+
+class LipSyncDriver:
+    """
+    Pousse l'enveloppe vers l'avatar à cadence fixe, alignée sur l'horloge de lecture.
+    Le player planifie les trames au moment où il écrit le PCM ; un thread unique
+    envoie au plus UN message (ouverture + forme) par trame.
+    """
+    def __init__(self, get_avatar: Callable[[], Any], fps: int = LIPSYNC_FPS):
+        self.get_avatar = get_avatar
+        self.fps = fps
+        self.frame_period = 1.0 / fps
+        self._schedule: Deque[Tuple[float, float, float]] = deque()
+        self._lock = threading.Lock()
+        self._cursor = 0.0
+        self._last_sent: Optional[Tuple[float, float]] = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="ClioLipSync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def schedule(self, envelope: List[Tuple[float, float]], frame_duration: float):
+        """Planifie des trames à partir de la position de lecture courante."""
+        now = time.monotonic()
+        with self._lock:
+            if self._cursor < now:
+                self._cursor = now + OUTPUT_LATENCY
+            for mouth_open, form in envelope:
+                self._schedule.append((self._cursor, mouth_open, form))
+                self._cursor += frame_duration
+
+    def close_mouth(self):
+        """Fin de réplique : la bouche se referme après la dernière trame planifiée."""
+        with self._lock:
+            self._schedule.append((max(self._cursor, time.monotonic()), 0.0, 0.0))
+
+    def clear(self):
+        with self._lock:
+            self._schedule.clear()
+            self._cursor = 0.0
+        self._send(0.0, 0.0)
+
+    def _loop(self):
+        next_tick = time.monotonic()
+        while self._running:
+            now = time.monotonic()
+            latest = None
+            with self._lock:
+                # Seule la trame la plus récente compte : les plus anciennes sont dépassées
+                while self._schedule and self._schedule[0][0] <= now:
+                    latest = self._schedule.popleft()
+            if latest is not None:
+                self._send(latest[1], latest[2])
+
+            next_tick += self.frame_period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
+
+    def _send(self, mouth_open: float, form: float):
+        if self._last_sent == (mouth_open, form):
+            return
+        avatar = self.get_avatar()
+        if avatar is None:
+            return
+        try:
+            if hasattr(avatar.API, 'set_mouth'):
+                avatar.API.set_mouth(mouth_open, form)
+            elif hasattr(avatar.API, 'set_mouth_open'):
+                avatar.API.set_mouth_open(mouth_open)
+            self._last_sent = (mouth_open, form)
+        except Exception as e:
+            logger.debug(f"[LipSync] Échec envoi avatar : {e}")
@@ -21,6 +21,8 @@ VECTOR_META_FILE = os.path.join(MEMORY_FOLDER, "clio_user.meta")
 from modules.module import Module
 # L'importation relative fonctionne ici si memory.py est dans un sous-dossier
 from .clio_vector_memory import ClioVectorMemory 
+from resourceRegistry import get_resources
+from metrics import get_metrics
 
 EVENTS_LOG_KEY = "events"
 MAX_EVENTS_COUNT = 500 # Limite le journal d'événements pour éviter les fichiers JSON massifs
@@ -83,9 +85,12 @@ class Memory(Module):
         }
         
         # Initialisation de la mémoire vectorielle (chemins absolus corrigés)
-        self.vector_memory = ClioVectorMemory(
-            index_path=VECTOR_INDEX_FILE, 
-            meta_path=VECTOR_META_FILE
+        # L'index FAISS reste chargé d'un redémarrage à chaud à l'autre
+        self.vector_memory = get_resources().acquire(
+            "memory.vector",
+            lambda: ClioVectorMemory(index_path=VECTOR_INDEX_FILE, meta_path=VECTOR_META_FILE),
+            close=lambda vector_memory: vector_memory.save_memory(),
+            config=(VECTOR_INDEX_FILE, VECTOR_META_FILE)
         )
         self.API = self.API(self)
 
@@ -180,7 +185,8 @@ class Memory(Module):
 
             # 2. Injection des Faits Pertinents (RAG Vectoriel)
             # Recherche top_k=2 faits les plus pertinents pour la requête actuelle
-            relevant_facts = self.search_similar(user_query, top_k=2)
+            with get_metrics().span("rag"):
+                relevant_facts = self.search_similar(user_query, top_k=2)
             if relevant_facts:
                 context_parts.append("\n--- FAITS PERTINENTS (MÉMOIRE LONGUE) ---")
                 for i, fact in enumerate(relevant_facts):
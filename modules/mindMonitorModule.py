@@ -34,6 +34,7 @@ class MindMonitorModule(Module):
         # NOUVEAUX CHAMPS POUR LE DEBUG ÉMOTIONNEL/VTS
         self.last_vts_reaction: str = "Aucune"
         self.vts_hotkeys_pending: List[str] = [] 
+        self._vision_subscribed = False
         
         self.API = self.API(self)
         log.info("👀 Mind Monitor Module initialisé.")
@@ -67,7 +68,12 @@ class MindMonitorModule(Module):
                     self.last_decision = brain_api.get_last_decision()
 
             # --- 3. Mettre à jour la Perception Visuelle (Vision) ---
-            if vision and hasattr(vision, 'API') and hasattr(vision.API, 'get_last_detection_summary'):
+            # Le sidecar vision pousse ses résultats : abonnement unique, plus de sondage
+            sidecar = self.modules.get('vision_sidecar')
+            if sidecar and not self._vision_subscribed:
+                sidecar.API.subscribe(self._on_vision_result)
+                self._vision_subscribed = True
+            elif not sidecar and vision and hasattr(vision, 'API') and hasattr(vision.API, 'get_last_detection_summary'):
                 # Récupération du résumé de détection
                 self.last_visual_perception = vision.API.get_last_detection_summary()
                     
@@ -87,6 +93,10 @@ class MindMonitorModule(Module):
             await asyncio.sleep(0.5) 
 
 
+    def _on_vision_result(self, result):
+        """Abonné du sidecar vision (résultat sur la trame la plus récente)."""
+        self.last_visual_perception = result.text
+
     # --- CLASSE API : Pour accéder aux données de surveillance ---
     class API:
         def __init__(self, outer):
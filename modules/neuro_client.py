@@ -29,6 +29,8 @@ class NeuroClient(Module):
         
         # Contexte et Objectifs
         self.game_context: Dict[str, Any] = {} 
+        self.context_source = "sdk" # "sdk" (WebSocket) ou "hud" (lecture d'écran, cf. HudReader)
+        self.context_updated = 0.0
         self.current_game_goal: str = "Pas d'objectif défini (mode exploration)." 
         
         # Paramètres de résilience
@@ -63,10 +65,11 @@ class NeuroClient(Module):
     # --- SYNTHÈSE POUR LE LLM ---
     def get_prompt_injection(self) -> str:
         """ Synthétise les données complexes du jeu en langage naturel pour le Cerveau de Clio. """
-        if not self.is_connected:
+        hud_fresh = self.context_source == "hud" and time.time() - self.context_updated < 5
+        if not self.is_connected and not hud_fresh:
              return f"[ÉTAT JEU : DÉCONNECTÉ] Rappel objectif : {self.current_game_goal}"
 
-        context_synth = f"\n--- 🎮 CONTEXTE TEMPS RÉEL (SDK) ---\n"
+        context_synth = f"\n--- 🎮 CONTEXTE TEMPS RÉEL ({'SDK' if self.is_connected else 'HUD'}) ---\n"
         context_synth += f"OBJECTIF DE SESSION : {self.current_game_goal}\n"
         
         try:
@@ -130,6 +133,7 @@ class NeuroClient(Module):
             data = json.loads(message)
             if "context" in data:
                 self.game_context = data["context"]
+                self.context_source, self.context_updated = "sdk", time.time()
                 self._check_auto_reflexes() # Vérification immédiate sans passer par le LLM
         except Exception as e:
             log.debug(f"Message non-JSON: {message}")
@@ -164,5 +168,12 @@ class NeuroClient(Module):
             except Exception as e:
                 return f"Échec action : {e}"
 
+        def update_context(self, values: Dict[str, Any], source: str = "hud"):
+            """ Contexte fourni hors WebSocket (HudReader) ; le SDK reste prioritaire quand il est connecté. """
+            if self.outer.is_connected and source != "sdk":
+                return
+            self.outer.game_context = values
+            self.outer.context_source, self.outer.context_updated = source, time.time()
+
         def get_current_state(self):
             return self.outer.game_context
\ No newline at end of file
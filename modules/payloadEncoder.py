@@ -0,0 +1,115 @@
+# Fichier : modules/payloadEncoder.py
+import time
+import base64
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger('PayloadEncoder')
+
+'''
+Chemin rapide "réduction + encodage" des images envoyées aux modèles multimodaux.
+Les modèles locaux redimensionnent de toute façon vers ~384-768 px : envoyer l'écran
+natif en JPEG qualité 95 ne fait que gonfler la requête (plusieurs Mo en Base64).
+Le profil (grand côté cible, qualité, JPEG/WebP) vient de constants.MULTIMODAL_ENCODE_PROFILE.
+'''
+
+# Profil historique (résolution native, JPEG 95) : sert de référence au benchmark
+LEGACY_PROFILE = {"long_edge": 0, "quality": 95, "format": "jpeg"}
+DEFAULT_PROFILE = {"long_edge": 768, "quality": 80, "format": "jpeg"}
+
+MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+class EncodedImage(NamedTuple):
+    base64: str
+    mime: str
+    width: int
+    height: int
+    encoded_bytes: int
+    resize_ms: float
+    encode_ms: float
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime};base64,{self.base64}"
+
+
+class PayloadEncoder:
+    """
+    Réduit puis encode une trame BGR. Le tampon de réduction est réutilisé d'un appel
+    à l'autre (même taille d'écran = aucune allocation) ; l'encodage tourne dans un
+    thread dédié pour que la préparation du texte du prompt se fasse en parallèle.
+    """
+    def __init__(self, profile: Optional[Dict[str, Any]] = None):
+        profile = {**DEFAULT_PROFILE, **(profile or {})}
+        self.long_edge = int(profile["long_edge"])
+        self.quality = int(profile["quality"])
+        self.format = profile["format"].lower()
+        if self.format not in MIME_TYPES:
+            raise ValueError(f"Format d'encodage inconnu : {self.format}")
+        self.mime = MIME_TYPES[self.format]
+
+        if self.format == "webp":
+            self._ext, self._params = ".webp", [int(cv2.IMWRITE_WEBP_QUALITY), self.quality]
+        else:
+            self._ext, self._params = ".jpg", [int(cv2.IMWRITE_JPEG_QUALITY), self.quality]
+
+        self._resized: Optional[np.ndarray] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def target_size(self, width: int, height: int):
+        """(largeur, hauteur) après réduction ; jamais d'agrandissement."""
+        if self.long_edge <= 0 or max(width, height) <= self.long_edge:
+            return width, height
+        scale = self.long_edge / max(width, height)
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+    def _resize(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        target_w, target_h = self.target_size(width, height)
+        if (target_w, target_h) == (width, height):
+            return frame
+        shape = (target_h, target_w) + frame.shape[2:]
+        if self._resized is None or self._resized.shape != shape or self._resized.dtype != frame.dtype:
+            self._resized = np.empty(shape, dtype=frame.dtype)
+        # INTER_AREA : le meilleur rendu pour une forte réduction (texte du HUD lisible)
+        cv2.resize(frame, (target_w, target_h), dst=self._resized, interpolation=cv2.INTER_AREA)
+        return self._resized
+
+    def encode(self, frame: np.ndarray) -> Optional[EncodedImage]:
+        """Encodage synchrone (appelé directement ou depuis le thread d'encodage)."""
+        start = time.perf_counter()
+        resized = self._resize(frame)
+        resized_at = time.perf_counter()
+
+        ok, encoded = cv2.imencode(self._ext, resized, self._params)
+        if not ok:
+            logger.error("❌ Échec de l'encodage de l'image multimodale.")
+            return None
+        b64 = base64.b64encode(encoded).decode("ascii")
+        done = time.perf_counter()
+
+        return EncodedImage(
+            base64=b64,
+            mime=self.mime,
+            width=resized.shape[1],
+            height=resized.shape[0],
+            encoded_bytes=int(encoded.nbytes),
+            resize_ms=(resized_at - start) * 1000,
+            encode_ms=(done - resized_at) * 1000
+        )
+
+    def submit(self, frame: np.ndarray) -> "Future[Optional[EncodedImage]]":
+        """Encodage en arrière-plan (un seul thread : le tampon réutilisé n'est jamais partagé)."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ClioPayloadEncoder")
+        return self._executor.submit(self.encode, frame)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,431 @@
+# Fichier : modules/processSupervisor.py
+import os
+import sys
+import time
+import pickle
+import asyncio
+import inspect
+import logging
+import importlib
+import itertools
+import threading
+import multiprocessing as mp
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from modules.module import Module
+from modules.injection import Injection
+from constants import (WORKER_HEARTBEAT_INTERVAL, WORKER_HEARTBEAT_TIMEOUT, WORKER_STARTUP_TIMEOUT,
+                       WORKER_CALL_TIMEOUT)
+
+logger = logging.getLogger('ProcessSupervisor')
+
+'''
+Superviseur de processus : héberge des groupes de modules lourds (capture, réflexes, HUD...)
+dans des processus séparés, hors de la boucle asyncio et du GIL du cœur.
+- Bus typé (BusMessage) par processus, calqué sur Signals : les drapeaux partagés (MIRRORED_SIGNALS)
+  sont recopiés dans les deux sens, sio_queue et action_queue du processus remontent au cœur
+- Côté cœur, chaque module hébergé est un RemoteModule (même clé dans modules) : son API est
+  appelée par message (arguments et résultats picklables), son injection de prompt et quelques
+  attributs d'état (EXPORTED_ATTRS) sont recopiés à chaque battement
+- Refusés : les callbacks (ils ne traversent pas la frontière du processus) et les images
+  (FRAME_METHODS, tableaux NumPy) : le cœur lit les trames sur le bus partagé (frameBus.FrameSource)
+- Appel impossible (processus absent, en démarrage ou relancé, délai dépassé) : RemoteCallError
+- Santé : battement de cœur émis par la boucle asyncio du processus ; processus mort ou muet
+  depuis WORKER_HEARTBEAT_TIMEOUT -> arrêt forcé puis relance (délai croissant)
+'''
+
+# Attributs de Signals recopiés entre le cœur et les processus
+MIRRORED_SIGNALS = ("terminate", "AI_speaking", "AI_thinking", "human_speaking", "current_game", "context_mode")
+# Attributs d'état des modules hébergés lisibles directement sur le RemoteModule
+EXPORTED_ATTRS = ("game_context", "active_game", "current_activity")
+# Méthodes d'API qui renvoient des images : jamais picklées, les trames se lisent sur le bus
+FRAME_METHODS = ("get_frame", "get_screenshot", "get_roi", "get_game_roi")
+RESTART_BACKOFF_MAX = 30.0
+_MISSING = object()
+
+
+class RemoteCallError(RuntimeError):
+    """Appel d'un module hébergé impossible ou en échec (l'appelant garde son repli)."""
+
+
+class BusMessage(NamedTuple):
+    kind: str       # heartbeat | signal | sio | action | injection | cleanup | state | call | result | stop
+    key: str        # Nom du signal, clé du module ou identifiant d'appel
+    payload: Any
+
+
+# --- CÔTÉ PROCESSUS DE TRAVAIL ---
+
+class _Forward:
+    """Remplace une file de Signals : chaque put remonte au cœur."""
+
+    def __init__(self, outbox, kind: str):
+        self.outbox = outbox
+        self.kind = kind
+
+    def put(self, item, *args, **kwargs):
+        self.outbox.put(BusMessage(self.kind, "", item))
+
+    put_nowait = put
+
+
+class WorkerSignals:
+    """Signals du processus : mêmes attributs, les drapeaux partagés sont synchronisés avec le cœur."""
+
+    def __init__(self, outbox):
+        self.__dict__.update(
+            _outbox=outbox, _applying=False, loop=None, modules={}, ai_name="Clio", history=[],
+            terminate=False, AI_speaking=False, AI_thinking=False, human_speaking=False,
+            current_game="none", context_mode="private",
+            sio_queue=_Forward(outbox, "sio"), action_queue=_Forward(outbox, "action"),
+        )
+
+    def __setattr__(self, name, value):
+        changed = self.__dict__.get(name, _MISSING) != value
+        self.__dict__[name] = value
+        # terminate ne remonte jamais : un processus ne peut pas arrêter tout Clio
+        if changed and name in MIRRORED_SIGNALS and name != "terminate" and not self._applying:
+            self._outbox.put(BusMessage("signal", name, value))
+
+    def apply(self, name: str, value: Any):
+        """Valeur venue du cœur : appliquée sans être renvoyée."""
+        self.__dict__["_applying"] = True
+        try:
+            setattr(self, name, value)
+        finally:
+            self.__dict__["_applying"] = False
+
+    def get_current_host_name(self) -> str:
+        from constants import HOST_NAME_PRIVATE, HOST_NAME_STREAM, HOST_NAME_FAMILY
+        return {"private": HOST_NAME_PRIVATE, "family": HOST_NAME_FAMILY}.get(self.context_mode, HOST_NAME_STREAM)
+
+
+def _carries_array(value: Any) -> bool:
+    """Tableau NumPy (ou trame qui en contient un) : ne passe pas par message."""
+    if hasattr(value, "__array_interface__"):
+        return True
+    if isinstance(value, (tuple, list)):
+        return any(_carries_array(v) for v in value)
+    if isinstance(value, dict):
+        return any(_carries_array(v) for v in value.values())
+    return False
+
+
+def _inbox_loop(signals: WorkerSignals, modules: Dict[str, Any], inbox, outbox):
+    """Thread du processus : signaux du cœur et appels d'API."""
+    while not signals.terminate:
+        try:
+            message: BusMessage = inbox.get(timeout=0.5)
+        except Exception:
+            continue
+        if message.kind == "stop":
+            signals.apply("terminate", True)
+        elif message.kind == "signal":
+            signals.apply(message.key, message.payload)
+        elif message.kind == "cleanup":
+            try:
+                modules[message.key].cleanup()
+            except Exception as e:
+                logger.error(f"Erreur cleanup '{message.key}' : {e}")
+        elif message.kind == "call":
+            module_key, method, args, kwargs = message.payload
+            try:
+                result = getattr(modules[module_key].API, method)(*args, **kwargs)
+                if inspect.iscoroutine(result):
+                    result = asyncio.run_coroutine_threadsafe(result, signals.loop).result(WORKER_CALL_TIMEOUT)
+                if _carries_array(result):
+                    raise TypeError(f"{method} renvoie une image : la lire sur le bus d'images partagé")
+                pickle.dumps(result)  # Échec de sérialisation signalé à l'appelant plutôt que perdu
+                reply = (True, result)
+            except Exception as e:
+                reply = (False, f"{type(e).__name__}: {e}")
+            outbox.put(BusMessage("result", message.key, reply))
+
+
+async def _worker_async(group: str, entries: List[Tuple[str, str]], inbox, outbox):
+    signals = WorkerSignals(outbox)
+    signals.loop = asyncio.get_running_loop()
+    modules: Dict[str, Any] = signals.modules
+
+    for key, target in entries:
+        module_name, class_name = target.rsplit(".", 1)
+        cls = getattr(importlib.import_module(f"modules.{module_name}"), class_name)
+        kwargs = {"modules": modules} if "modules" in inspect.signature(cls).parameters else {}
+        modules[key] = cls(signals, enabled=True, **kwargs)
+
+    threading.Thread(target=_inbox_loop, args=(signals, modules, inbox, outbox), daemon=True).start()
+    tasks = [asyncio.create_task(module.run()) for module in modules.values()]
+    logger.info(f"🧩 Processus '{group}' prêt ({', '.join(modules)}), pid {os.getpid()}.")
+
+    sent: Dict[Tuple[str, str], Any] = {}
+    while not signals.terminate:
+        # Le battement vient de la boucle asyncio : une boucle bloquée est vue comme un processus muet
+        outbox.put(BusMessage("heartbeat", group, time.time()))
+        for key, module in modules.items():
+            injection = module.get_prompt_injection()
+            snapshot = {
+                "injection": (injection.text, injection.priority),
+                "state": {a: getattr(module, a) for a in EXPORTED_ATTRS if hasattr(module, a)},
+            }
+            for kind, value in snapshot.items():
+                if sent.get((kind, key), _MISSING) != value:
+                    sent[(kind, key)] = value
+                    outbox.put(BusMessage(kind, key, value))
+        await asyncio.sleep(WORKER_HEARTBEAT_INTERVAL)
+
+    await asyncio.wait(tasks, timeout=5)
+
+
+def _worker_main(group: str, entries: List[Tuple[str, str]], paths: List[str], inbox, outbox):
+    """Point d'entrée du processus (démarrage 'spawn' : rien n'est hérité du cœur)."""
+    sys.path[:0] = [p for p in paths if p not in sys.path]
+    logging.basicConfig(level=logging.INFO, format=f'%(asctime)s - [{group}] %(name)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(_worker_async(group, entries, inbox, outbox))
+    except Exception as e:
+        logger.error(f"❌ Processus '{group}' arrêté sur erreur : {e}", exc_info=True)
+        sys.exit(1)
+
+
+# --- CÔTÉ CŒUR ---
+
+class RemoteModule(Module):
+    """Représentant d'un module hébergé : même clé, même API (appelée par message)."""
+
+    def __init__(self, signals, supervisor: "ProcessSupervisor", group: str, key: str):
+        super().__init__(signals, enabled=True)
+        self.supervisor = supervisor
+        self.group = group
+        self.key = key
+        self.state: Dict[str, Any] = {}
+        self.API = self.API(self)
+
+    def __getattr__(self, name):
+        # Appelé seulement si l'attribut n'existe pas : état exporté par le processus
+        state = self.__dict__.get("state", {})
+        if name in state:
+            return state[name]
+        raise AttributeError(name)
+
+    async def run(self):
+        pass  # Le processus est lancé par le superviseur
+
+    def cleanup(self):
+        # Injection consommée par le LLM : le module hébergé fait son propre nettoyage,
+        # puis son injection suivante remonte au battement
+        self.supervisor.notify_cleanup(self.group, self.key)
+
+    class API:
+        def __init__(self, outer):
+            self.outer = outer
+
+        def __getattr__(self, method):
+            outer = self.outer
+            if method in FRAME_METHODS:
+                # hasattr() vaut False : les appelants passent par le bus d'images partagé
+                raise AttributeError(f"{outer.key}.API.{method} : trames lues sur le bus partagé, pas par message")
+
+            def call(*args, **kwargs):
+                if any(callable(arg) for arg in (*args, *kwargs.values())):
+                    # Un callback picklé serait enregistré sur une copie, dans l'autre processus : jamais appelé
+                    raise TypeError(f"{outer.key}.API.{method} : un callback ne traverse pas la frontière du processus")
+                return outer.supervisor.call(outer.group, outer.key, method, args, kwargs)
+            return call
+
+
+class _Worker:
+    def __init__(self, group: str, entries: List[Tuple[str, str]]):
+        self.group = group
+        self.entries = entries
+        self.process: Optional[mp.Process] = None
+        self.inbox = None
+        self.outbox = None
+        self.last_heartbeat = 0.0
+        self.started = 0.0
+        self.restarts = 0
+        self.backoff = 1.0
+        self.next_start = 0.0
+        self.sent: Dict[str, Any] = {}   # Derniers signaux recopiés vers ce processus
+
+
+class ProcessSupervisor(Module):
+    def __init__(self, signals, groups: Dict[str, List[Tuple[str, str]]], enabled=True):
+        super().__init__(signals, enabled)
+        self.API = self.API(self)
+        self._ctx = mp.get_context("spawn")
+        self.workers = {group: _Worker(group, entries) for group, entries in groups.items() if entries}
+        self.remotes: Dict[str, RemoteModule] = {
+            key: RemoteModule(signals, self, group, key)
+            for group, worker in self.workers.items() for key, _ in worker.entries
+        }
+        self._calls: Dict[str, Tuple[str, Future]] = {}   # Identifiant -> (groupe, résultat attendu)
+        self._call_ids = itertools.count()
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self._paths = [root, os.path.join(root, "Neuro-master")]
+
+    def remote_modules(self) -> Dict[str, RemoteModule]:
+        """À fusionner dans le dictionnaire modules de main.py (les clés hébergées ne sont pas créées localement)."""
+        return dict(self.remotes)
+
+    # --- CYCLE DE VIE DES PROCESSUS ---
+    def _start(self, worker: _Worker):
+        worker.inbox, worker.outbox = self._ctx.Queue(), self._ctx.Queue()
+        worker.sent = {}
+        worker.process = self._ctx.Process(
+            target=_worker_main, args=(worker.group, worker.entries, self._paths, worker.inbox, worker.outbox),
+            name=f"Clio-{worker.group}", daemon=True
+        )
+        worker.process.start()
+        worker.started = worker.last_heartbeat = time.time()
+        threading.Thread(target=self._outbox_loop, args=(worker, worker.outbox), daemon=True).start()
+        logger.info(f"🧩 Processus '{worker.group}' lancé (pid {worker.process.pid}).")
+
+    def _stop(self, worker: _Worker, timeout: float = 3.0):
+        if worker.process is None:
+            return
+        try:
+            worker.inbox.put(BusMessage("stop", "", None))
+        except Exception:
+            pass
+        worker.process.join(timeout)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join(1)
+        worker.process = None
+
+    def _check(self, worker: _Worker, now: float):
+        if worker.process is None:
+            if now >= worker.next_start:
+                self._start(worker)
+            return
+        alive = worker.process.is_alive()
+        # Premier battement : imports lourds (cv2, modèles) tolérés jusqu'à WORKER_STARTUP_TIMEOUT
+        timeout = WORKER_STARTUP_TIMEOUT if worker.last_heartbeat == worker.started else WORKER_HEARTBEAT_TIMEOUT
+        if alive and now - worker.last_heartbeat < timeout:
+            if now - worker.started > 60:
+                worker.backoff = 1.0  # Une minute stable : le délai de relance repart du minimum
+            return
+
+        reason = "muet" if alive else f"arrêté (code {worker.process.exitcode})"
+        logger.error(f"💥 Processus '{worker.group}' {reason} : relance dans {worker.backoff:.0f}s.")
+        self._stop(worker, timeout=0.5)
+        self._fail_calls(worker.group, f"Processus '{worker.group}' {reason}")
+        worker.restarts += 1
+        worker.next_start = now + worker.backoff
+        worker.backoff = min(worker.backoff * 2, RESTART_BACKOFF_MAX)
+        self.signals.sio_queue.put(("worker_status", self.API.get_status()))
+
+    # --- BUS ---
+    def _outbox_loop(self, worker: _Worker, outbox):
+        """Thread du cœur : messages d'un processus (s'arrête quand le processus est remplacé)."""
+        loop = self.signals.loop
+        while worker.outbox is outbox and not self.signals.terminate:
+            try:
+                message: BusMessage = outbox.get(timeout=0.5)
+            except Exception:
+                continue
+            kind = message.kind
+            if kind == "heartbeat":
+                worker.last_heartbeat = time.time()
+            elif kind == "sio":
+                self.signals.sio_queue.put(message.payload)
+            elif kind == "action":
+                loop.call_soon_threadsafe(self.signals.action_queue.put_nowait, message.payload)
+            elif kind == "signal":
+                worker.sent[message.key] = message.payload  # Pas d'écho vers l'émetteur
+                loop.call_soon_threadsafe(setattr, self.signals, message.key, message.payload)
+            elif kind == "injection" and message.key in self.remotes:
+                self.remotes[message.key].prompt_injection = Injection(*message.payload)
+            elif kind == "state" and message.key in self.remotes:
+                self.remotes[message.key].state = message.payload
+            elif kind == "result":
+                _, future = self._calls.pop(message.key, (None, None))
+                if future is not None and not future.done():
+                    ok, value = message.payload
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(RemoteCallError(value))
+
+    def _fail_calls(self, group: str, reason: str):
+        """Processus arrêté : les appels en attente échouent tout de suite au lieu d'expirer."""
+        for call_id, (call_group, future) in list(self._calls.items()):
+            if call_group == group and not future.done():
+                self._calls.pop(call_id, None)
+                future.set_exception(RemoteCallError(reason))
+
+    def _mirror_signals(self, worker: _Worker):
+        for name in MIRRORED_SIGNALS:
+            value = getattr(self.signals, name, None)
+            if worker.sent.get(name, _MISSING) != value:
+                worker.sent[name] = value
+                worker.inbox.put(BusMessage("signal", name, value))
+
+    def notify_cleanup(self, group: str, key: str):
+        """Relaie cleanup() au module hébergé (sans réponse ; ignoré si le processus est absent)."""
+        worker = self.workers[group]
+        if worker.process is not None:
+            worker.inbox.put(BusMessage("cleanup", key, None))
+
+    def call(self, group: str, key: str, method: str, args: tuple, kwargs: dict,
+             timeout: float = WORKER_CALL_TIMEOUT) -> Any:
+        """Appel bloquant d'une méthode d'API hébergée (n'importe quel thread du cœur)."""
+        worker = self.workers[group]
+        if worker.process is None:
+            raise RemoteCallError(f"Processus '{group}' indisponible (relance en attente)")
+        if worker.last_heartbeat == worker.started:
+            raise RemoteCallError(f"Processus '{group}' en démarrage")
+        try:
+            pickle.dumps((args, kwargs))  # Objet local : erreur immédiate plutôt qu'un délai
+        except Exception as e:
+            raise RemoteCallError(f"{key}.API.{method} : arguments non transmissibles ({e})") from e
+        call_id = str(next(self._call_ids))
+        future: Future = Future()
+        self._calls[call_id] = (group, future)
+        worker.inbox.put(BusMessage("call", call_id, (key, method, args, kwargs)))
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            raise RemoteCallError(f"{key}.API.{method} : pas de réponse du processus '{group}' en {timeout:.0f}s") from None
+        finally:
+            self._calls.pop(call_id, None)
+
+    async def run(self):
+        if not self.enabled or not self.workers:
+            return
+        logger.info(f"🧩 Superviseur actif : {', '.join(f'{g} ({len(w.entries)})' for g, w in self.workers.items())}.")
+        while not self.signals.terminate:
+            now = time.time()
+            for worker in self.workers.values():
+                self._check(worker, now)
+                if worker.process is not None:
+                    self._mirror_signals(worker)
+            await asyncio.sleep(0.2)
+
+        await asyncio.gather(*(asyncio.to_thread(self._stop, w) for w in self.workers.values()))
+        logger.info("🧩 Processus de travail arrêtés.")
+
+    class API:
+        def __init__(self, outer):
+            self.outer = outer
+
+        def get_status(self) -> Dict[str, Dict[str, Any]]:
+            now = time.time()
+            return {
+                group: {
+                    "pid": w.process.pid if w.process else None,
+                    "alive": bool(w.process and w.process.is_alive()),
+                    "heartbeat_age": round(now - w.last_heartbeat, 2) if w.process else None,
+                    "restarts": w.restarts,
+                    "modules": [key for key, _ in w.entries],
+                }
+                for group, w in self.outer.workers.items()
+            }
+
+        def restart(self, group: str):
+            """Relance manuelle (ex : depuis le dashboard)."""
+            worker = self.outer.workers[group]
+            self.outer._stop(worker)
+            self.outer._fail_calls(group, f"Processus '{group}' relancé")
+            worker.next_start = 0.0
@@ -0,0 +1,204 @@
+# Fichier : modules/reflexDetectors.py
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger('ReflexDetectors')
+
+'''
+Moteur de détection déclaratif pour le ReflexEngine.
+Les détecteurs de chaque jeu sont décrits dans modules/reflex_detectors.json :
+- "hsv"      : proportion de pixels dans une plage de couleur HSV sur une zone
+- "template" : correspondance d'un motif (niveaux de gris) sur une zone
+Chaque spec est compilée UNE fois pour une taille d'écran donnée : coordonnées de zone
+en pixels, bornes HSV en tableaux NumPy, tampons HSV / masque / score préalloués.
+Avec les abonnements de zone du service de capture, chaque détecteur reçoit directement
+sa zone déjà convertie (HSV ou niveaux de gris) : voir DetectorEngine.regions().
+'''
+
+SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reflex_detectors.json")
+
+
+class DetectorResult(NamedTuple):
+    name: str
+    active: bool
+    value: float
+
+
+class ReflexEvent(NamedTuple):
+    """Événement anti-rebond : émis au front montant (ou répété si 'repeat'), après le délai de garde."""
+    game: str
+    name: str
+    value: float
+    timestamp: float
+    action: Optional[str]
+
+
+def load_specs(path: str = SPEC_PATH) -> Dict[str, Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return {game.lower(): spec for game, spec in json.load(f).items()}
+
+
+def resolve_roi(spec: Dict[str, Any], frame_shape) -> Tuple[int, int, int, int]:
+    """Zone en pixels (x0, y0, x1, y1) à partir d'une zone relative ou d'une boîte centrée."""
+    height, width = frame_shape[:2]
+    if "center_box" in spec:
+        box_w, box_h = spec["center_box"]
+        x0, y0 = width // 2 - box_w // 2, height // 2 - box_h // 2
+        x1, y1 = x0 + box_w, y0 + box_h
+    else:
+        rx, ry, rw, rh = spec.get("roi", [0.0, 0.0, 1.0, 1.0])
+        x0, y0 = int(rx * width), int(ry * height)
+        x1, y1 = int((rx + rw) * width), int((ry + rh) * height)
+    x0, y0 = max(0, x0), max(0, y0)
+    x1, y1 = min(width, max(x0 + 1, x1)), min(height, max(y0 + 1, y1))
+    return x0, y0, x1, y1
+
+
+class CompiledDetector:
+    """Un détecteur prêt à tourner : aucune allocation dans evaluate()."""
+
+    def __init__(self, spec: Dict[str, Any], frame_shape, base_dir: str, region: bool = False):
+        self.name = spec["name"]
+        self.kind = spec.get("type", "hsv")
+        self.action = spec.get("action")
+        self.hold_frames = int(spec.get("hold_frames", 1))
+        self.repeat = bool(spec.get("repeat", False))
+        self.cooldown = float(spec.get("cooldown", 1.0))
+        if region:
+            # La trame EST déjà la zone du détecteur (abonnement de zone)
+            self.x0, self.y0, self.x1, self.y1 = 0, 0, frame_shape[1], frame_shape[0]
+        else:
+            self.x0, self.y0, self.x1, self.y1 = resolve_roi(spec, frame_shape)
+        self.shape = frame_shape[:2]
+        roi_h, roi_w = self.y1 - self.y0, self.x1 - self.x0
+
+        if self.kind == "hsv":
+            self.lower = np.array(spec["lower"], dtype=np.uint8)
+            self.upper = np.array(spec["upper"], dtype=np.uint8)
+            self.trigger_below = spec.get("trigger", "above") == "below"
+            self.min_ratio = float(spec.get("min_ratio", 0.0))
+            self._hsv = np.empty((roi_h, roi_w, 3), dtype=np.uint8)
+            self._mask = np.empty((roi_h, roi_w), dtype=np.uint8)
+            self._pixels = roi_h * roi_w
+        elif self.kind == "template":
+            template_path = spec["template"]
+            if not os.path.isabs(template_path):
+                template_path = os.path.join(base_dir, template_path)
+            template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
+            if template is None:
+                raise FileNotFoundError(f"Motif introuvable : {template_path}")
+            th, tw = template.shape[:2]
+            if th > roi_h or tw > roi_w:
+                raise ValueError(f"Motif '{self.name}' plus grand que sa zone ({tw}x{th} > {roi_w}x{roi_h})")
+            self.template = template
+            self.threshold = float(spec.get("threshold", 0.8))
+            self._gray = np.empty((roi_h, roi_w), dtype=np.uint8)
+            self._scores = np.empty((roi_h - th + 1, roi_w - tw + 1), dtype=np.float32)
+        else:
+            raise ValueError(f"Type de détecteur inconnu : {self.kind}")
+
+    def evaluate(self, frame: np.ndarray, converted: bool = False) -> DetectorResult:
+        """converted=True : la trame est déjà la zone, en HSV (type hsv) ou en gris (type template)."""
+        roi = frame[self.y0:self.y1, self.x0:self.x1]
+        if self.kind == "hsv":
+            hsv = roi if converted else cv2.cvtColor(roi, cv2.COLOR_BGR2HSV, dst=self._hsv)
+            cv2.inRange(hsv, self.lower, self.upper, dst=self._mask)
+            ratio = cv2.countNonZero(self._mask) / self._pixels
+            active = ratio < self.min_ratio if self.trigger_below else ratio >= self.min_ratio
+            return DetectorResult(self.name, active, ratio)
+
+        gray = roi if converted else cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        cv2.matchTemplate(gray, self.template, cv2.TM_CCOEFF_NORMED, result=self._scores)
+        _, best, _, _ = cv2.minMaxLoc(self._scores)
+        return DetectorResult(self.name, best >= self.threshold, float(best))
+
+
+class DetectorEngine:
+    """Détecteurs compilés d'un jeu + anti-rebond (frames de maintien et délai de garde)."""
+
+    def __init__(self, game: str, spec: Dict[str, Any], base_dir: str = os.path.dirname(SPEC_PATH)):
+        self.game = game
+        self.spec = spec
+        self.base_dir = base_dir
+        self.fps = float(spec.get("fps", 20))
+        self.detectors: List[CompiledDetector] = []
+        self._shape = None
+        self._streak: Dict[str, int] = {}
+        self._latched: Dict[str, bool] = {}
+        self._last_event: Dict[str, float] = {}
+        self._region_detectors: Dict[str, Tuple[Any, Optional[CompiledDetector]]] = {}
+
+    def compile(self, frame_shape):
+        """(Re)compile les détecteurs pour cette taille d'écran."""
+        self.detectors = []
+        for detector_spec in self.spec.get("detectors", []):
+            try:
+                self.detectors.append(CompiledDetector(detector_spec, frame_shape, self.base_dir))
+            except Exception as e:
+                logger.warning(f"⚠️ Détecteur '{detector_spec.get('name')}' ignoré ({self.game}) : {e}")
+        self._shape = frame_shape
+        logger.info(f"⚡ {len(self.detectors)} détecteur(s) compilé(s) pour {self.game} ({frame_shape[1]}x{frame_shape[0]})")
+
+    def process(self, frame: np.ndarray, now: Optional[float] = None) -> Tuple[List[DetectorResult], List[ReflexEvent]]:
+        if frame.shape != self._shape:
+            self.compile(frame.shape)
+        now = time.time() if now is None else now
+
+        results, events = [], []
+        for detector in self.detectors:
+            result = detector.evaluate(frame)
+            results.append(result)
+            self._debounce(detector, result, now, events)
+        return results, events
+
+    def regions(self) -> List[Tuple[str, Dict[str, Any], str]]:
+        """(nom, zone, format de couleur) de chaque détecteur, pour s'abonner aux zones d'écran."""
+        regions = []
+        for spec in self.spec.get("detectors", []):
+            region = {"center_box": spec["center_box"]} if "center_box" in spec else {"roi": spec.get("roi", [0.0, 0.0, 1.0, 1.0])}
+            regions.append((spec["name"], region, "hsv" if spec.get("type", "hsv") == "hsv" else "gray"))
+        return regions
+
+    def process_regions(self, regions: Dict[str, np.ndarray], now: Optional[float] = None) -> Tuple[List[DetectorResult], List[ReflexEvent]]:
+        """Comme process(), mais chaque détecteur reçoit sa zone déjà découpée et convertie."""
+        now = time.time() if now is None else now
+        results, events = [], []
+        for detector_spec in self.spec.get("detectors", []):
+            name = detector_spec["name"]
+            image = regions.get(name)
+            if image is None:
+                continue
+            shape, detector = self._region_detectors.get(name, (None, None))
+            if shape != image.shape[:2]:
+                try:
+                    detector = CompiledDetector(detector_spec, image.shape, self.base_dir, region=True)
+                except Exception as e:
+                    detector = None
+                    logger.warning(f"⚠️ Détecteur '{name}' ignoré ({self.game}) : {e}")
+                self._region_detectors[name] = (image.shape[:2], detector)
+            if detector is None:
+                continue
+            result = detector.evaluate(image, converted=True)
+            results.append(result)
+            self._debounce(detector, result, now, events)
+        return results, events
+
+    def _debounce(self, detector: CompiledDetector, result: DetectorResult, now: float, events: List[ReflexEvent]):
+        streak = self._streak.get(detector.name, 0) + 1 if result.active else 0
+        self._streak[detector.name] = streak
+        if not result.active:
+            self._latched[detector.name] = False
+            return
+
+        # Front montant confirmé sur hold_frames trames, puis délai de garde
+        if streak >= detector.hold_frames and (detector.repeat or not self._latched.get(detector.name, False)):
+            if now - self._last_event.get(detector.name, float("-inf")) >= detector.cooldown:
+                self._latched[detector.name] = True
+                self._last_event[detector.name] = now
+                events.append(ReflexEvent(self.game, detector.name, result.value, now, detector.action))
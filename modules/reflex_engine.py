@@ -1,80 +1,136 @@
 import time
+import asyncio
 import logging
-import cv2
-import numpy as np
+import threading
 import pyautogui
+from typing import Any, Dict, Optional
 from modules.module import Module
+from modules.reflexDetectors import DetectorEngine, ReflexEvent, load_specs
 
 # On désactive la sécurité de pyautogui pour éviter les arrêts brusques en jeu
 pyautogui.FAILSAFE = False
 
 logger = logging.getLogger('ReflexEngine')
 
+IDLE_DELAY = 0.5             # Attente quand aucun jeu décrit n'est au premier plan
+
 class ReflexEngine(Module):
     def __init__(self, signals, modules, enabled=True):
         super().__init__(signals, enabled)
         self.modules = modules
+        self.API = self.API(self)
         self.running = False
-        self.reflex_delay = 0.05  # 50ms pour une réactivité "humaine"
-        
+        self.specs = load_specs()
+        self.engines: Dict[str, DetectorEngine] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._subscriptions: Dict[str, Any] = {}
+        self._subscribed_game: Optional[str] = None
+        self._resubscribe = False
+
+        self.stats = {"frames": 0, "detections": 0, "events": 0, "detect_ms": 0.0}
+
     async def run(self):
         if not self.enabled:
             return
-            
+
         self.running = True
         logger.info("⚡ Reflex Engine (Auto-Combat & Survie) ACTIF.")
-        
+
+        # Boucle de détection dans un thread dédié : plus aucun time.sleep dans la boucle asyncio
+        self._thread = threading.Thread(target=self._reflex_loop, name="ClioReflexEngine", daemon=True)
+        self._thread.start()
+
+        while self.running and not self.signals.terminate:
+            await asyncio.sleep(1)
+        self.running = False
+
+    def _current_game(self) -> Optional[str]:
+        """Jeu décrit dans reflex_detectors.json au premier plan (état en cache du service de premier plan)."""
+        foreground = self.modules.get('foreground')
+        title = foreground.API.get_window_title().lower() if foreground else ""
+        return next((game for game, spec in self.specs.items() if spec.get("window_keyword", game) in title), None)
+
+    def _subscribe(self, vision, game: Optional[str]):
+        """Un abonnement de zone par détecteur : seules ces zones sont capturées, à la cadence du jeu."""
+        for sub in self._subscriptions.values():
+            vision.API.unsubscribe(sub)
+        self._subscriptions = {}
+        self._subscribed_game = game
+        self._resubscribe = False
+        if not game:
+            return
+        engine = self.engines.get(game)
+        if engine is None:
+            engine = self.engines[game] = DetectorEngine(game, self.specs[game])
+        for name, region, color in engine.regions():
+            self._subscriptions[name] = vision.API.subscribe(region, fps=engine.fps, color=color)
+
+    def _reflex_loop(self):
+        last_seq = 0
         while self.running and not self.signals.terminate:
             try:
                 # Récupération de la vision
                 vision = self.modules.get('vision')
-                if not vision:
+                game = self._current_game() if vision else None
+                if vision and (game != self._subscribed_game or self._resubscribe):
+                    self._subscribe(vision, game)
+                    last_seq = 0
+                if not game or not self._subscriptions:
+                    time.sleep(IDLE_DELAY)
                     continue
 
-                # 1. RÉFLEXE DE SURVIE (Santé)
-                self._survival_reflex(vision)
-                
-                # 2. RÉFLEXE DE COMBAT (Warframe)
-                # On vérifie si la fenêtre active est bien le jeu
-                if "warframe" in vision.API.get_context().lower():
-                    self._combat_reflexes(vision)
-                
-                time.sleep(self.reflex_delay)
+                # Les zones d'un même jeu sont livrées ensemble : on attend la première
+                first = next(iter(self._subscriptions.values()))
+                region = first.wait(after_seq=last_seq, timeout=1.0)
+                if region is None:
+                    continue
+                last_seq = region.seq
+
+                start = time.perf_counter()
+                regions = {name: sub.latest().image for name, sub in self._subscriptions.items() if sub.latest()}
+                results, events = self.engines[game].process_regions(regions)
+                self.stats["frames"] += 1
+                self.stats["detections"] += len(results)
+                self.stats["detect_ms"] = (time.perf_counter() - start) * 1000
+                for event in events:
+                    self._handle_event(event)
             except Exception as e:
                 logger.error(f"Erreur ReflexEngine : {e}")
                 time.sleep(1)
 
-    def _survival_reflex(self, vision):
-        """ Analyse la zone de vie et soigne si nécessaire """
-        roi_stats = vision.API.get_game_roi("warframe")
-        # On cherche la couleur rouge intense dans la zone de stats
-        hsv = cv2.cvtColor(roi_stats, cv2.COLOR_BGR2HSV)
-        lower_red = np.array([0, 150, 50])
-        upper_red = np.array([10, 255, 255])
-        mask = cv2.inRange(hsv, lower_red, upper_red)
-        
-        # Si le rouge disparaît (vie basse), on appuie sur la touche de soin
-        if np.sum(mask) < 500: # Seuil à ajuster selon ton interface
-            # self.modules['control'].API.press_key('q') 
-            pass
-
-    def _combat_reflexes(self, vision):
-        """ Détection d'ennemis au réticule et tir automatique """
-        # On capture une petite zone au centre de l'écran (le réticule)
-        screen = vision.API.get_screenshot()
-        h, w, _ = screen.shape
-        center_x, center_y = w // 2, h // 2
-        offset = 50 # Zone de 100x100 pixels
-        
-        crosshair_zone = screen[center_y-offset:center_y+offset, center_x-offset:center_x+offset]
-        
-        # Détection de la couleur rouge (barre de vie ennemie)
-        hsv = cv2.cvtColor(crosshair_zone, cv2.COLOR_BGR2HSV)
-        mask = cv2.inRange(hsv, np.array([0, 100, 100]), np.array([10, 255, 255]))
-        
-        if np.any(mask):
+    def _handle_event(self, event: ReflexEvent):
+        self.stats["events"] += 1
+
+        # 1. Réflexe immédiat (dans ce thread, sans attendre la boucle asyncio)
+        if event.action == "click":
             logger.info("🎯 Cible verrouillée ! Tir réflexe.")
             pyautogui.click() # Simule le tir
+        elif event.action and event.action.startswith("key:"):
+            pyautogui.press(event.action.split(":", 1)[1])
+
+        # 2. Le cerveau est prévenu via la file d'actions (thread -> boucle asyncio)
+        loop = getattr(self.signals, 'loop', None)
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.signals.action_queue.put_nowait, {
+                "type": "reflex_event",
+                "game": event.game,
+                "name": event.name,
+                "value": event.value,
+                "timestamp": event.timestamp
+            })
 
     def stop(self):
-        self.running = False
\ No newline at end of file
+        self.running = False
+
+    class API:
+        def __init__(self, outer):
+            self.outer = outer
+
+        def get_stats(self) -> Dict[str, Any]:
+            return dict(self.outer.stats)
+
+        def reload_specs(self):
+            """Relit reflex_detectors.json (détecteurs recompilés et zones réabonnées au tour suivant)."""
+            self.outer.specs = load_specs()
+            self.outer.engines = {}
+            self.outer._resubscribe = True
@@ -0,0 +1,347 @@
+# Fichier : modules/screenCapture.py
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from modules.module import Module
+from modules.frameBus import FrameBus, FrameBusReader, Frame
+from modules.reflexDetectors import resolve_roi
+from modules.foregroundWatcher import get_watcher, read_foreground
+from constants import (
+    PRIMARY_MONITOR, SCREEN_CAPTURE_FPS, SCREEN_CAPTURE_IDLE_TIMEOUT, FRAME_BUS_SLOTS,
+    CLIO_FRAME_BUS_NAME, CLIO_CAMERA_BUS_NAME, CAMERA_SOURCE_URL, GAME_ROIS
+)
+
+logger = logging.getLogger('ScreenCapture')
+
+MERGE_SLACK = 1.5        # Deux zones sont capturées d'un seul bloc si l'union coûte <= 1.5x leur somme
+SUBSCRIPTION_BUFFERS = 3 # Tampons tournants par abonnement (une trame livrée reste valide 2 livraisons)
+STATS_WINDOW = 5.0
+
+# Conversions BGRA (mss) -> format demandé ; "hsv" passe par un tampon BGR intermédiaire
+COLOR_CODES = {"bgr": "COLOR_BGRA2BGR", "rgb": "COLOR_BGRA2RGB", "gray": "COLOR_BGRA2GRAY", "hsv": "COLOR_BGRA2BGR"}
+
+
+class RegionFrame(NamedTuple):
+    seq: int
+    timestamp: float
+    image: np.ndarray
+
+
+class Subscription:
+    """
+    Une zone d'écran demandée par un consommateur (zone, cadence, format de couleur).
+    La zone suit le format des specs de détecteurs : {"roi": [x, y, l, h]} relatif,
+    {"center_box": [l, h]} en pixels, ou None pour l'écran entier.
+    """
+    def __init__(self, region: Optional[Dict[str, Any]], fps: float, color: str = "bgr",
+                 callback: Optional[Callable[[RegionFrame], Any]] = None):
+        if color not in COLOR_CODES:
+            raise ValueError(f"Format de couleur inconnu : {color}")
+        self.region = region or {}
+        self.interval = 1.0 / max(0.1, fps)
+        self.color = color
+        self.callback = callback
+        self.box: Optional[Tuple[int, int, int, int]] = None  # (x0, y0, x1, y1) résolu par le thread de capture
+        self.next_due = 0.0
+        self.seq = 0
+        self._buffers: List[np.ndarray] = []
+        self._bgr: Optional[np.ndarray] = None
+        self._latest: Optional[RegionFrame] = None
+        self._cond = threading.Condition()
+
+    def _deliver(self, bgra: np.ndarray, timestamp: float):
+        """Thread de capture : découpe déjà faite, conversion dans le prochain tampon tournant."""
+        import cv2
+
+        height, width = bgra.shape[:2]
+        shape = (height, width) if self.color == "gray" else (height, width, 3)
+        if not self._buffers or self._buffers[0].shape != shape:
+            self._buffers = [np.empty(shape, dtype=np.uint8) for _ in range(SUBSCRIPTION_BUFFERS)]
+            self._bgr = np.empty((height, width, 3), dtype=np.uint8) if self.color == "hsv" else None
+        target = self._buffers[self.seq % SUBSCRIPTION_BUFFERS]
+        if self.color == "hsv":
+            cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self._bgr)
+            cv2.cvtColor(self._bgr, cv2.COLOR_BGR2HSV, dst=target)
+        else:
+            cv2.cvtColor(bgra, getattr(cv2, COLOR_CODES[self.color]), dst=target)
+
+        with self._cond:
+            self.seq += 1
+            self._latest = RegionFrame(self.seq, timestamp, target)
+            self._cond.notify_all()
+        if self.callback:
+            self.callback(self._latest)
+
+    def latest(self) -> Optional[RegionFrame]:
+        """Dernière zone livrée (vue sur un tampon tournant : copier pour la garder)."""
+        return self._latest
+
+    def wait(self, after_seq: int = 0, timeout: float = 1.0) -> Optional[RegionFrame]:
+        """Attend une livraison plus récente que after_seq."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > after_seq, timeout=timeout)
+            return self._latest if self.seq > after_seq else None
+
+
+def merge_boxes(boxes: List[Tuple[int, int, int, int]], slack: float = MERGE_SLACK) -> List[Tuple[Tuple[int, int, int, int], List[int]]]:
+    """Regroupe les zones qui se chevauchent ou sont proches : [(boîte englobante, [indices]), ...]."""
+    def area(b):
+        return (b[2] - b[0]) * (b[3] - b[1])
+
+    groups: List[Tuple[Tuple[int, int, int, int], List[int], int]] = []  # (union, membres, somme des aires)
+    for i in sorted(range(len(boxes)), key=lambda k: -area(boxes[k])):
+        box = boxes[i]
+        for g, (union, members, total) in enumerate(groups):
+            merged = (min(union[0], box[0]), min(union[1], box[1]), max(union[2], box[2]), max(union[3], box[3]))
+            if area(merged) <= (total + area(box)) * slack:
+                groups[g] = (merged, members + [i], total + area(box))
+                break
+        else:
+            groups.append((box, [i], area(box)))
+    return [(union, members) for union, members, _ in groups]
+
+
+class ScreenCapture(Module):
+    """
+    Service de capture unique (enregistré sous modules['vision']).
+    Une seule capture mss par intervalle de trame, publiée dans le bus d'images partagé ;
+    la capture s'endort quand plus personne ne lit (économie CPU/GPU en privé).
+    """
+    def __init__(self, signals, enabled=True):
+        super().__init__(signals, enabled)
+        self.API = self.API(self)
+        self.frame_interval = 1.0 / SCREEN_CAPTURE_FPS
+        self.bus: Optional[FrameBus] = None
+        self.reader: Optional[FrameBusReader] = None
+        self.camera_bus: Optional[FrameBus] = None
+        self._threads = []
+        self._ready = threading.Event()
+        self._subscriptions: List[Subscription] = []
+        self._sub_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._grabs: deque = deque()  # (instant, pixels capturés)
+
+    # --- CAPTURE ÉCRAN ---
+
+    def _grab(self, sct, monitor, box: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+        """Capture BGRA de l'écran entier ou d'une zone (x0, y0, x1, y1) seulement."""
+        if box is not None:
+            monitor = {"left": monitor["left"] + box[0], "top": monitor["top"] + box[1],
+                       "width": box[2] - box[0], "height": box[3] - box[1]}
+        shot = sct.grab(monitor)
+        self._grabs.append((time.monotonic(), shot.width * shot.height))
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def _screen_loop(self):
+        import mss
+        import cv2
+
+        with mss.mss() as sct:
+            monitor = sct.monitors[PRIMARY_MONITOR]
+            screen_shape = (monitor["height"], monitor["width"])
+            self.bus = FrameBus(CLIO_FRAME_BUS_NAME, monitor["width"], monitor["height"], 3, FRAME_BUS_SLOTS)
+            self.reader = FrameBusReader(CLIO_FRAME_BUS_NAME)
+            self._ready.set()
+
+            next_full = time.monotonic()
+            while not self.signals.terminate:
+                now = time.monotonic()
+                # Trame complète voulue seulement si quelqu'un lit le bus partagé
+                full_wanted = time.time() - self.bus.last_demand() <= SCREEN_CAPTURE_IDLE_TIMEOUT
+                with self._sub_lock:
+                    subscriptions = list(self._subscriptions)
+                for sub in subscriptions:
+                    if sub.box is None:
+                        sub.box = resolve_roi(sub.region, screen_shape)
+                due = [sub for sub in subscriptions if sub.next_due <= now]
+
+                try:
+                    if full_wanted and now >= next_full:
+                        bgra = self._grab(sct, monitor)
+                        timestamp = time.time()
+                        target = self.bus.begin_write()
+                        if bgra.shape[:2] == target.shape[:2]:
+                            # Conversion directement dans le slot partagé : aucun tableau intermédiaire
+                            cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=target)
+                        else:
+                            cv2.resize(cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR), (target.shape[1], target.shape[0]), dst=target)
+                        self.bus.commit(timestamp)
+                        # Les abonnements dus profitent de cette capture complète
+                        for sub in due:
+                            x0, y0, x1, y1 = sub.box
+                            sub._deliver(bgra[y0:y1, x0:x1], timestamp)
+                        next_full = max(next_full + self.frame_interval, now)
+                    elif due:
+                        # Sinon on ne capture que l'union des zones dues (regroupées si proches)
+                        for (gx0, gy0, gx1, gy1), members in merge_boxes([sub.box for sub in due]):
+                            bgra = self._grab(sct, monitor, (gx0, gy0, gx1, gy1))
+                            timestamp = time.time()
+                            for i in members:
+                                x0, y0, x1, y1 = due[i].box
+                                due[i]._deliver(bgra[y0 - gy0:y1 - gy0, x0 - gx0:x1 - gx0], timestamp)
+                except Exception as e:
+                    logger.error(f"❌ Capture écran : {e}")
+                    time.sleep(1)
+
+                for sub in due:
+                    sub.next_due = max(sub.next_due + sub.interval, now)
+
+                # Sommeil jusqu'à la prochaine échéance (au plus 20 ms : une demande de trame
+                # complète doit être vue vite ; réveil immédiat sur nouvel abonnement)
+                deadlines = [sub.next_due for sub in subscriptions] + ([next_full] if full_wanted else [])
+                delay = min(deadlines) - time.monotonic() if deadlines else 0.02
+                self._wake.wait(timeout=min(max(delay, 0.0), 0.02))
+                self._wake.clear()
+
+        self.reader.close()
+        self.bus.close()
+
+    # --- SOURCE CAMÉRA (Tapo RTSP, optionnelle) ---
+
+    def _camera_loop(self):
+        import cv2
+
+        cap = cv2.VideoCapture(CAMERA_SOURCE_URL)
+        ok, frame = cap.read()
+        if not ok:
+            logger.warning(f"⚠️ Caméra indisponible : {CAMERA_SOURCE_URL}")
+            cap.release()
+            return
+
+        height, width = frame.shape[:2]
+        self.camera_bus = FrameBus(CLIO_CAMERA_BUS_NAME, width, height, 3, FRAME_BUS_SLOTS)
+        try:
+            while not self.signals.terminate:
+                if time.time() - self.camera_bus.last_demand() > SCREEN_CAPTURE_IDLE_TIMEOUT:
+                    # Personne ne regarde : on vide le flux RTSP sans décoder les images
+                    if not cap.grab():
+                        time.sleep(0.5)
+                    continue
+                target = self.camera_bus.begin_write()
+                # Décodage directement dans le slot partagé
+                ok, _ = cap.read(target)
+                if not ok:
+                    logger.warning("⚠️ Flux caméra interrompu, reconnexion...")
+                    cap.release()
+                    time.sleep(2)
+                    cap = cv2.VideoCapture(CAMERA_SOURCE_URL)
+                    continue
+                self.camera_bus.commit()
+        finally:
+            cap.release()
+            self.camera_bus.close()
+
+    async def run(self):
+        if not self.enabled:
+            return
+
+        self._threads.append(threading.Thread(target=self._screen_loop, name="ClioScreenCapture", daemon=True))
+        if CAMERA_SOURCE_URL:
+            self._threads.append(threading.Thread(target=self._camera_loop, name="ClioCameraCapture", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"👁️ Service de capture actif (bus '{CLIO_FRAME_BUS_NAME}', {SCREEN_CAPTURE_FPS} i/s max)")
+
+        while not self.signals.terminate:
+            await asyncio.sleep(1)
+
+    # --- LECTURE ---
+
+    def get_frame(self, max_age: Optional[float] = None) -> Optional[Frame]:
+        if not self._ready.wait(timeout=0.5) or self.reader is None:
+            return None
+        max_age = self.frame_interval * 2 if max_age is None else max_age
+        return self.reader.wait_fresh(max_age)
+
+    def subscribe(self, region: Optional[Dict[str, Any]], fps: float, color: str = "bgr",
+                  callback: Optional[Callable[[RegionFrame], Any]] = None) -> Subscription:
+        sub = Subscription(region, fps, color, callback)
+        with self._sub_lock:
+            self._subscriptions.append(sub)
+        self._wake.set()
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._sub_lock:
+            if sub in self._subscriptions:
+                self._subscriptions.remove(sub)
+
+    def get_capture_stats(self) -> Dict[str, Any]:
+        cutoff = time.monotonic() - STATS_WINDOW
+        while self._grabs and self._grabs[0][0] < cutoff:
+            self._grabs.popleft()
+        grabs = list(self._grabs)
+        with self._sub_lock:
+            subscriptions = [{"region": s.region, "fps": round(1 / s.interval, 2), "color": s.color, "delivered": s.seq}
+                             for s in self._subscriptions]
+        return {
+            "grabs_per_s": round(len(grabs) / STATS_WINDOW, 2),
+            "megapixels_per_s": round(sum(p for _, p in grabs) / STATS_WINDOW / 1e6, 3),
+            "subscriptions": subscriptions
+        }
+
+    def get_active_window_title(self) -> str:
+        # Titre en cache du service de premier plan s'il tourne, sinon lecture ponctuelle
+        watcher = get_watcher()
+        if watcher is not None:
+            return watcher.state.title
+        return read_foreground()[0]
+
+    class API:
+        def __init__(self, outer):
+            self.outer = outer
+
+        def get_frame(self, max_age: Optional[float] = None) -> Optional[Frame]:
+            """Trame complète (seq, horodatage, vue BGR sans copie)."""
+            return self.outer.get_frame(max_age)
+
+        def get_screenshot(self) -> Optional[np.ndarray]:
+            """Vue BGR de la dernière capture. Copier si elle doit survivre à plusieurs trames."""
+            frame = self.outer.get_frame()
+            return frame.image if frame is not None else None
+
+        def subscribe(self, region: Optional[Dict[str, Any]] = None, fps: float = 2.0, color: str = "bgr",
+                      callback: Optional[Callable[[RegionFrame], Any]] = None) -> Subscription:
+            """
+            Abonnement à une zone d'écran : seule cette zone est capturée, à cette cadence,
+            convertie en "bgr", "rgb", "gray" ou "hsv". Lecture par sub.wait()/sub.latest()
+            ou par callback (appelé dans le thread de capture : doit rester court).
+            """
+            return self.outer.subscribe(region, fps, color, callback)
+
+        def unsubscribe(self, sub: Subscription):
+            self.outer.unsubscribe(sub)
+
+        def get_capture_stats(self) -> Dict[str, Any]:
+            return self.outer.get_capture_stats()
+
+        def get_roi(self, x: int, y: int, w: int, h: int) -> Optional[np.ndarray]:
+            screen = self.get_screenshot()
+            if screen is None:
+                return None
+            return screen[max(0, y):y + h, max(0, x):x + w]
+
+        def get_game_roi(self, game: str) -> Optional[np.ndarray]:
+            """Zone HUD d'un jeu (coordonnées relatives définies dans GAME_ROIS)."""
+            screen = self.get_screenshot()
+            roi = GAME_ROIS.get(game.lower())
+            if screen is None or roi is None:
+                return screen
+            height, width = screen.shape[:2]
+            x, y, w, h = roi
+            return screen[int(y * height):int((y + h) * height), int(x * width):int((x + w) * width)]
+
+        def get_context(self) -> str:
+            return self.outer.get_active_window_title()
+
+        def get_active_window_title(self) -> str:
+            return self.outer.get_active_window_title()
+
+        def get_bus_names(self) -> Tuple[str, Optional[str]]:
+            return CLIO_FRAME_BUS_NAME, (CLIO_CAMERA_BUS_NAME if CAMERA_SOURCE_URL else None)
@@ -0,0 +1,250 @@
+# Fichier : modules/speechGate.py
+import time
+import logging
+import threading
+import unicodedata
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger('SpeechGate')
+
+'''
+Porte d'entrée du STT : un étage léger toujours actif devant Whisper.
+Le micro est lu ici (et non plus par RealtimeSTT) ; seules les trames jugées utiles
+sont poussées dans recorder.feed_audio(). Tant que la porte est fermée, Whisper
+et le VAD Silero de RealtimeSTT ne reçoivent rien et ne consomment presque pas de CPU.
+
+Étages (du moins cher au plus cher) :
+1. Énergie RMS (bruit de fond du PC, ventilateurs)
+2. WebRTC VAD (optionnel, paquet 'webrtcvad')
+3. Mot-clé "Clio" (paquet 'openwakeword' + modèle entraîné). Sans modèle, le mode
+   "wake_word" se replie sur le VAD seul : toute la parole atteint Whisper.
+'''
+
+# --- CONFIGURATION ---
+SAMPLE_RATE = 16000
+FRAME_MS = 30                   # Taille imposée par WebRTC VAD (10, 20 ou 30 ms)
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+ENERGY_FLOOR = 0.006            # RMS minimal pour considérer une trame comme candidate
+SPEECH_START_FRAMES = 3         # Trames de parole consécutives pour ouvrir (~90 ms)
+HANGOVER_SECONDS = 1.0          # Silence toléré avant de refermer la porte
+PRE_ROLL_SECONDS = 0.6          # Audio gardé avant l'ouverture (début de phrase / mot-clé)
+WAKE_WORD_CHUNK = 1280          # openWakeWord travaille par blocs de 80 ms
+
+GATE_MODES = ("open", "vad", "wake_word", "off")
+
+
+def normalize_transcript(text: str) -> str:
+    """Minuscules sans accents pour la détection du mot-clé dans le texte transcrit."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def transcript_has_keyword(text: str, keywords: Iterable[str]) -> bool:
+    normalized = normalize_transcript(text)
+    return any(normalize_transcript(keyword) in normalized for keyword in keywords)
+
+
+class SpeechGate:
+    """
+    Capture micro + filtrage. Le mode courant est relu à chaque trame via get_mode(),
+    ce qui permet de suivre le context_mode et le jeu en cours sans redémarrage.
+    """
+    def __init__(self, feed_audio: Callable[[bytes], None], get_mode: Callable[[], str],
+                 is_muted: Callable[[], bool] = lambda: False,
+                 input_device_index: Optional[int] = None,
+                 vad_aggressiveness: int = 2,
+                 wake_word_model: Optional[str] = None,
+                 wake_word_threshold: float = 0.5,
+                 followup_seconds: float = 8.0):
+        self.feed_audio = feed_audio
+        self.get_mode = get_mode
+        self.is_muted = is_muted
+        self.input_device_index = input_device_index
+        self.wake_word_threshold = wake_word_threshold
+        self.followup_seconds = followup_seconds
+
+        self.vad = self._load_vad(vad_aggressiveness)
+        self.wake_model, self.wake_key = self._load_wake_word(wake_word_model)
+
+        self._pre_roll: Deque[bytes] = deque(maxlen=int(PRE_ROLL_SECONDS * 1000 / FRAME_MS))
+        self._wake_buffer = np.zeros(0, dtype=np.int16)
+        self._speech_run = 0
+        self._is_open = False
+        self._last_speech = 0.0
+        self._awake_until = 0.0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._fallback_warned = False
+
+        self.stats = {"frames": 0, "forwarded": 0, "openings": 0, "wake_hits": 0}
+
+    # --- CHARGEMENT DES ÉTAGES OPTIONNELS ---
+
+    @staticmethod
+    def _load_vad(aggressiveness: int):
+        try:
+            import webrtcvad
+            return webrtcvad.Vad(aggressiveness)
+        except ImportError:
+            logger.warning("⚠️ webrtcvad absent : porte STT en mode énergie seule.")
+            return None
+
+    @staticmethod
+    def _load_wake_word(model_path: Optional[str]):
+        if not model_path:
+            return None, None
+        try:
+            import os
+            from openwakeword.model import Model
+            if not os.path.exists(model_path):
+                raise FileNotFoundError(model_path)
+            model = Model(wakeword_models=[model_path], inference_framework="onnx")
+            key = os.path.splitext(os.path.basename(model_path))[0]
+            logger.info(f"👂 Mot-clé acoustique chargé : {key}")
+            return model, key
+        except Exception as e:
+            logger.warning(f"⚠️ Mot-clé acoustique indisponible ({e}) : le mode wake_word se repliera sur le VAD seul.")
+            return None, None
+
+    @property
+    def has_wake_word_model(self) -> bool:
+        return self.wake_model is not None
+
+    def effective_mode(self, mode: str) -> str:
+        """Mode réellement appliqué : sans modèle acoustique, 'wake_word' ne peut rien filtrer avant Whisper."""
+        if mode != "wake_word" or self.has_wake_word_model:
+            return mode
+        if not self._fallback_warned:
+            self._fallback_warned = True
+            logger.warning("⚠️ Mode wake_word sans modèle openWakeWord : repli sur le VAD, Whisper transcrit toute la parole.")
+        return "vad"
+
+    # --- CYCLE DE VIE ---
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="ClioSpeechGate", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def wake(self):
+        """Prolonge la fenêtre de suivi (Clio vient d'être interpellée)."""
+        self._awake_until = time.monotonic() + self.followup_seconds
+
+    def is_awake(self) -> bool:
+        return time.monotonic() < self._awake_until
+
+    # --- CAPTURE ---
+
+    def _capture_loop(self):
+        import pyaudio
+
+        pa = pyaudio.PyAudio()
+        stream = pa.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=SAMPLE_RATE,
+            input=True,
+            frames_per_buffer=FRAME_SAMPLES,
+            input_device_index=self.input_device_index
+        )
+        logger.info("🎙️ Porte STT active (capture micro 16 kHz).")
+        try:
+            while self._running:
+                frame = stream.read(FRAME_SAMPLES, exception_on_overflow=False)
+                self.process_frame(frame)
+        except Exception as e:
+            logger.error(f"❌ Capture micro interrompue : {e}")
+        finally:
+            stream.stop_stream()
+            stream.close()
+            pa.terminate()
+
+    # --- DÉCISION PAR TRAME ---
+
+    def _is_speech(self, frame: bytes) -> bool:
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32) / 32768.0
+        if float(np.sqrt(np.mean(samples * samples))) < ENERGY_FLOOR:
+            return False
+        if self.vad is None:
+            return True
+        return self.vad.is_speech(frame, SAMPLE_RATE)
+
+    def _detect_wake_word(self, frame: bytes) -> bool:
+        """Accumule des blocs de 80 ms pour openWakeWord (appelé seulement sur de la parole)."""
+        self._wake_buffer = np.concatenate((self._wake_buffer, np.frombuffer(frame, dtype=np.int16)))
+        hit = False
+        while self._wake_buffer.size >= WAKE_WORD_CHUNK:
+            chunk, self._wake_buffer = self._wake_buffer[:WAKE_WORD_CHUNK], self._wake_buffer[WAKE_WORD_CHUNK:]
+            scores = self.wake_model.predict(chunk)
+            if scores.get(self.wake_key, 0.0) >= self.wake_word_threshold:
+                hit = True
+        return hit
+
+    def _open(self):
+        self._is_open = True
+        self.stats["openings"] += 1
+        # Le pré-roll contient le début de phrase (et le mot-clé) capté avant l'ouverture
+        for buffered in self._pre_roll:
+            self._forward(buffered)
+        self._pre_roll.clear()
+
+    def _close(self):
+        self._is_open = False
+        self._speech_run = 0
+        self._wake_buffer = np.zeros(0, dtype=np.int16)
+
+    def _forward(self, frame: bytes):
+        self.stats["forwarded"] += 1
+        self.feed_audio(frame)
+
+    def process_frame(self, frame: bytes):
+        self.stats["frames"] += 1
+        mode = self.effective_mode(self.get_mode())
+
+        if mode == "off" or self.is_muted():
+            if self._is_open:
+                self._close()
+            self._pre_roll.clear()
+            return
+
+        if mode == "open":
+            self._forward(frame)
+            return
+
+        now = time.monotonic()
+        speech = self._is_speech(frame)
+        if speech:
+            self._last_speech = now
+
+        if self._is_open:
+            self._forward(frame)
+            if now - self._last_speech > HANGOVER_SECONDS:
+                self._close()
+            return
+
+        self._pre_roll.append(frame)
+        self._speech_run = self._speech_run + 1 if speech else 0
+
+        if mode == "wake_word" and not self.is_awake():
+            # Le spotter ne tourne que sur les trames qui ont déjà passé l'énergie et le VAD
+            if speech and self._detect_wake_word(frame):
+                self.stats["wake_hits"] += 1
+                self.wake()
+                self._open()
+            return
+
+        if self._speech_run >= SPEECH_START_FRAMES:
+            self._open()
+
+    def get_stats(self) -> Dict[str, float]:
+        stats: Dict[str, float] = dict(self.stats)
+        stats["forward_ratio"] = round(stats["forwarded"] / stats["frames"], 3) if stats["frames"] else 0.0
+        return stats
@@ -0,0 +1,348 @@
+# Fichier : modules/textAnalysis.py
+import re
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger('TextAnalysis')
+
+'''
+Moteur d'analyse de texte partagé par tous les filtres (éthique, liste noire, émotions, humour,
+paradoxes, manipulation, réactions). Chaque module déclare sa "famille" de règles une fois ;
+toutes les familles sont compilées ensemble :
+- tier littéral : un seul automate Aho-Corasick (DFA) par vue du texte, tous mots-clés confondus,
+  parcouru une fois quel que soit le nombre de règles (limites de mot vérifiées sur les occurrences)
+- tier regex : les expressions qui ne se réduisent pas à des littéraux ; chacune n'est exécutée
+  que si le littéral qu'elle exige a été vu par l'automate (préfiltre, à la Hyperscan)
+Le texte est normalisé une fois par vue ("lower" : minuscules ; "folded" : sans accents ni
+ponctuation, contre les contournements p.é.d.é / s@lope). Le résultat d'un message est gardé
+en cache : le deuxième filtre qui lit le même texte ne le reparcourt pas.
+'''
+
+# --- CONFIGURATION ---
+CACHE_SIZE = 256            # Derniers textes analysés (un message passe par plusieurs filtres)
+MIN_PREFILTER_LENGTH = 3    # Littéral exigé trop court : la regex est exécutée à chaque fois
+VIEWS = ("lower", "folded")
+
+_REGEX_META = set(".^$*+?{}[]\\|()")
+_QUANTIFIERS = set("?*{+")
+
+
+class Rule(NamedTuple):
+    name: str                           # Catégorie, émotion, type de paradoxe...
+    pattern: str                        # Littéral, ou expression régulière si regex=True
+    weight: float = 1.0
+    regex: bool = False                 # Convertie en littéraux quand c'est possible (ex : \b(a|b)\b)
+    boundary: Optional[str] = None      # Littéraux : "word" (\b), "space" (entouré d'espaces) ou None
+    views: Tuple[str, ...] = ("lower",)
+
+
+class Match(NamedTuple):
+    family: str
+    rule: str
+    term: str           # Texte reconnu (littéral) ou motif de la regex
+    weight: float
+    view: str
+    start: int
+    end: int
+    pattern: str        # Motif de la règle d'origine
+
+
+def fold(text: str) -> str:
+    """Vue "folded" : sans accents, lettres et espaces seulement, en minuscules."""
+    text = "".join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
+    return re.sub(r'[^a-zA-Z\s]', '', text).lower()
+
+
+def _is_word(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+def _plain(text: str) -> bool:
+    return bool(text) and not any(c in _REGEX_META for c in text)
+
+
+def _literals_of(pattern: str) -> Optional[Tuple[List[str], bool]]:
+    """
+    Formes courantes réduites à des littéraux : "mot", "a|b", "\\b(a|b)\\b", "préfixe (a|b)".
+    Retourne (littéraux, limites de mot) ou None s'il faut garder la regex.
+    """
+    bounded = pattern.startswith(r"\b") and pattern.endswith(r"\b") and len(pattern) > 4
+    body = pattern[2:-2] if bounded else pattern
+    group = re.fullmatch(r"([^()|]*)\(([^()]*)\)([^()|]*)", body)
+    if group:
+        prefix, alternatives, suffix = group.groups()
+        literals = [prefix + alt + suffix for alt in alternatives.split("|")]
+        if (prefix and not _plain(prefix)) or (suffix and not _plain(suffix)):
+            return None
+    else:
+        literals = body.split("|")
+    if not all(_plain(literal) for literal in literals):
+        return None
+    # \b devant un caractère qui n'est pas une lettre n'a pas le même sens : regex conservée
+    if bounded and not all(_is_word(l[0]) and _is_word(l[-1]) for l in literals):
+        return None
+    return literals, bounded
+
+
+def _required_literal(pattern: str) -> Optional[str]:
+    """Plus long littéral que toute correspondance doit contenir (None si introuvable sans risque)."""
+    if "|" in pattern:
+        return None
+    runs, run, depth, i = [], "", 0, 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            runs.append(run); run = ""
+            i += 2
+            continue
+        if c in "[{":
+            # Classe de caractères ou {n,m} : contenu sauté
+            if c == "{":
+                run = run[:-1]  # Le caractère quantifié peut être absent ({0,n})
+            runs.append(run); run = ""
+            i = pattern.find("]" if c == "[" else "}", i + 1) + 1 or len(pattern)
+            continue
+        if c in _QUANTIFIERS:
+            run = run[:-1]  # Le caractère quantifié est facultatif
+        if c in _REGEX_META:
+            depth += (c == "(") - (c == ")")
+            runs.append(run); run = ""
+        elif depth == 0:
+            run += c
+        i += 1
+    runs.append(run)
+    best = max(runs, key=len).strip()
+    return best.lower() if len(best) >= MIN_PREFILTER_LENGTH else None
+
+
+class _Automaton:
+    """
+    Aho-Corasick compilé en DFA : au plus deux accès dictionnaire par caractère, sans retour arrière.
+    Les transitions vers les fils de la racine ne sont pas recopiées dans chaque état (mémoire
+    bornée même avec une longue liste noire) : elles servent de repli.
+    """
+
+    def __init__(self, literals: List[Tuple[str, int]]):
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[Tuple[int, int]]] = [[]]
+        for literal, payload in literals:
+            state = 0
+            for c in literal:
+                nxt = goto[state].get(c)
+                if nxt is None:
+                    nxt = goto[state][c] = len(goto)
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append((len(literal), payload))
+
+        # Liens d'échec en largeur ; delta[s] = transitions de s et de ses états d'échec (hors racine)
+        root = goto[0]
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [{} for _ in goto]
+        queue = deque(root.values())
+        while queue:
+            state = queue.popleft()
+            out[state] = out[state] + out[fail[state]]
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for c, nxt in goto[state].items():
+                if state:
+                    fail[nxt] = delta[fail[state]].get(c) or root.get(c, 0)
+                queue.append(nxt)
+        self._root = root
+        self._delta = delta
+        self._out = out
+
+    def scan(self, text: str) -> Iterable[Tuple[int, int, int]]:
+        root, delta, out, state = self._root, self._delta, self._out, 0
+        for i, c in enumerate(text):
+            state = delta[state].get(c) or root.get(c, 0)
+            if out[state]:
+                for length, payload in out[state]:
+                    yield i + 1 - length, i + 1, payload
+
+
+class _Literal(NamedTuple):
+    family: str
+    rule: Rule
+    term: str
+    boundary: Optional[str]
+
+
+class _Regex(NamedTuple):
+    family: str
+    rule: Rule
+    compiled: re.Pattern
+    view: str
+    prefilter: Optional[int]        # Indice du littéral exigé (None : toujours exécutée)
+
+
+class Analysis:
+    """Toutes les correspondances d'un texte, classées par famille."""
+
+    def __init__(self, text: str, matches: List[Match], order: Dict[Tuple[str, str], int]):
+        self.text = text
+        self.matches = matches
+        self._order = order
+
+    def of(self, family: str, view: Optional[str] = None) -> List[Match]:
+        return [m for m in self.matches if m.family == family and (view is None or m.view == view)]
+
+    def has(self, family: str, rule: Optional[str] = None, view: Optional[str] = None) -> bool:
+        return any(m.family == family and (rule is None or m.rule == rule) and (view is None or m.view == view)
+                   for m in self.matches)
+
+    def rules(self, family: str, view: Optional[str] = None) -> List[str]:
+        """Règles touchées, dans l'ordre de déclaration de la famille."""
+        names = {m.rule for m in self.of(family, view)}
+        return sorted(names, key=lambda name: self._order.get((family, name), 0))
+
+    def scores(self, family: str, view: Optional[str] = None) -> Dict[str, float]:
+        """Somme des poids par règle ; chaque motif ne compte qu'une fois, même répété."""
+        seen, scores = set(), {}
+        for m in self.of(family, view):
+            if (m.rule, m.pattern) not in seen:
+                seen.add((m.rule, m.pattern))
+                scores[m.rule] = scores.get(m.rule, 0) + m.weight
+        return {name: scores[name] for name in self.rules(family, view)}
+
+
+class TextAnalyzer:
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self._families: Dict[str, List[Rule]] = {}
+        self._lock = threading.Lock()
+        self._compiled: Optional[Tuple[Dict[str, _Automaton], List[_Literal], List[_Regex], Dict]] = None
+        self._cache: "OrderedDict[str, Analysis]" = OrderedDict()
+        self.cache_size = cache_size
+        self.stats = {"analyses": 0, "cache_hits": 0, "regex_runs": 0, "regex_skipped": 0, "compilations": 0}
+
+    # --- DÉCLARATION DES RÈGLES ---
+    def register(self, family: str, rules: Iterable[Rule]):
+        """Déclare (ou remplace, ex : liste noire rechargée) les règles d'une famille."""
+        with self._lock:
+            self._families[family] = list(rules)
+            self._compiled = None
+            self._cache.clear()
+
+    def unregister(self, family: str):
+        with self._lock:
+            if self._families.pop(family, None) is not None:
+                self._compiled = None
+                self._cache.clear()
+
+    def families(self) -> List[str]:
+        return list(self._families)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _compile(self):
+        literals: List[_Literal] = []
+        regexes: List[_Regex] = []
+        order: Dict[Tuple[str, str], int] = {}
+        per_view: Dict[str, List[Tuple[str, int]]] = {view: [] for view in VIEWS}
+
+        def add_literal(family: str, rule: Rule, term: str, boundary: Optional[str], view: str) -> int:
+            literals.append(_Literal(family, rule, term, boundary))
+            per_view[view].append((term, len(literals) - 1))
+            return len(literals) - 1
+
+        for family, rules in self._families.items():
+            for rule in rules:
+                order.setdefault((family, rule.name), len(order))
+                for view in rule.views:
+                    reduced = _literals_of(rule.pattern) if rule.regex else ([rule.pattern], False)
+                    if reduced is not None:
+                        terms, bounded = reduced
+                        boundary = "word" if bounded else rule.boundary
+                        for term in terms:
+                            if term:
+                                add_literal(family, rule, term.lower(), boundary, view)
+                        continue
+                    required = _required_literal(rule.pattern)
+                    prefilter = add_literal("", rule, required, None, view) if required else None
+                    regexes.append(_Regex(family, rule, re.compile(rule.pattern, re.IGNORECASE | re.DOTALL),
+                                          view, prefilter))
+
+        automata = {view: _Automaton(terms) for view, terms in per_view.items() if terms}
+        self.stats["compilations"] += 1
+        logger.debug(f"Analyse de texte compilée : {len(literals)} littéraux, {len(regexes)} regex, "
+                     f"{len(self._families)} familles.")
+        return automata, literals, regexes, order
+
+    # --- ANALYSE ---
+    def analyze(self, text: str, use_cache: bool = True) -> Analysis:
+        text = text or ""
+        with self._lock:
+            if use_cache and text in self._cache:
+                self._cache.move_to_end(text)
+                self.stats["cache_hits"] += 1
+                return self._cache[text]
+            if self._compiled is None:
+                self._compiled = self._compile()
+            automata, literals, regexes, order = self._compiled
+
+        views = {"lower": text.lower()}
+        if "folded" in automata or any(r.view == "folded" for r in regexes):
+            views["folded"] = fold(text)
+
+        matches: List[Match] = []
+        seen_literals = set()
+        for view, automaton in automata.items():
+            subject = views[view]
+            for start, end, index in automaton.scan(subject):
+                literal = literals[index]
+                seen_literals.add(index)
+                if not literal.family or not self._bounded(subject, start, end, literal.boundary):
+                    continue
+                matches.append(Match(literal.family, literal.rule.name, literal.term, literal.rule.weight,
+                                     view, start, end, literal.rule.pattern))
+
+        for regex in regexes:
+            if regex.prefilter is not None and regex.prefilter not in seen_literals:
+                self.stats["regex_skipped"] += 1
+                continue
+            self.stats["regex_runs"] += 1
+            found = regex.compiled.search(views[regex.view])
+            if found:
+                matches.append(Match(regex.family, regex.rule.name, found.group(0), regex.rule.weight,
+                                     regex.view, found.start(), found.end(), regex.rule.pattern))
+
+        analysis = Analysis(text, matches, order)
+        with self._lock:
+            self.stats["analyses"] += 1
+            if use_cache and self._compiled is not None and self._compiled[3] is order:
+                self._cache[text] = analysis
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return analysis
+
+    @staticmethod
+    def _bounded(text: str, start: int, end: int, boundary: Optional[str]) -> bool:
+        if boundary == "word":
+            return (start == 0 or not _is_word(text[start - 1])) and (end == len(text) or not _is_word(text[end]))
+        if boundary == "space":
+            return (start == 0 or text[start - 1] == " ") and (end == len(text) or text[end] == " ")
+        return True
+
+    def get_stats(self) -> Dict[str, int]:
+        stats = dict(self.stats)
+        stats["cached"] = len(self._cache)
+        return stats
+
+
+_analyzer: Optional[TextAnalyzer] = None
+_analyzer_lock = threading.Lock()
+
+
+def get_text_analyzer() -> TextAnalyzer:
+    """Moteur unique du processus (créé au premier appel)."""
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            _analyzer = TextAnalyzer()
+        return _analyzer
@@ -0,0 +1,366 @@
+# Fichier : modules/ttsBackends.py
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import queue
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional, Any
+
+logger = logging.getLogger('TTSBackends')
+
+'''
+Moteurs de synthèse vocale interchangeables pour le module TTS.
+Chaque moteur étend StreamingTTSBackend (stream_pcm) ou FileTTSBackend (synthesize_file) ;
+le module TTS choisit le moteur via TTS_BACKEND dans constants.py et bascule sur
+TTS_FALLBACK_BACKEND tant que le moteur principal n'est pas disponible (chauffe, worker mort).
+'''
+
+# Découpage en phrases : la première phrase part en synthèse tout de suite
+# pour que l'audio commence avant la fin du texte complet.
+SENTENCE_SPLIT_REGEX = re.compile(r'(?<=[\.\!\?…;:])\s+')
+WORKER_READY_TIMEOUT = 180  # Chargement du modèle XTTS à froid (secondes), en arrière-plan
+CHUNK_TIMEOUT = 30          # Délai max entre deux morceaux audio
+WORKER_POLL_INTERVAL = 1.0  # Vérification de la survie du worker pendant l'attente d'un morceau
+
+
+def split_sentences(text: str, max_chars: int = 220) -> List[str]:
+    """Découpe le texte en phrases courtes (XTTS déraille au-delà de ~250 caractères)."""
+    sentences: List[str] = []
+    for sentence in SENTENCE_SPLIT_REGEX.split(text.strip()):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            sentences.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+class TTSBackend(ABC):
+    """
+    Interface commune des moteurs TTS. Ne pas étendre directement : passer par
+    StreamingTTSBackend ou FileTTSBackend, qui fixent le mode de sortie.
+    """
+    name = "abstract"
+    sample_rate = 24000
+
+    def __init__(self):
+        self.ready = False
+
+    @property
+    @abstractmethod
+    def streaming(self) -> bool:
+        """True : PCM par morceaux (stream_pcm) ; False : fichier complet (synthesize_file)."""
+
+    def warmup(self):
+        """Charge les ressources lourdes (modèle, voix) avant la première phrase. Ne doit pas bloquer longtemps."""
+        self.ready = True
+
+    def available(self) -> bool:
+        """Le moteur peut-il synthétiser maintenant (chauffe terminée, processus vivants) ?"""
+        return self.ready
+
+    def shutdown(self):
+        self.ready = False
+
+
+class StreamingTTSBackend(TTSBackend):
+    """Moteur qui produit du PCM 16 bits mono par morceaux."""
+    streaming = True
+
+    @abstractmethod
+    def stream_pcm(self, text: str) -> AsyncIterator[bytes]:
+        """Générateur asynchrone de morceaux PCM (le premier part au player dès qu'il est prêt)."""
+
+
+class FileTTSBackend(TTSBackend):
+    """Moteur qui produit un fichier audio complet."""
+    streaming = False
+
+    @abstractmethod
+    async def synthesize_file(self, text: str, output_path: str) -> Optional[str]:
+        """Écrit l'audio de text dans output_path et retourne ce chemin."""
+
+
+class EdgeTTSBackend(FileTTSBackend):
+    """Moteur historique Edge-TTS (nécessite le réseau, produit un MP3 complet)."""
+    name = "edge"
+
+    def __init__(self, voice: str = "fr-FR-DeniseNeural", rate: str = "+15%", volume: str = "+0%"):
+        super().__init__()
+        self.voice = voice
+        self.rate = rate
+        self.volume = volume
+
+    async def synthesize_file(self, text: str, output_path: str) -> Optional[str]:
+        import edge_tts
+        communicate = edge_tts.Communicate(text, self.voice, rate=self.rate, volume=self.volume)
+        await communicate.save(output_path)
+        return output_path
+
+
+# ----------------------------------------------------------------------
+# MOTEUR LOCAL XTTS (PROCESSUS DÉDIÉ, MODÈLE GARDÉ AU CHAUD)
+# ----------------------------------------------------------------------
+
+def _speaker_cache_path(cache_dir: str, reference_wav: str) -> str:
+    """Clé de cache = chemin + date de modification du fichier de référence."""
+    stamp = f"{os.path.abspath(reference_wav)}:{os.path.getmtime(reference_wav)}"
+    return os.path.join(cache_dir, hashlib.sha1(stamp.encode()).hexdigest() + ".pth")
+
+
+def _load_speaker_latents(model, reference_wav: str, cache_dir: str, memory_cache: Dict[str, Any]):
+    """Calcule (ou relit) les latents de conditionnement de la voix de référence."""
+    import torch
+
+    cache_path = _speaker_cache_path(cache_dir, reference_wav)
+    if cache_path in memory_cache:
+        return memory_cache[cache_path]
+
+    if os.path.exists(cache_path):
+        latents = torch.load(cache_path)
+        gpt_cond_latent, speaker_embedding = latents["gpt_cond_latent"], latents["speaker_embedding"]
+    else:
+        gpt_cond_latent, speaker_embedding = model.get_conditioning_latents(audio_path=[reference_wav])
+        os.makedirs(cache_dir, exist_ok=True)
+        torch.save({"gpt_cond_latent": gpt_cond_latent, "speaker_embedding": speaker_embedding}, cache_path)
+
+    memory_cache[cache_path] = (gpt_cond_latent, speaker_embedding)
+    return memory_cache[cache_path]
+
+
+def xtts_worker_main(worker_id: int, model_dir: str, reference_wav: str, language: str,
+                     use_gpu: bool, cache_dir: str, chunk_size: int,
+                     requests_q: "multiprocessing.Queue", responses_q: "multiprocessing.Queue"):
+    """
+    Point d'entrée du processus de synthèse. Le modèle est chargé une seule fois,
+    puis chaque requête ('synth', req_id, texte) renvoie des morceaux PCM int16
+    sous la forme (req_id, 'chunk', bytes), terminés par (req_id, 'done', durée).
+    """
+    try:
+        import torch
+        from TTS.tts.configs.xtts_config import XttsConfig
+        from TTS.tts.models.xtts import Xtts
+
+        config = XttsConfig()
+        config.load_json(os.path.join(model_dir, "config.json"))
+        model = Xtts.init_from_config(config)
+        model.load_checkpoint(config, checkpoint_dir=model_dir, use_deepspeed=False)
+        if use_gpu and torch.cuda.is_available():
+            model.cuda()
+
+        speaker_cache: Dict[str, Any] = {}
+        gpt_cond_latent, speaker_embedding = _load_speaker_latents(model, reference_wav, cache_dir, speaker_cache)
+
+        # Passe de chauffe : les premiers appels d'inférence sont toujours plus lents
+        for _ in model.inference_stream("Bonjour.", language, gpt_cond_latent, speaker_embedding,
+                                        stream_chunk_size=chunk_size):
+            pass
+    except Exception as e:
+        responses_q.put((None, "fatal", f"Worker {worker_id}: {e}"))
+        return
+
+    responses_q.put((None, "ready", worker_id))
+
+    while True:
+        request = requests_q.get()
+        if request is None or request[0] == "stop":
+            break
+
+        _, req_id, text, voice_path = request
+        start = time.time()
+        try:
+            if voice_path and os.path.exists(voice_path) and voice_path != reference_wav:
+                cond, emb = _load_speaker_latents(model, voice_path, cache_dir, speaker_cache)
+            else:
+                cond, emb = gpt_cond_latent, speaker_embedding
+
+            for chunk in model.inference_stream(text, language, cond, emb,
+                                                stream_chunk_size=chunk_size,
+                                                enable_text_splitting=False):
+                pcm = (chunk.clamp(-1.0, 1.0) * 32767).to(torch.int16).cpu().numpy().tobytes()
+                responses_q.put((req_id, "chunk", pcm))
+            responses_q.put((req_id, "done", time.time() - start))
+        except Exception as e:
+            responses_q.put((req_id, "error", str(e)))
+
+
+class _XTTSWorker:
+    """Un processus XTTS et ses deux files (requêtes / réponses)."""
+    def __init__(self, worker_id: int, ctx, args: tuple):
+        self.worker_id = worker_id
+        self.requests = ctx.Queue()
+        self.responses = ctx.Queue()
+        self.process = ctx.Process(
+            target=xtts_worker_main,
+            args=(worker_id, *args, self.requests, self.responses),
+            name=f"ClioXTTS-{worker_id}",
+            daemon=True
+        )
+
+    def start(self):
+        self.process.start()
+
+    def wait_ready(self, timeout: float) -> bool:
+        try:
+            _, kind, payload = self.responses.get(timeout=timeout)
+        except queue.Empty:
+            logger.error(f"❌ XTTS worker {self.worker_id} : délai de chargement dépassé.")
+            return False
+        if kind != "ready":
+            logger.error(f"❌ XTTS worker {self.worker_id} : {payload}")
+            return False
+        return True
+
+    def stop(self):
+        try:
+            self.requests.put(("stop",))
+            self.process.join(timeout=5)
+        except Exception:
+            pass
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+class LocalXTTSBackend(StreamingTTSBackend):
+    """
+    Moteur hors-ligne Coqui XTTS v2. Le modèle vit dans un (ou plusieurs) processus dédiés
+    chargés en arrière-plan : aucune latence réseau, premier morceau audio en streaming.
+    """
+    name = "xtts"
+    sample_rate = 24000
+
+    def __init__(self, model_dir: str, reference_wav: str, language: str = "fr",
+                 use_gpu: bool = False, workers: int = 1, cache_dir: str = "temp/speaker_cache",
+                 chunk_size: int = 20):
+        super().__init__()
+        self.model_dir = model_dir
+        self.reference_wav = reference_wav
+        self.language = language
+        self.use_gpu = use_gpu
+        self.worker_count = max(1, workers)
+        self.cache_dir = cache_dir
+        self.chunk_size = chunk_size
+
+        self.workers: List[_XTTSWorker] = []
+        self.idle_workers: "queue.SimpleQueue[_XTTSWorker]" = queue.SimpleQueue()
+        self._next_request_id = 0
+        self._warming = False
+        self.last_first_audio: Optional[float] = None
+
+    def warmup(self):
+        """Vérifie les fichiers puis lance les workers ; leur chargement est attendu dans un thread."""
+        if self.ready or self._warming:
+            return
+        if not os.path.isdir(self.model_dir):
+            raise RuntimeError(f"Modèle XTTS introuvable : {self.model_dir}")
+        if not os.path.exists(self.reference_wav):
+            raise RuntimeError(f"Voix de référence introuvable : {self.reference_wav}")
+
+        # 'spawn' : obligatoire sous Windows et évite d'hériter de l'état CUDA du parent
+        ctx = multiprocessing.get_context("spawn")
+        args = (self.model_dir, self.reference_wav, self.language, self.use_gpu, self.cache_dir, self.chunk_size)
+
+        self.workers = [_XTTSWorker(i, ctx, args) for i in range(self.worker_count)]
+        for worker in self.workers:
+            worker.start()
+        self._warming = True
+        threading.Thread(target=self._await_workers, args=(list(self.workers), time.time()),
+                         name="ClioXTTSWarmup", daemon=True).start()
+        logger.info(f"⏳ XTTS local en chargement ({self.worker_count} worker(s)), secours en attendant.")
+
+    def _await_workers(self, workers: List[_XTTSWorker], start: float):
+        """Thread de chauffe : chaque worker prêt rejoint le pool, le premier rend le moteur disponible."""
+        try:
+            for worker in workers:
+                if worker.wait_ready(WORKER_READY_TIMEOUT) and worker in self.workers:
+                    self.idle_workers.put(worker)
+                    if not self.ready:
+                        self.ready = True
+                        logger.info(f"🔥 XTTS local prêt en {time.time() - start:.1f}s.")
+                else:
+                    worker.stop()
+            if not self.ready:
+                logger.error("❌ Aucun worker XTTS n'a pu démarrer : le moteur de secours reste actif.")
+        finally:
+            self._warming = False
+
+    def available(self) -> bool:
+        return self.ready and any(worker.process.is_alive() for worker in self.workers)
+
+    async def _acquire_worker(self) -> _XTTSWorker:
+        while True:
+            try:
+                return self.idle_workers.get_nowait()
+            except queue.Empty:
+                if not self.available():
+                    raise RuntimeError("Aucun worker XTTS vivant.")
+                await asyncio.sleep(0.01)
+
+    async def _next_message(self, worker: _XTTSWorker):
+        """Attend le prochain message du worker ; échoue vite si son processus est mort."""
+        waited = 0.0
+        while True:
+            try:
+                return await asyncio.to_thread(worker.responses.get, True, WORKER_POLL_INTERVAL)
+            except queue.Empty:
+                waited += WORKER_POLL_INTERVAL
+                if not worker.process.is_alive():
+                    raise RuntimeError(f"XTTS worker {worker.worker_id} arrêté (code {worker.process.exitcode}).")
+                if waited >= CHUNK_TIMEOUT:
+                    raise RuntimeError("XTTS worker muet (timeout).")
+
+    async def stream_pcm(self, text: str, voice_path: Optional[str] = None) -> AsyncIterator[bytes]:
+        if not self.ready:
+            raise RuntimeError("Backend XTTS pas encore prêt (chauffe en cours).")
+
+        worker = await self._acquire_worker()
+        try:
+            start = time.time()
+            first_chunk = True
+            for sentence in split_sentences(text):
+                self._next_request_id += 1
+                req_id = self._next_request_id
+                worker.requests.put(("synth", req_id, sentence, voice_path))
+
+                while True:
+                    msg_id, kind, payload = await self._next_message(worker)
+                    if msg_id != req_id:
+                        continue  # Reste d'une requête annulée
+                    if kind == "chunk":
+                        if first_chunk:
+                            self.last_first_audio = time.time() - start
+                            logger.debug(f"[XTTS] Premier audio en {self.last_first_audio * 1000:.0f} ms")
+                            first_chunk = False
+                        yield payload
+                    elif kind == "done":
+                        break
+                    else:
+                        raise RuntimeError(f"XTTS worker en erreur : {payload}")
+        finally:
+            # Un worker mort ne revient pas dans le pool : available() passe à False avec le dernier
+            if worker.process.is_alive():
+                self.idle_workers.put(worker)
+
+    def shutdown(self):
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
+        self.idle_workers = queue.SimpleQueue()
+        self.ready = False
+
+
+def create_backend(backend_name: str, **kwargs) -> TTSBackend:
+    """Fabrique de moteurs TTS (sélection via constants.TTS_BACKEND)."""
+    if backend_name == "xtts":
+        return LocalXTTSBackend(**kwargs)
+    if backend_name == "edge":
+        return EdgeTTSBackend(**kwargs)
+    raise ValueError(f"Moteur TTS inconnu : {backend_name}")
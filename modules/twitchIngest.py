@@ -0,0 +1,224 @@
+# Fichier : modules/twitchIngest.py
+import re
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter, deque
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from modules.module import Module
+from modules.injection import Injection
+from metrics import get_metrics
+from constants import (TWITCH_MAX_MESSAGE_LENGTH, TWITCH_QUEUE_SIZE, TWITCH_DUPLICATE_WINDOW,
+                       TWITCH_USER_BURST, TWITCH_USER_REFILL, TWITCH_DIGEST_WINDOW,
+                       TWITCH_DIGEST_MAX_LINES, TWITCH_RESPONSE_COOLDOWN)
+
+logger = logging.getLogger('TwitchIngest')
+
+'''
+Étage d'ingestion du chat Twitch (webhook /api/twitch_input -> modules['twitch_ingest']).
+- Filtrage à l'entrée (thread du serveur) : doublons regroupés, jeton par utilisateur
+  (rafale TWITCH_USER_BURST puis 1 message / TWITCH_USER_REFILL s), file bornée
+- Subs, bits et raids sont prioritaires : jamais limités, jamais abandonnés avant le chat
+- Toutes les TWITCH_DIGEST_WINDOW secondes, un résumé du chat (événements, messages
+  répétés, échantillon récent) est injecté au prompt (priorité 100) et Clio est réveillée
+  au plus une fois par TWITCH_RESPONSE_COOLDOWN
+Un raid de centaines de messages par seconde ne produit donc qu'un résumé par fenêtre.
+'''
+
+# Types d'événements du webhook traités en priorité
+PRIORITY_TYPES = {"SUBSCRIPTION", "RESUB", "GIFT_SUB", "BITS", "CHEER", "RAID"}
+_REPEATS = re.compile(r"(.)\1{2,}")
+_SPACES = re.compile(r"\s+")
+
+
+class ChatMessage(NamedTuple):
+    username: str
+    text: str
+    kind: str
+    key: str          # Texte normalisé (clé de déduplication)
+    timestamp: float
+    extra: Dict[str, Any]
+
+
+def normalize(text: str) -> str:
+    """'GGGGG   !!' -> 'gg !!' : les variantes d'un même spam ont la même clé."""
+    return _REPEATS.sub(r"\1\1", _SPACES.sub(" ", text.strip().lower()))
+
+
+class TokenBucket:
+    def __init__(self, burst: int, refill: float, now: float):
+        self.tokens = float(burst)
+        self.burst = burst
+        self.refill = refill
+        self.updated = now
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.refill)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class TwitchIngest(Module):
+    def __init__(self, signals, modules, enabled=True):
+        super().__init__(signals, enabled)
+        self.modules = modules
+        self.API = self.API(self)
+
+        self._lock = threading.Lock()
+        self._chat: deque = deque(maxlen=TWITCH_QUEUE_SIZE)
+        self._events: deque = deque(maxlen=TWITCH_QUEUE_SIZE)
+        self._repeats: Counter = Counter()            # Doublons de la fenêtre en cours
+        self._seen: Dict[str, float] = {}             # Clé -> dernière apparition
+        self._buckets: Dict[str, TokenBucket] = {}
+
+        self.digest = ""
+        self.digest_time = 0.0
+        self._last_wakeup = 0.0
+        self.stats = {"received": 0, "accepted": 0, "duplicates": 0, "rate_limited": 0,
+                      "dropped": 0, "priority": 0, "digests": 0}
+
+    # --- ENTRÉE (thread du serveur HTTP) ---
+    def submit(self, username: str, text: str, kind: str = "CHAT_MESSAGE",
+               extra: Optional[Dict[str, Any]] = None) -> str:
+        """Retourne le sort du message : accepted, priority, duplicate, rate_limited ou empty."""
+        now = time.time()
+        text = (text or "")[:TWITCH_MAX_MESSAGE_LENGTH]
+        kind = (kind or "CHAT_MESSAGE").upper()
+        message = ChatMessage(username, text, kind, normalize(text), now, extra or {})
+
+        with self._lock:
+            self.stats["received"] += 1
+            if kind in PRIORITY_TYPES:
+                self.stats["priority"] += 1
+                self._events.append(message)
+                return "priority"
+            if not message.key:
+                return "empty"
+
+            # 1. Doublon récent (tous utilisateurs confondus) : compté, pas ré-enfilé
+            if now - self._seen.get(message.key, float("-inf")) < TWITCH_DUPLICATE_WINDOW:
+                self._seen[message.key] = now
+                self._repeats[message.key] += 1
+                self.stats["duplicates"] += 1
+                return "duplicate"
+
+            # 2. Débit par utilisateur
+            bucket = self._buckets.get(username)
+            if bucket is None:
+                bucket = self._buckets[username] = TokenBucket(TWITCH_USER_BURST, TWITCH_USER_REFILL, now)
+            if not bucket.take(now):
+                self.stats["rate_limited"] += 1
+                return "rate_limited"
+
+            # 3. File bornée : le message le plus ancien cède sa place
+            if len(self._chat) == self._chat.maxlen:
+                self.stats["dropped"] += 1
+            self._seen[message.key] = now
+            self._chat.append(message)
+            self.stats["accepted"] += 1
+            return "accepted"
+
+    # --- AGRÉGATION (boucle principale) ---
+    def _take_window(self):
+        with self._lock:
+            events, chat, repeats = list(self._events), list(self._chat), self._repeats
+            self._events.clear()
+            self._chat.clear()
+            self._repeats = Counter()
+            # Purge des clés et seaux inactifs : la mémoire reste bornée pendant un raid
+            now = time.time()
+            self._seen = {k: t for k, t in self._seen.items() if now - t < TWITCH_DUPLICATE_WINDOW}
+            self._buckets = {u: b for u, b in self._buckets.items() if b.tokens < b.burst or now - b.updated < 60}
+        return events, chat, repeats
+
+    @staticmethod
+    def _describe_event(event: ChatMessage) -> str:
+        if event.kind == "RAID":
+            return f"🚀 RAID de {event.username} ({event.extra.get('viewers', '?')} viewers)"
+        if event.kind in ("BITS", "CHEER"):
+            return f"💎 {event.username} offre {event.extra.get('bits', '?')} bits : {event.text}".rstrip(" :")
+        if event.kind == "GIFT_SUB":
+            return f"🎁 {event.username} offre {event.extra.get('count', 1)} abonnement(s)"
+        return f"⭐ {event.username} s'abonne : {event.text}".rstrip(" :")
+
+    def _build_digest(self, events: List[ChatMessage], chat: List[ChatMessage], repeats: Counter) -> str:
+        lines = [self._describe_event(e) for e in events]
+
+        # Messages repris en chœur (le premier exemplaire est dans chat)
+        texts = {m.key: m.text for m in chat}
+        for key, count in repeats.most_common():
+            if len(lines) >= TWITCH_DIGEST_MAX_LINES // 2 or count < 2:
+                break
+            lines.append(f"« {texts.get(key, key)} » ×{count + 1}")
+
+        # Échantillon des messages uniques les plus récents
+        shown = {k for k, c in repeats.items() if c >= 2}
+        for message in reversed(chat):
+            if len(lines) >= TWITCH_DIGEST_MAX_LINES:
+                break
+            if message.key not in shown:
+                lines.append(f"{message.username} : {message.text}")
+
+        if not lines:
+            return ""
+        total = len(chat) + sum(repeats.values())
+        return (f"[TWITCH CHAT] ({total} messages en {TWITCH_DIGEST_WINDOW:.0f}s, {len(events)} événement(s))\n"
+                + "\n".join(lines))
+
+    def _wake_clio(self, events: List[ChatMessage], chat: List[ChatMessage]):
+        """Un seul réveil par fenêtre (et par délai minimal), sur le message le plus important."""
+        now = time.time()
+        if self.signals.AI_thinking or (not events and now - self._last_wakeup < TWITCH_RESPONSE_COOLDOWN):
+            return
+        target = events[0] if events else chat[-1]
+        self._last_wakeup = now
+        get_metrics().begin_turn("twitch")
+        self.signals.user_query = f"{target.username} (Twitch) : {target.text or target.kind}"
+        self.signals.new_message = True
+
+    async def run(self):
+        if not self.enabled:
+            return
+        logger.info(f"💬 Ingestion Twitch active (fenêtre {TWITCH_DIGEST_WINDOW}s, file {TWITCH_QUEUE_SIZE}).")
+        while not self.signals.terminate:
+            await asyncio.sleep(TWITCH_DIGEST_WINDOW)
+            events, chat, repeats = self._take_window()
+            if not events and not chat:
+                continue
+            self.digest = self._build_digest(events, chat, repeats)
+            self.digest_time = time.time()
+            self.stats["digests"] += 1
+            self.signals.sio_queue.put(("twitch_stats", self.API.get_stats()))
+            self._wake_clio(events, chat)
+
+    def get_prompt_injection(self):
+        if not self.digest:
+            return Injection("", -1)
+        return Injection(self.digest, 100)
+
+    def cleanup(self):
+        # Le résumé n'est injecté qu'une fois : le prompt suivant verra la fenêtre suivante
+        self.digest = ""
+
+    class API:
+        def __init__(self, outer):
+            self.outer = outer
+
+        def submit(self, username: str, text: str, kind: str = "CHAT_MESSAGE",
+                   extra: Optional[Dict[str, Any]] = None) -> str:
+            """Thread-safe (appelé depuis le serveur HTTP)."""
+            return self.outer.submit(username, text, kind, extra)
+
+        def get_digest(self) -> str:
+            return self.outer.digest
+
+        def get_stats(self) -> Dict[str, Any]:
+            with self.outer._lock:
+                stats = dict(self.outer.stats)
+                stats["queued"] = len(self.outer._chat) + len(self.outer._events)
+            return stats
@@ -0,0 +1,304 @@
+# Fichier : modules/visionSidecar.py
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import requests
+
+from modules.module import Module
+from modules.injection import Injection
+from modules.frameBus import FrameSource
+from modules.frameDiff import HashResultCache, to_thumbnail, dhash
+from modules.payloadEncoder import PayloadEncoder, EncodedImage
+from constants import (OLLAMA_GENERATE_URL, VISION_MODEL, VISION_MODEL_LIMITS, VISION_QUEUE_SIZE,
+                       VISION_REQUEST_TIMEOUT, VISION_AMBIENT_INTERVAL, VISION_AMBIENT_PROMPT,
+                       MULTIMODAL_ENCODE_PROFILE, CLIO_FRAME_BUS_NAME, SCREEN_CAPTURE_FPS)
+
+logger = logging.getLogger('VisionSidecar')
+
+'''
+Sidecar des modèles vision : une file asynchrone unique devant Ollama.
+- Limite de requêtes simultanées PAR MODÈLE (sémaphores) : moondream et llava ne se marchent pas dessus
+- Déduplication sur le hash de la trame : une requête identique en cours est partagée,
+  une trame quasi identique déjà décrite est servie depuis le cache
+- Délai maximal par requête (attente en file comprise)
+- Les résultats sur la trame la plus récente sont publiés aux abonnés (MindMonitor, Prompter...)
+Tout le travail bloquant (encodage, HTTP) tourne dans des threads : la boucle principale,
+donc le chemin du chat, n'attend jamais le modèle vision.
+'''
+
+
+class VisionResult(NamedTuple):
+    model: str
+    prompt: str
+    frame_hash: int
+    seq: int
+    text: str
+    latency_ms: float
+    timestamp: float
+    cached: bool
+
+
+class _Request(NamedTuple):
+    model: str
+    prompt: str
+    image: "Future[Optional[EncodedImage]]"   # Encodage lancé à la soumission (la trame n'est pas gardée)
+    frame_hash: int
+    seq: int
+    publish: bool
+    deadline: float
+    future: "asyncio.Future"
+
+
+class VisionSidecar(Module):
+    def __init__(self, signals, modules, enabled=True, url: str = OLLAMA_GENERATE_URL,
+                 limits: Optional[Dict[str, int]] = None, workers: int = 4):
+        super().__init__(signals, enabled)
+        self.modules = modules
+        self.API = self.API(self)
+        self.url = url
+        self.limits = dict(VISION_MODEL_LIMITS if limits is None else limits)
+        self.workers = workers
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[Tuple[str, str, int], asyncio.Future] = {}
+        self._cache = HashResultCache()
+        self._encoder = PayloadEncoder(MULTIMODAL_ENCODE_PROFILE)
+        self._local = threading.local()
+        self._subscribers: List[Callable[[VisionResult], Any]] = []
+        # Trames lues sur le bus partagé : la capture peut tourner dans un processus de travail
+        self._frames = FrameSource(CLIO_FRAME_BUS_NAME)
+
+        self.last_result: Optional[VisionResult] = None
+        self._latest_seq = -1
+        self._offered: Optional[VisionResult] = None   # Dernier résultat placé dans un prompt
+        self._injected: Optional[VisionResult] = None  # ... et confirmé par une réponse du LLM
+        self.stats = {"submitted": 0, "deduplicated": 0, "cache_hits": 0, "completed": 0,
+                      "timeouts": 0, "errors": 0, "rejected": 0}
+
+    # --- EXÉCUTION BLOQUANTE (threads) ---
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _call_model(self, model: str, prompt: str, image: "Future[Optional[EncodedImage]]", timeout: float) -> str:
+        encoded = image.result(timeout)
+        if encoded is None:
+            raise RuntimeError("Encodage de la trame impossible")
+        payload = {"model": model, "prompt": prompt, "stream": False, "images": [encoded.base64]}
+        r = self._session().post(self.url, json=payload, timeout=timeout)
+        r.raise_for_status()
+        return r.json().get("response", "").strip()
+
+    # --- FILE ASYNCHRONE ---
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        if model not in self._semaphores:
+            self._semaphores[model] = asyncio.Semaphore(self.limits.get(model, 1))
+        return self._semaphores[model]
+
+    async def _worker(self):
+        while not self.signals.terminate:
+            request: _Request = await self._queue.get()
+            try:
+                await self._process(request)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, request: _Request):
+        key = (request.model, request.prompt, request.frame_hash)
+        start = time.perf_counter()
+        try:
+            remaining = request.deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            async with self._semaphore(request.model):
+                remaining = request.deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                text = await asyncio.wait_for(
+                    asyncio.to_thread(self._call_model, request.model, request.prompt, request.image, remaining),
+                    timeout=remaining
+                )
+            result = VisionResult(request.model, request.prompt, request.frame_hash, request.seq, text,
+                                  (time.perf_counter() - start) * 1000, time.time(), False)
+            self._cache.store(f"{request.model}:{request.prompt}", request.frame_hash, text)
+            self.stats["completed"] += 1
+            if not request.future.done():
+                request.future.set_result(result)
+            if request.publish:
+                self._publish(result)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            logger.warning(f"⏱️ Requête vision expirée ({request.model}).")
+            if not request.future.done():
+                request.future.set_exception(TimeoutError(f"Vision {request.model} : délai dépassé"))
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"❌ Erreur vision ({request.model}) : {e}")
+            if not request.future.done():
+                request.future.set_exception(e)
+        finally:
+            self._inflight.pop(key, None)
+
+    def _publish(self, result: VisionResult):
+        # Seuls les résultats sur une trame plus récente que le dernier publié sont diffusés
+        if result.seq < self._latest_seq:
+            return
+        self._latest_seq = result.seq
+        self.last_result = result
+        for callback in list(self._subscribers):
+            try:
+                callback(result)
+            except Exception as e:
+                logger.error(f"Erreur abonné vision : {e}")
+
+    def _enqueue(self, frame: np.ndarray, prompt: str, model: str, seq: int, publish: bool,
+                 timeout: float) -> "asyncio.Future":
+        """
+        Appelé dans la boucle du sidecar, avec une copie de la trame prise par submit() : le hash,
+        le cache et l'image envoyée au modèle portent sur les mêmes pixels.
+        """
+        self.stats["submitted"] += 1
+        frame_hash = dhash(to_thumbnail(frame))
+        future = self._loop.create_future()
+
+        # 1. Trame quasi identique déjà décrite : réponse immédiate
+        cached = self._cache.lookup(f"{model}:{prompt}", frame_hash)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            result = VisionResult(model, prompt, frame_hash, seq, cached, 0.0, time.time(), True)
+            future.set_result(result)
+            if publish:
+                self._publish(result)
+            return future
+
+        # 2. Même requête déjà en file ou en cours : on partage son résultat
+        key = (model, prompt, frame_hash)
+        if key in self._inflight:
+            self.stats["deduplicated"] += 1
+            return self._inflight[key]
+
+        # 3. Nouvelle requête (file bornée : refus immédiat plutôt qu'une attente sans fin)
+        # Encodage lancé tout de suite (thread de l'encodeur) : seule l'image encodée reste en file
+        request = _Request(model, prompt, self._encoder.submit(frame), frame_hash, seq, publish,
+                           time.monotonic() + timeout, future)
+        try:
+            self._queue.put_nowait(request)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            future.set_exception(RuntimeError("File vision saturée"))
+            return future
+        self._inflight[key] = future
+        return future
+
+    async def run(self):
+        if not self.enabled:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=VISION_QUEUE_SIZE)
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"👁️ Sidecar vision prêt ({self.url}, limites : {self.limits or 'défaut 1'}).")
+        last_look = 0.0
+        while not self.signals.terminate:
+            await asyncio.sleep(1)
+            # Coup d'œil périodique en jeu : les abonnés reçoivent la description de la dernière trame
+            in_game = getattr(self.signals, 'current_game', "none") not in ("none", None)
+            if VISION_AMBIENT_INTERVAL and in_game and time.monotonic() - last_look >= VISION_AMBIENT_INTERVAL:
+                last_look = time.monotonic()
+                asyncio.create_task(self._ambient_look())
+        for task in workers:
+            task.cancel()
+        self._encoder.shutdown()
+
+    async def _ambient_look(self):
+        try:
+            await self.API.analyze_latest(VISION_AMBIENT_PROMPT)
+        except Exception as e:
+            logger.debug(f"Coup d'œil ambiant ignoré : {e}")
+
+    def get_prompt_injection(self):
+        result = self.last_result
+        if result is None or result is self._injected or time.time() - result.timestamp > 30:
+            return Injection("", -1)
+        self._offered = result
+        return Injection(f"[VISION] Ce que tu vois à l'écran : {result.text}", 120)
+
+    def cleanup(self):
+        # Une description n'est donnée qu'une fois au LLM : la suivante attend un nouveau résultat
+        self._injected = self._offered
+
+    class API:
+        def __init__(self, outer):
+            self.outer = outer
+
+        async def analyze(self, frame: np.ndarray, prompt: str, model: str = VISION_MODEL, seq: int = -1,
+                          publish: bool = False, timeout: float = VISION_REQUEST_TIMEOUT) -> VisionResult:
+            """Depuis une coroutine (n'importe quelle boucle)."""
+            return await asyncio.wrap_future(self.submit(frame, prompt, model, seq, publish, timeout))
+
+        def submit(self, frame: np.ndarray, prompt: str, model: str = VISION_MODEL, seq: int = -1,
+                   publish: bool = False, timeout: float = VISION_REQUEST_TIMEOUT) -> "Future[VisionResult]":
+            """Depuis n'importe quel thread : retourne un concurrent.futures.Future."""
+            outer = self.outer
+            if outer._loop is None:
+                raise RuntimeError("Sidecar vision non démarré")
+            result: Future = Future()
+            # Copie immédiate : une vue du bus serait réécrite (quelques slots) avant l'encodage
+            frame = frame.copy()
+
+            def enqueue():
+                try:
+                    inner = outer._enqueue(frame, prompt, model, seq, publish, timeout)
+                except Exception as e:
+                    result.set_exception(e)
+                    return
+
+                def relay(f):
+                    if result.done():  # Abandonné par l'appelant
+                        return
+                    if f.cancelled():
+                        result.cancel()
+                    elif f.exception() is not None:
+                        result.set_exception(f.exception())
+                    else:
+                        result.set_result(f.result())
+                inner.add_done_callback(relay)
+
+            outer._loop.call_soon_threadsafe(enqueue)
+            return result
+
+        async def analyze_latest(self, prompt: str, model: str = VISION_MODEL,
+                                 timeout: float = VISION_REQUEST_TIMEOUT) -> Optional[VisionResult]:
+            """Analyse la trame la plus récente du bus partagé et publie le résultat aux abonnés."""
+            frame = await asyncio.to_thread(self.outer._frames.get, 2.0 / SCREEN_CAPTURE_FPS)
+            if frame is None:
+                return None
+            return await self.analyze(frame.image, prompt, model, seq=frame.seq, publish=True, timeout=timeout)
+
+        def subscribe(self, callback: Callable[[VisionResult], Any]):
+            """callback(VisionResult) est appelé dans la boucle du sidecar : il doit rester court."""
+            self.outer._subscribers.append(callback)
+
+        def unsubscribe(self, callback: Callable[[VisionResult], Any]):
+            if callback in self.outer._subscribers:
+                self.outer._subscribers.remove(callback)
+
+        def get_last_result(self) -> Optional[VisionResult]:
+            return self.outer.last_result
+
+        def get_last_detection_summary(self) -> str:
+            result = self.outer.last_result
+            return result.text if result else "Aucune détection visuelle récente."
+
+        def get_stats(self) -> Dict[str, Any]:
+            stats = dict(self.outer.stats)
+            stats["queued"] = self.outer._queue.qsize() if self.outer._queue else 0
+            stats["inflight"] = len(self.outer._inflight)
+            return stats
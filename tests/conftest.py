@@ -0,0 +1,9 @@
+# Fichier : tests/conftest.py
+import os
+import sys
+
+# Même résolution d'imports que main.py : racine (modules.*, llmWrappers.*) + Neuro-master (constants, signals...)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "Neuro-master")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,89 @@
+# Fichier : tests/test_frame_bus.py
+import time
+import uuid
+
+import numpy as np
+import pytest
+
+from modules.frameBus import FrameBus, FrameSource, attach_reader
+
+
+@pytest.fixture
+def bus():
+    bus = FrameBus(f"clio_test_{uuid.uuid4().hex[:8]}", width=4, height=2, slots=3)
+    yield bus
+    bus.close()
+
+
+def image(value):
+    return np.full((2, 4, 3), value, dtype=np.uint8)
+
+
+def test_reader_sees_latest_frame_without_copy(bus):
+    reader = attach_reader(bus.name)
+    assert reader.latest() is None
+
+    bus.publish(image(7))
+    frame = reader.latest()
+
+    assert frame.seq == 1 and reader.shape == (2, 4, 3)
+    assert (frame.image == 7).all()
+    bus.begin_write()[:] = 9                       # Écriture directe dans le slot suivant
+    assert reader.latest().seq == 1                # Slot en cours d'écriture (seq = -1) : pas encore visible
+    bus.commit()
+    assert (reader.latest().image == 9).all()
+    assert (reader.roi(1, 0, 2, 1) == 9).all() and reader.roi(1, 0, 2, 1).shape == (1, 2, 3)
+    del frame
+    reader.close()
+
+
+def test_seqlock_detects_rewritten_slot(bus):
+    reader = attach_reader(bus.name)
+    bus.publish(image(1))
+    frame = reader.latest()
+    assert reader.is_current(frame)
+
+    for value in range(2, 5):                      # 3 slots : le slot de la trame 1 est réécrit
+        bus.publish(image(value))
+
+    assert not reader.is_current(frame)
+    assert reader.latest().seq == 4
+    del frame
+    reader.close()
+
+
+def test_wait_fresh_signals_demand(bus):
+    reader = attach_reader(bus.name)
+    assert reader.wait_fresh(max_age=1.0, timeout=0.01) is None
+    assert time.time() - bus.last_demand() < 1.0  # La capture sait qu'un consommateur attend
+
+    bus.publish(image(3), timestamp=time.time() - 10)
+    assert reader.wait_fresh(max_age=1.0, timeout=0.01).seq == 1   # Trop vieille : rendue au délai
+    bus.publish(image(4))
+    assert reader.wait_fresh(max_age=1.0, timeout=0.01).seq == 2
+    reader.close()
+
+
+def test_attach_reader_without_writer():
+    assert attach_reader(f"clio_test_absent_{uuid.uuid4().hex[:8]}") is None
+
+
+def test_frame_source_reattaches_after_writer_restart():
+    name = f"clio_test_{uuid.uuid4().hex[:8]}"
+    source = FrameSource(name, reattach_after=0.1)
+    assert source.get(max_age=1.0, timeout=0.01) is None           # Pas encore de service de capture
+
+    bus = FrameBus(name, width=4, height=2)
+    bus.publish(image(1))
+    assert source.get(max_age=1.0, timeout=0.01).seq == 1
+
+    bus.close()
+    time.sleep(0.15)
+    restarted = FrameBus(name, width=4, height=2)                  # Nouveau segment, même nom
+    restarted.publish(image(2))
+    assert source.get(max_age=1.0, timeout=0.01) is None           # Ancien segment muet : détaché
+    frame = source.get(max_age=1.0, timeout=0.01)
+    assert frame.seq == 1 and (frame.image == 2).all()
+    del frame
+    source.close()
+    restarted.close()
@@ -0,0 +1,149 @@
+# Fichier : tests/test_llm_prompt.py
+import asyncio
+import json
+
+from signals import Signals
+from modules.injection import Injection
+from llmWrappers import textLLMWrapper
+from llmWrappers.textLLMWrapper import TextLLMWrapper
+from llmWrappers.llmState import LLMState
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.lines = [json.dumps({"message": {"content": text}}).encode()]
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, chunk_size=None):
+        return iter(self.lines)
+
+
+class FakeModule:
+    def __init__(self, text, priority):
+        self.injection = Injection(text, priority)
+        self.cleaned = 0
+
+    def get_prompt_injection(self):
+        return self.injection
+
+    def cleanup(self):
+        self.cleaned += 1
+
+
+def make_llm(monkeypatch, modules, reply="[happy] Oui."):
+    sent = []
+    monkeypatch.setattr(textLLMWrapper.requests, "post",
+                        lambda url, json=None, **kwargs: sent.append(json) or FakeResponse(reply))
+    return TextLLMWrapper(Signals(), None, LLMState(), modules), sent
+
+
+def test_generate_response_sends_prompter_messages(monkeypatch):
+    hud = FakeModule("[HUD WARFRAME] vie: 40", 150)
+    llm, sent = make_llm(monkeypatch, {"hud": hud})
+    messages = [{"role": "system", "content": "MODE PRIVÉ"},
+                {"role": "user", "content": "On en est où ?"}]
+
+    reply = asyncio.run(llm.generate_response("On en est où ?", messages=messages))
+
+    assert reply == "[happy] Oui."
+    payload = sent[0]["messages"]
+    assert payload[0]["content"].startswith("MODE PRIVÉ") and "vie: 40" in payload[0]["content"]
+    assert payload[-1] == {"role": "user", "content": "On en est où ?"}
+    assert messages[0]["content"] == "MODE PRIVÉ"          # Le prompt du Prompter n'est pas modifié
+    assert hud.cleaned == 1
+    assert llm.signals.history[-1] == {"role": "assistant", "content": "Oui."}
+
+
+def test_injections_sorted_and_failures_skipped(monkeypatch):
+    class Broken:
+        def get_prompt_injection(self):
+            raise RuntimeError("capteur absent")
+
+    modules = {"late": FakeModule("B", 150), "early": FakeModule("A", 60),
+               "hidden": FakeModule("caché", -1), "legacy": type("Legacy", (), {"get_prompt_injection": lambda self: "C"})(),
+               "broken": Broken()}
+    llm, _ = make_llm(monkeypatch, modules)
+    assert llm.assemble_injections() == "A\nC\nB"
+
+
+def test_failed_turn_keeps_injections(monkeypatch):
+    twitch = FakeModule("[TWITCH CHAT] gg", 100)
+    llm, _ = make_llm(monkeypatch, {"twitch_ingest": twitch})
+
+    def fail(*args, **kwargs):
+        raise ConnectionError("Ollama hors ligne")
+    monkeypatch.setattr(textLLMWrapper.requests, "post", fail)
+    llm.signals.history.append({"role": "user", "content": "salut"})
+    llm.prompt()
+    assert twitch.cleaned == 0
+
+
+def test_hud_numbers_reach_prompt_without_vision(monkeypatch):
+    from modules.hudReader import HudReader
+
+    hud = HudReader(Signals(), {})
+    hud.game_context = {"vie": 40, "munitions": 12, "source": "hud", "jeu": "warframe"}
+    llm, sent = make_llm(monkeypatch, {"hud": hud})
+
+    asyncio.run(llm.generate_response("Ça va ?", messages=[{"role": "system", "content": "MODE PRIVÉ"},
+                                                             {"role": "user", "content": "Ça va ?"}]))
+
+    assert "[HUD WARFRAME] vie: 40, munitions: 12" in sent[0]["messages"][0]["content"]
+    assert len(sent) == 1                                   # Aucun appel vision, un seul appel LLM
+
+
+def test_brain_reflexes_injected_once(monkeypatch):
+    import time
+    from modules.brainModule import BrainModule
+
+    brain = BrainModule(Signals(), {})
+    brain.handle_action({"type": "reflex_event", "game": "warframe", "name": "low_hp",
+                         "value": 0.2, "timestamp": time.time()})
+    llm, sent = make_llm(monkeypatch, {"brain": brain})
+    messages = [{"role": "system", "content": "MODE PRIVÉ"}, {"role": "user", "content": "Hein ?"}]
+
+    asyncio.run(llm.generate_response("Hein ?", messages=messages))
+    asyncio.run(llm.generate_response("Hein ?", messages=messages))
+
+    assert "low_hp (warframe)" in sent[0]["messages"][0]["content"]
+    assert "RÉFLEXES" not in sent[1]["messages"][0]["content"]
+
+
+def test_vision_description_injected_once(monkeypatch):
+    import time
+    from modules.visionSidecar import VisionSidecar, VisionResult
+
+    def result(seq, text):
+        return VisionResult("llava", "ambiant", 0, seq, text, 12.0, time.time(), False)
+
+    vision = VisionSidecar(Signals(), {})
+    vision._publish(result(1, "un boss rouge"))
+    llm, sent = make_llm(monkeypatch, {"vision": vision})
+    messages = [{"role": "system", "content": "MODE PRIVÉ"}, {"role": "user", "content": "Et là ?"}]
+
+    asyncio.run(llm.generate_response("Et là ?", messages=messages))
+    asyncio.run(llm.generate_response("Et là ?", messages=messages))
+    vision._publish(result(2, "un coffre"))
+    asyncio.run(llm.generate_response("Et là ?", messages=messages))
+
+    prompts = [payload["messages"][0]["content"] for payload in sent]
+    assert "un boss rouge" in prompts[0]
+    assert "[VISION]" not in prompts[1]
+    assert "un coffre" in prompts[2]
+
+
+def test_remote_module_forwards_cleanup():
+    from modules.processSupervisor import RemoteModule
+
+    class FakeSupervisor:
+        def __init__(self):
+            self.cleaned = []
+
+        def notify_cleanup(self, group, key):
+            self.cleaned.append((group, key))
+
+    supervisor = FakeSupervisor()
+    RemoteModule(Signals(), supervisor, "vision", "vision_sidecar").cleanup()
+    assert supervisor.cleaned == [("vision", "vision_sidecar")]
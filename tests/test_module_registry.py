@@ -0,0 +1,72 @@
+# Fichier : tests/test_module_registry.py
+import asyncio
+
+import pytest
+
+from moduleRegistry import ModuleRegistry, import_class
+from modules.injection import Injection
+
+
+def build(registry, modules=None):
+    modules = {} if modules is None else modules
+    asyncio.run(registry.build(modules, max_workers=4))
+    return modules
+
+
+def test_dependencies_built_first_and_registration_order_kept():
+    registry = ModuleRegistry()
+    modules = {}
+    seen = {}
+
+    def factory(key, *needs):
+        def make(cls):
+            seen[key] = all(dep in modules for dep in needs)
+            return cls(key, 1)
+        return make
+
+    registry.register("prompter", "injection.Injection", factory("prompter", "memory", "brain"),
+                      deps=("memory", "brain"))
+    registry.register("memory", "injection.Injection", factory("memory"))
+    registry.register("brain", "injection.Injection", factory("brain", "memory"), deps=("memory",))
+
+    build(registry, modules)
+
+    assert seen == {"prompter": True, "memory": True, "brain": True}
+    assert list(modules) == ["prompter", "memory", "brain"]
+    assert isinstance(modules["brain"], Injection)
+
+
+def test_absent_error_hosted_and_unpublished():
+    registry = ModuleRegistry()
+    registry.register("stt", "moduleQuiNexistePas.STT", lambda c: c())
+    registry.register("broken", "injection.Injection", lambda c: c(nonexistent=1))
+    registry.register("hud", "injection.Injection", lambda c: c("local", 1))
+    registry.register("sio", "injection.Injection", lambda c: c("sio", 1), publish=False)
+    hosted = object()
+
+    modules = build(registry, {"hud": hosted})
+
+    status = {key: t.status for key, t in registry.timings.items()}
+    assert status == {"stt": "absent", "broken": "erreur", "hud": "hébergé", "sio": "ok"}
+    assert modules == {"hud": hosted}                 # Hébergé gardé, sio seulement dans objects
+    assert registry.objects["sio"].text == "sio"
+    assert "moduleQuiNexistePas" in registry.timings["stt"].detail
+    assert "stt" in registry.report()
+
+
+def test_cycle_rejected():
+    registry = ModuleRegistry()
+    registry.register("a", "injection.Injection", lambda c: c("a", 1), deps=("b",))
+    registry.register("b", "injection.Injection", lambda c: c("b", 1), deps=("a",))
+
+    with pytest.raises(ValueError, match="circulaire"):
+        build(registry)
+
+
+def test_import_class_keeps_missing_dependency_error(tmp_path, monkeypatch):
+    (tmp_path / "needsMissingLib.py").write_text("import bibliothequeAbsente\nclass Thing: pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    assert import_class("injection.Injection") is Injection
+    with pytest.raises(ModuleNotFoundError, match="bibliothequeAbsente"):
+        import_class("needsMissingLib.Thing")
@@ -0,0 +1,116 @@
+# Fichier : tests/test_process_supervisor.py
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from signals import Signals
+from modules.module import Module
+from modules.processSupervisor import (BusMessage, ProcessSupervisor, RemoteCallError, WorkerSignals,
+                                       _inbox_loop)
+
+
+class Hud(Module):
+    def __init__(self, signals, enabled=True):
+        super().__init__(signals, enabled)
+        self.cleaned = 0
+        self.API = self.API(self)
+
+    def cleanup(self):
+        self.cleaned += 1
+
+    class API:
+        def __init__(self, outer):
+            self.outer = outer
+
+        def get_stats(self, scale=1):
+            return {"vie": 40 * scale}
+
+        def get_roi_pixels(self):
+            return np.zeros((2, 2), dtype=np.uint8)
+
+
+def drain(q):
+    items = []
+    while True:
+        try:
+            items.append(q.get_nowait())
+        except queue.Empty:
+            return items
+
+
+def test_worker_signals_mirror_changes_but_not_terminate_or_echo():
+    outbox = queue.Queue()
+    signals = WorkerSignals(outbox)
+
+    signals.AI_speaking = True
+    signals.AI_speaking = True                     # Inchangé : rien ne remonte
+    signals.apply("current_game", "warframe")      # Venu du cœur : pas d'écho
+    signals.terminate = True
+    signals.sio_queue.put(("twitch_stats", {}))
+
+    assert drain(outbox) == [BusMessage("signal", "AI_speaking", True),
+                             BusMessage("sio", "", ("twitch_stats", {}))]
+    assert signals.current_game == "warframe"
+
+
+def test_inbox_loop_applies_signals_calls_and_cleanup():
+    inbox, outbox = queue.Queue(), queue.Queue()
+    signals = WorkerSignals(outbox)
+    hud = Hud(signals)
+    thread = threading.Thread(target=_inbox_loop, args=(signals, {"hud": hud}, inbox, outbox), daemon=True)
+    thread.start()
+
+    inbox.put(BusMessage("signal", "context_mode", "stream"))
+    inbox.put(BusMessage("call", "1", ("hud", "get_stats", (), {"scale": 2})))
+    inbox.put(BusMessage("call", "2", ("hud", "get_roi_pixels", (), {})))
+    inbox.put(BusMessage("call", "3", ("hud", "absente", (), {})))
+    inbox.put(BusMessage("cleanup", "hud", None))
+    inbox.put(BusMessage("stop", "", None))
+    thread.join(timeout=5)
+
+    results = {m.key: m.payload for m in drain(outbox) if m.kind == "result"}
+    assert signals.context_mode == "stream" and signals.terminate
+    assert results["1"] == (True, {"vie": 80})
+    assert results["2"][0] is False and "bus d'images" in results["2"][1]   # Pas d'image par message
+    assert results["3"][0] is False and "AttributeError" in results["3"][1]
+    assert hud.cleaned == 1
+
+
+def test_core_applies_worker_messages():
+    supervisor = ProcessSupervisor(Signals(), {"vision": [("hud", "hudReader.HudReader")]})
+    worker, outbox = supervisor.workers["vision"], queue.Queue()
+    worker.outbox = outbox
+    future = Future()
+    supervisor._calls["7"] = ("vision", future)
+
+    outbox.put(BusMessage("heartbeat", "vision", 1.0))
+    outbox.put(BusMessage("injection", "hud", ("[HUD] vie: 40", 150)))
+    outbox.put(BusMessage("state", "hud", {"game_context": {"vie": 40}}))
+    outbox.put(BusMessage("result", "7", (False, "ValueError: boum")))
+    thread = threading.Thread(target=supervisor._outbox_loop, args=(worker, outbox), daemon=True)
+    thread.start()
+    with pytest.raises(RemoteCallError, match="boum"):
+        future.result(timeout=5)
+    worker.outbox = None                           # Processus remplacé : le thread s'arrête
+    thread.join(timeout=5)
+
+    remote = supervisor.remote_modules()["hud"]
+    assert worker.last_heartbeat > 0
+    assert remote.get_prompt_injection().text == "[HUD] vie: 40"
+    assert remote.game_context == {"vie": 40}
+
+
+def test_remote_api_refusals():
+    supervisor = ProcessSupervisor(Signals(), {"vision": [("hud", "hudReader.HudReader")], "vide": []})
+    remote = supervisor.remote_modules()["hud"]
+
+    assert "vide" not in supervisor.workers
+    assert not hasattr(remote.API, "get_frame")                     # Trames : bus partagé
+    with pytest.raises(TypeError, match="callback"):
+        remote.API.subscribe(lambda frame: None)
+    with pytest.raises(RemoteCallError, match="indisponible"):
+        remote.API.get_stats()
+    supervisor.notify_cleanup("vision", "hud")                      # Processus absent : ignoré
@@ -0,0 +1,90 @@
+# Fichier : tests/test_resource_registry.py
+import threading
+
+from resourceRegistry import ResourceRegistry
+
+
+class Model:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+
+def close(model):
+    model.closed = True
+
+
+def test_acquire_reuses_instance_with_same_config():
+    registry = ResourceRegistry()
+    built = []
+
+    def factory():
+        built.append(Model("xtts"))
+        return built[-1]
+
+    first = registry.acquire("tts.backend", factory, close=close, config=("xtts", True))
+    second = registry.acquire("tts.backend", factory, close=close, config=("xtts", True))
+
+    assert first is second and len(built) == 1
+    assert registry.stats()["tts.backend"]["reused"] == 1
+
+
+def test_config_change_closes_and_rebuilds():
+    registry = ResourceRegistry()
+    old = registry.acquire("tts.backend", lambda: Model("xtts"), close=close, config="xtts")
+    new = registry.acquire("tts.backend", lambda: Model("edge"), close=close, config="edge")
+
+    assert old.closed and not new.closed
+    assert new.name == "edge"
+
+
+def test_release_and_close_all():
+    registry = ResourceRegistry()
+    a = registry.acquire("a", lambda: Model("a"), close=close)
+    b = registry.acquire("b", lambda: Model("b"), close=close)
+
+    registry.release("a")
+    assert a.closed and not b.closed
+    assert registry.acquire("a", lambda: Model("a2")).name == "a2"   # Reconstruite après release
+
+    registry.close_all()
+    assert b.closed and registry.stats() == {}
+
+
+def test_failing_close_does_not_block_rebuild():
+    registry = ResourceRegistry()
+
+    def broken(_):
+        raise RuntimeError("déjà fermé")
+
+    registry.acquire("index", lambda: Model("v1"), close=broken, config=1)
+    assert registry.acquire("index", lambda: Model("v2"), config=2).name == "v2"
+
+
+def test_concurrent_acquire_builds_once():
+    registry = ResourceRegistry()
+    built, barrier = [], threading.Barrier(4)
+
+    def factory():
+        built.append(1)
+        return Model("faiss")
+
+    def worker(out):
+        barrier.wait()
+        out.append(registry.acquire("memory.vector", factory))
+
+    results = []
+    threads = [threading.Thread(target=worker, args=(results,)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(built) == 1 and all(r is results[0] for r in results)
+
+
+def test_defining_modules_lists_class_hierarchy():
+    registry = ResourceRegistry()
+    registry.acquire("model", lambda: Model("x"))
+
+    assert {__name__, "builtins"} <= registry.defining_modules()
@@ -0,0 +1,64 @@
+# Fichier : tests/test_sio_emitter.py
+import asyncio
+
+from signals import Signals
+from sioEmitter import SioEmitter
+
+
+def make_emitter(buffer_size=64):
+    sent, frames = [], []
+
+    async def emit(event, data):
+        sent.append((event, data))
+
+    signals = Signals()
+    emitter = SioEmitter(signals, emit, buffer_size=buffer_size, on_frame=frames.append)
+    return signals, emitter, sent, frames
+
+
+def push(signals, *events):
+    for event in events:
+        signals.sio_queue.put(event)
+
+
+def test_frame_keeps_queue_order():
+    signals, emitter, sent, _ = make_emitter()
+    push(signals, ("AI_speaking", True), ("next_chunk", "Bon"), ("next_chunk", "jour"),
+         ("AI_speaking", False), ("user_message", "salut"))
+
+    asyncio.run(emitter.flush())
+
+    # Le dernier état AI_speaking prend la place de sa dernière valeur : après la réplique
+    assert sent == [("next_chunk", "Bonjour"), ("AI_speaking", False), ("user_message", "salut")]
+
+
+def test_state_between_chunks_splits_them():
+    signals, emitter, sent, _ = make_emitter()
+    push(signals, ("next_chunk", "A"), ("current_game", "warframe"), ("next_chunk", "B"))
+
+    asyncio.run(emitter.flush())
+
+    assert sent == [("next_chunk", "A"), ("current_game", "warframe"), ("next_chunk", "B")]
+
+
+def test_unchanged_state_not_reemitted():
+    signals, emitter, sent, frames = make_emitter()
+    push(signals, ("current_game", "warframe"))
+    asyncio.run(emitter.flush())
+    push(signals, ("current_game", "warframe"), ("AI_thinking", True))
+    asyncio.run(emitter.flush())
+    asyncio.run(emitter.flush())                      # Trame vide : rien n'est émis
+
+    assert sent == [("current_game", "warframe"), ("AI_thinking", True)]
+    assert len(frames) == 2
+    assert emitter.stats["deduplicated"] == 1
+
+
+def test_bounded_buffer_drops_oldest_events():
+    signals, emitter, sent, _ = make_emitter(buffer_size=2)
+    push(signals, ("log", 1), ("log", 2), ("log", 3), ("AI_speaking", True))
+
+    asyncio.run(emitter.flush())
+
+    assert sent == [("log", 2), ("log", 3), ("AI_speaking", True)]
+    assert emitter.stats["dropped"] == 1
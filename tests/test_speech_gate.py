@@ -0,0 +1,90 @@
+# Fichier : tests/test_speech_gate.py
+import numpy as np
+
+from modules import speechGate
+from modules.speechGate import FRAME_SAMPLES, SpeechGate, transcript_has_keyword
+
+SPEECH = (np.sin(np.arange(FRAME_SAMPLES) / 3) * 8000).astype(np.int16).tobytes()
+SILENCE = np.zeros(FRAME_SAMPLES, dtype=np.int16).tobytes()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_gate(monkeypatch, mode="vad", muted=False):
+    clock = FakeClock()
+    monkeypatch.setattr(speechGate.time, "monotonic", clock)
+    fed = []
+    gate = SpeechGate(fed.append, lambda: mode, is_muted=lambda: muted)
+    gate.vad = None                                  # Énergie seule, que webrtcvad soit installé ou non
+    return gate, fed, clock
+
+
+def test_vad_opens_after_speech_run_with_pre_roll(monkeypatch):
+    gate, fed, _ = make_gate(monkeypatch)
+    for frame in (SILENCE, SILENCE, SPEECH, SPEECH):
+        gate.process_frame(frame)
+    assert fed == []                                 # Porte fermée : Whisper ne reçoit rien
+
+    gate.process_frame(SPEECH)
+    assert fed == [SILENCE, SILENCE, SPEECH, SPEECH, SPEECH]   # Pré-roll compris
+    gate.process_frame(SILENCE)
+    assert len(fed) == 6 and gate.stats["openings"] == 1
+
+
+def test_gate_closes_after_hangover(monkeypatch):
+    gate, fed, clock = make_gate(monkeypatch)
+    for _ in range(3):
+        gate.process_frame(SPEECH)
+    clock.now += speechGate.HANGOVER_SECONDS + 0.1
+    gate.process_frame(SILENCE)                      # Dernière trame transmise, puis fermeture
+    gate.process_frame(SILENCE)
+
+    assert len(fed) == 4 and not gate._is_open
+
+
+def test_wake_word_without_model_falls_back_to_vad(monkeypatch):
+    gate, fed, _ = make_gate(monkeypatch, mode="wake_word")
+    assert not gate.has_wake_word_model and gate.effective_mode("wake_word") == "vad"
+
+    for _ in range(3):
+        gate.process_frame(SPEECH)
+    assert len(fed) == 3                             # Toute la parole atteint Whisper
+
+
+def test_wake_word_model_opens_only_on_keyword(monkeypatch):
+    class FakeWakeModel:
+        def __init__(self):
+            self.score = 0.0
+
+        def predict(self, chunk):
+            return {"clio": self.score}
+
+    gate, fed, _ = make_gate(monkeypatch, mode="wake_word")
+    gate.wake_model, gate.wake_key = FakeWakeModel(), "clio"
+    for _ in range(6):
+        gate.process_frame(SPEECH)
+    assert fed == []                                 # De la parole, mais pas le mot-clé
+
+    gate.wake_model.score = 0.9
+    for _ in range(3):
+        gate.process_frame(SPEECH)
+    assert gate.stats["wake_hits"] == 1 and gate.is_awake() and fed
+
+
+def test_off_and_muted_forward_nothing(monkeypatch):
+    for mode, muted in (("off", False), ("open", True)):
+        gate, fed, _ = make_gate(monkeypatch, mode=mode, muted=muted)
+        for _ in range(5):
+            gate.process_frame(SPEECH)
+        assert fed == []
+
+
+def test_transcript_keyword_ignores_case_and_accents():
+    assert transcript_has_keyword("Dis, CLÏO, tu m'entends ?", ["clio"])
+    assert not transcript_has_keyword("Bonjour tout le monde", ["clio"])
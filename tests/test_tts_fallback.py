@@ -0,0 +1,105 @@
+# Fichier : tests/test_tts_fallback.py
+import asyncio
+
+import tts as tts_module
+from signals import Signals
+from resourceRegistry import ResourceRegistry
+from modules.ttsBackends import StreamingTTSBackend, FileTTSBackend
+
+
+class FakeStream:
+    def __init__(self, player):
+        self.player = player
+        self.first_write_time = None
+
+    def write(self, pcm):
+        self.first_write_time = self.first_write_time or 1.0
+        self.player.heard.append(pcm.decode())
+
+    def close(self):
+        pass
+
+
+class FakePlayer:
+    def __init__(self):
+        self.heard = []
+        self.API = self
+
+    def open_stream(self, sample_rate):
+        return FakeStream(self)
+
+    def play_audio(self, path):
+        self.heard.append(path)
+
+
+class DyingXTTS(StreamingTTSBackend):
+    """Joue `alive` phrases puis meurt au milieu de la suivante."""
+    name = "xtts"
+
+    def __init__(self, alive):
+        super().__init__()
+        self.ready = True
+        self.alive = alive
+
+    async def stream_pcm(self, text):
+        if self.alive == 0:
+            self.ready = False
+            yield b"<coupe>"
+            raise RuntimeError("worker mort")
+        self.alive -= 1
+        yield text.encode()
+
+
+class FakeEdge(FileTTSBackend):
+    name = "edge"
+
+    def __init__(self):
+        super().__init__()
+        self.texts = []
+
+    async def synthesize_file(self, text, output_path):
+        self.texts.append(text)
+        return output_path
+
+
+def make_tts(monkeypatch, tmp_path, primary):
+    edge = FakeEdge()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tts_module, "get_resources", lambda: ResourceRegistry())
+    monkeypatch.setattr(tts_module, "TTS_FALLBACK_BACKEND", "edge")
+    monkeypatch.setattr(tts_module.TTS, "_load_backend", lambda self: primary)
+    monkeypatch.setattr(tts_module.TTS, "_create_backend", lambda self, name: edge)
+    player = FakePlayer()
+    return tts_module.TTS(Signals(), {"audio": player}), player, edge
+
+
+def test_fallback_resumes_after_heard_sentences(monkeypatch, tmp_path):
+    tts, player, edge = make_tts(monkeypatch, tmp_path, DyingXTTS(alive=1))
+
+    asyncio.run(tts.generate_audio("Bonjour Maman. Le boss arrive. Attention à gauche !"))
+
+    assert player.heard[:2] == ["Bonjour Maman.", "<coupe>"]
+    assert edge.texts == ["Attention à gauche !"]   # Ni la phrase entendue ni la phrase coupée
+
+
+def test_fallback_speaks_everything_when_nothing_was_heard(monkeypatch, tmp_path):
+    tts, player, edge = make_tts(monkeypatch, tmp_path, DyingXTTS(alive=0))
+    monkeypatch.setattr(DyingXTTS, "stream_pcm", _fail_before_audio)
+
+    asyncio.run(tts.generate_audio("Bonjour Maman. Le boss arrive."))
+
+    assert edge.texts == ["Bonjour Maman. Le boss arrive."]
+
+
+def test_no_fallback_when_last_sentence_was_cut(monkeypatch, tmp_path):
+    tts, player, edge = make_tts(monkeypatch, tmp_path, DyingXTTS(alive=1))
+
+    asyncio.run(tts.generate_audio("Bonjour Maman. Le boss arrive."))
+
+    assert edge.texts == []
+
+
+async def _fail_before_audio(self, text):
+    self.ready = False
+    raise RuntimeError("worker mort")
+    yield b""
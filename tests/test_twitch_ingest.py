@@ -0,0 +1,74 @@
+# Fichier : tests/test_twitch_ingest.py
+import json
+
+import pytest
+
+from signals import Signals
+from modules.twitchIngest import TwitchIngest
+from llmWrappers import textLLMWrapper
+from llmWrappers.textLLMWrapper import TextLLMWrapper
+from llmWrappers.llmState import LLMState
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.lines = [json.dumps({"message": {"content": text}}).encode()]
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, chunk_size=None):
+        return iter(self.lines)
+
+
+@pytest.fixture
+def ingest():
+    return TwitchIngest(Signals(), {})
+
+
+def burst(ingest, count=30):
+    for i in range(count):
+        ingest.submit(f"viewer{i}", "GGGG !!")
+    ingest.submit("raider", "", kind="RAID", extra={"viewers": 42})
+    ingest.submit("alice", "Tu joues à quoi ?")
+
+
+def test_duplicates_are_counted_once(ingest):
+    burst(ingest)
+    stats = ingest.API.get_stats()
+    assert stats["accepted"] == 2          # "gg !!" une fois + la question d'alice
+    assert stats["duplicates"] == 29
+    assert stats["priority"] == 1
+
+
+def test_token_bucket_limits_one_user(ingest):
+    results = [ingest.submit("spammer", f"message numéro {i}") for i in range(20)]
+    assert results.count("rate_limited") > 0
+    assert results[0] == "accepted"
+
+
+def test_digest_groups_events_and_repeats(ingest):
+    burst(ingest)
+    digest = ingest._build_digest(*ingest._take_window())
+    assert "RAID de raider (42 viewers)" in digest
+    assert "×30" in digest
+    assert "alice : Tu joues à quoi ?" in digest
+
+
+def test_chat_burst_reaches_the_llm_prompt(ingest, monkeypatch):
+    burst(ingest)
+    ingest.digest = ingest._build_digest(*ingest._take_window())
+
+    sent = []
+    monkeypatch.setattr(textLLMWrapper.requests, "post",
+                        lambda url, json=None, **kwargs: sent.append(json) or FakeResponse("[happy] Salut !"))
+    llm = TextLLMWrapper(ingest.signals, None, LLMState(), {"twitch_ingest": ingest})
+    llm.signals.history.append({"role": "user", "content": "raider (Twitch) : RAID"})
+    llm.prompt()
+
+    system = sent[0]["messages"][0]
+    assert system["role"] == "system"
+    assert "[TWITCH CHAT]" in system["content"] and "×30" in system["content"]
+    # Injecté une seule fois, et jamais recopié dans l'historique
+    assert ingest.digest == ""
+    assert "[TWITCH CHAT]" not in llm.signals.history[0]["content"]